@@ -0,0 +1,70 @@
+#-------------------------------------IMPORT TIME BENCHMARK-------------------------------------------
+
+# Import time of the package and of the backends of each entry point (see src/backends.jl),
+# compared with loading every plotting/surrogate stack eagerly, as `using JosephsonCircuitsOptimizer`
+# did before the backends were loaded on demand.
+#
+#   julia --project=. benchmark/import_time.jl [samples]
+#
+# Every measurement runs in a fresh Julia process (after a warm-up process that precompiles what
+# is missing), so the timings include package loading but not precompilation. The median of
+# `samples` runs (default 3) is printed and written to benchmark/import_time.json.
+# Set JCO_HEADLESS=1 to measure the headless (CairoMakie) mode.
+
+using JSON
+using Statistics: median
+
+const PROJECT = dirname(@__DIR__)
+const SAMPLES = isempty(ARGS) ? 3 : parse(Int, ARGS[1])
+const RESULTS_FILE = joinpath(@__DIR__, "import_time.json")
+
+const PKG = "JosephsonCircuitsOptimizer"
+const EAGER_STACKS = "Plots, KernelDensity, Makie, GLMakie, Surrogates, GaussianProcesses"
+
+const CASES = [
+    "package"                     => "using $PKG",
+    "run_nonlinear_only backends" => "using $PKG\n$PKG.load_stage_backends!(:run_nonlinear_only)",
+    "run_sweep_only backends"     => "using $PKG\n$PKG.load_stage_backends!(:run_sweep_only)",
+    "run backends"                => "using $PKG\n$PKG.load_stage_backends!(:run)",
+    "eager (all stacks)"          => "using $PKG\nusing $EAGER_STACKS",
+]
+
+"Seconds taken by `code` in a fresh Julia process (`nothing` if it failed)."
+function time_in_fresh_process(code::AbstractString)
+    script = "t0 = time()\n$code\nprint(\"JCO_IMPORT_TIME=\", time() - t0)"
+    cmd = `$(Base.julia_cmd()) --project=$PROJECT --startup-file=no -e $script`
+    out = try
+        read(pipeline(cmd; stderr=devnull), String)
+    catch err
+        @warn "Failed: $(replace(code, '\n' => "; ")): $err"
+        return nothing
+    end
+    m = match(r"JCO_IMPORT_TIME=([0-9.eE+-]+)", out)
+    return m === nothing ? nothing : parse(Float64, m.captures[1])
+end
+
+function main()
+    println("Warm-up (precompilation)...")
+    time_in_fresh_process(last(CASES[end]))
+
+    results = Dict{String,Any}()
+    for (name, code) in CASES
+        times = filter(!isnothing, [time_in_fresh_process(code) for _ in 1:SAMPLES])
+        results[name] = isempty(times) ? nothing : median(times)
+        println(rpad(name, 30), isempty(times) ? "failed" : "$(round(median(times), digits=2)) s")
+    end
+
+    package, eager = results["package"], results["eager (all stacks)"]
+    if package !== nothing && eager !== nothing
+        println(rpad("import-time reduction", 30), "$(round(eager - package, digits=2)) s ",
+                "($(round(100 * (1 - package / eager), digits=1)) %)")
+    end
+
+    open(RESULTS_FILE, "w") do io
+        JSON.print(io, Dict("julia_version" => string(VERSION), "samples" => SAMPLES,
+                            "headless" => get(ENV, "JCO_HEADLESS", ""), "median_s" => results), 4)
+    end
+    println("Saved $RESULTS_FILE")
+end
+
+main()
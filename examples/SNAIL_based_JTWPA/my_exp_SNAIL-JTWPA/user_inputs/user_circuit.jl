@@ -16,6 +16,7 @@ function create_user_circuit(device_params_set::Dict)
 
     JJSmallStd = 0.0            #Tra 0.05 e 0.2             # =0 -> perfect fab , 0.1 -> 10% spread
     JJBigStd = 0.0              #Tra 0.05 e 0.2             # =0 -> perfect fab , 0.1 -> 10% spread
+    # realization_rng(seed) = MersenneTwister(seed) in normal runs, per-realization stream in run_yield_analysis
 
     nodePerCell = 4                   # Nodes per cell
     JosephsonCapacitanceDensity = 45  
@@ -55,9 +56,9 @@ function create_user_circuit(device_params_set::Dict)
     push!(circuit,("P$(1)_$(0)","1","0", 1))
     push!(circuit,("R$(1)_$(0)","1","0",Rleft))
 
-    rngSmall1 = MersenneTwister(1);
+    rngSmall1 = realization_rng(1);
     randomSeedSmall1 = 1 + JJSmallStd*randn(rngSmall1, Float64)
-    rngBig1 = MersenneTwister(1);
+    rngBig1 = realization_rng(1);
     randomSeedBig1 = 1 + JJBigStd*randn(rngBig1, Float64)
 
 
@@ -85,9 +86,9 @@ function create_user_circuit(device_params_set::Dict)
 
     for i = 2:N
         
-        local rngSmall = MersenneTwister(i+1);
+        local rngSmall = realization_rng(i+1);
         local randomSeedSmall1 = 1+JJSmallStd*randn(rngSmall, Float64)
-        local rngBig1 = MersenneTwister((i+1)*j+1);
+        local rngBig1 = realization_rng((i+1)*j+1);
         local randomSeedBig1 = 1+JJBigStd*randn(rngBig1, Float64)
 
 
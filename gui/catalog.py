@@ -0,0 +1,321 @@
+"""
+Run-history catalog of a workspace: one SQLite file, `<workspace>/outputs/run_catalog.sqlite`,
+with a row per output folder (entry point, status, duration, best metric/performance, hash of
+the inputs) and the best parameter values, so that hundreds of runs can be sorted and filtered
+with indexed queries instead of opening every folder.
+
+The catalog is a cache of the files written by the runs (simulation_info/status.json,
+run_config.json, optimal_physical_quantities.json): it can be deleted at any time and is
+rebuilt by `RunCatalog.update()`. Only folders whose files changed since the last update are
+read again. Stdlib only, like jco.py.
+"""
+import calendar
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+CATALOG_FILE = "run_catalog.sqlite"
+CATALOG_VERSION = 1
+RUN_PREFIX = "output_"
+
+# Columns of `RunCatalog.query` results (and allowed sort keys)
+RUN_COLUMNS = ("run_id", "path", "entry_point", "status", "stage", "started_unix", "finished_unix",
+               "duration_s", "best_metric", "best_performance", "n_evaluations", "inputs_hash",
+               "message")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    entry_point TEXT,
+    status TEXT,
+    stage TEXT,
+    started_unix REAL,
+    finished_unix REAL,
+    duration_s REAL,
+    best_metric REAL,
+    best_performance REAL,
+    n_evaluations INTEGER,
+    inputs_hash TEXT,
+    message TEXT,
+    signature TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_status ON runs(status);
+CREATE INDEX IF NOT EXISTS runs_entry_point ON runs(entry_point);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started_unix);
+CREATE INDEX IF NOT EXISTS runs_best_metric ON runs(best_metric);
+CREATE INDEX IF NOT EXISTS runs_inputs_hash ON runs(inputs_hash);
+CREATE TABLE IF NOT EXISTS params (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS params_name_value ON params(name, value);
+CREATE TABLE IF NOT EXISTS inputs (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    file TEXT NOT NULL,
+    sha256 TEXT,
+    PRIMARY KEY (run_id, file)
+);
+CREATE INDEX IF NOT EXISTS inputs_sha256 ON inputs(sha256);
+INSERT OR IGNORE INTO meta VALUES ('version', '{CATALOG_VERSION}');
+"""
+
+
+# ----------------------------------------- reading a run -----------------------------------------
+
+def _run_file(run_path, name):
+    """`simulation_info/<name>`, or `<name>` at the top of the folder (runs before simulation_info/)."""
+    p = os.path.join(run_path, "simulation_info", name)
+    return p if os.path.isfile(p) else os.path.join(run_path, name)
+
+
+def _load_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _signature(run_path):
+    """Changes whenever one of the files read by `read_run` changes."""
+    return ":".join(str(_mtime_ns(p)) for p in (
+        _run_file(run_path, "status.json"),
+        _run_file(run_path, "run_config.json"),
+        os.path.join(run_path, "optimal_physical_quantities.json"),
+    ))
+
+
+def _utc_to_unix(text):
+    if not isinstance(text, str):
+        return None
+    for fmt in ("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return float(calendar.timegm(time.strptime(text, fmt)))
+        except ValueError:
+            pass
+    return None
+
+
+def _started_unix(run_id):
+    """Start time from the folder name (output_yyyy-mm-dd_HH-MM-SS, local time)."""
+    try:
+        return time.mktime(time.strptime(run_id[len(RUN_PREFIX):], "%Y-%m-%d_%H-%M-%S"))
+    except ValueError:
+        return None
+
+
+def _number(x):
+    if isinstance(x, bool) or not isinstance(x, (int, float)):
+        return None
+    return float(x) if x == x else None  # NaN -> NULL
+
+
+def _input_hashes(inputs_files):
+    """{file: sha256} from the `inputs_files` of run_config.json (a list for old runs)."""
+    if not isinstance(inputs_files, dict):
+        return {}
+    return {name: meta.get("sha256") if isinstance(meta, dict) else None
+            for name, meta in inputs_files.items()}
+
+
+def read_run(run_path, entry_point=None):
+    """Catalog row of one output folder: `(run, params, inputs)`.
+
+    `entry_point` is used when run_config.json does not record it (runs that are still going,
+    or made before it was recorded).
+    """
+    run_path = os.path.abspath(run_path).replace("\\", "/")
+    run_id = os.path.basename(run_path)
+    status = _load_json(_run_file(run_path, "status.json")) or {}
+    config = _load_json(_run_file(run_path, "run_config.json")) or {}
+    results = config.get("results") if isinstance(config.get("results"), dict) else {}
+    history = results.get("evaluation_history") if isinstance(results.get("evaluation_history"), dict) else {}
+
+    best_performance = None
+    optimal = _load_json(os.path.join(run_path, "optimal_physical_quantities.json"))
+    if isinstance(optimal, dict) and isinstance(optimal.get("header"), dict):
+        best_performance = _number(optimal["header"].get("optimal_performance"))
+
+    best_metric = _number(results.get("best_metric"))
+    if best_metric is None:
+        best_metric = _number(history.get("best_metric"))
+
+    started = _started_unix(run_id)
+    finished = None
+    if status.get("status") not in (None, "running"):
+        finished = _utc_to_unix(status.get("timestamp_utc")) or _utc_to_unix(config.get("created_at_utc"))
+    duration = finished - started if started is not None and finished is not None else None
+    if duration is not None and duration < 0:  # folder made on a machine in another time zone
+        duration = None
+
+    inputs = _input_hashes(config.get("inputs_files"))
+    inputs_hash = None
+    if inputs and all(inputs.values()):
+        h = hashlib.sha256()
+        for name in sorted(inputs):
+            h.update(f"{name}:{inputs[name]}\n".encode("utf-8"))
+        inputs_hash = h.hexdigest()
+
+    run = {
+        "run_id": run_id,
+        "path": run_path,
+        "entry_point": config.get("entry_point") or entry_point,
+        "status": status.get("status"),
+        "stage": status.get("stage"),
+        "started_unix": started,
+        "finished_unix": finished,
+        "duration_s": duration,
+        "best_metric": best_metric,
+        "best_performance": best_performance,
+        "n_evaluations": history.get("n_evaluations"),
+        "inputs_hash": inputs_hash,
+        "message": status.get("message"),
+    }
+    best_params = results.get("best_device_parameters")
+    params = {}
+    if isinstance(best_params, dict):
+        params = {str(k): _number(v) for k, v in best_params.items() if _number(v) is not None}
+    return run, params, inputs
+
+
+# ----------------------------------------- catalog -----------------------------------------
+
+class RunCatalog:
+    """SQLite catalog of the output folders of one workspace.
+
+    Each method opens its own connection, so a catalog can be used from the GUI thread and
+    from the job reader threads at the same time (SQLite serialises the writers).
+    """
+
+    def __init__(self, workspace):
+        self.workspace = os.path.abspath(workspace).replace("\\", "/")
+        self.outputs_dir = os.path.join(self.workspace, "outputs")
+        self.path = os.path.join(self.outputs_dir, CATALOG_FILE)
+
+    def _connect(self):
+        os.makedirs(self.outputs_dir, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _run_dirs(self):
+        try:
+            with os.scandir(self.outputs_dir) as it:
+                return [e.path for e in it if e.name.startswith(RUN_PREFIX) and e.is_dir()]
+        except OSError:
+            return []
+
+    def update(self, run_paths=None, entry_point=None):
+        """Bring the catalog up to date. Returns the number of rows added, changed or removed.
+
+        Without `run_paths` the whole outputs folder is scanned (folders that were deleted are
+        dropped); with `run_paths` only those folders are (re)indexed, e.g. when a job finishes.
+        """
+        full_scan = run_paths is None
+        paths = self._run_dirs() if full_scan else [p for p in run_paths if p and os.path.isdir(p)]
+
+        with closing(self._connect()) as conn, conn:
+            known = dict(conn.execute("SELECT run_id, signature FROM runs").fetchall())
+            changed = 0
+            for p in paths:
+                run_id = os.path.basename(os.path.normpath(p))
+                sig = _signature(p)
+                if known.pop(run_id, None) == sig:
+                    continue
+                run, params, inputs = read_run(p, entry_point=entry_point)
+                conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+                conn.execute(
+                    f"INSERT INTO runs ({', '.join(RUN_COLUMNS)}, signature) "
+                    f"VALUES ({', '.join('?' * (len(RUN_COLUMNS) + 1))})",
+                    [run[c] for c in RUN_COLUMNS] + [sig])
+                conn.executemany("INSERT INTO params VALUES (?, ?, ?)",
+                                 [(run_id, k, v) for k, v in params.items()])
+                conn.executemany("INSERT INTO inputs VALUES (?, ?, ?)",
+                                 [(run_id, k, v) for k, v in inputs.items()])
+                changed += 1
+            if full_scan and known:
+                conn.executemany("DELETE FROM runs WHERE run_id = ?", [(r,) for r in known])
+                changed += len(known)
+        return changed
+
+    def query(self, status=None, entry_point=None, text="", param=None, param_min=None,
+              param_max=None, inputs_hash=None, order_by="started_unix", descending=True, limit=1000):
+        """Rows of the catalog (dicts with RUN_COLUMNS, plus `param_value` if `param` is given).
+
+        Filters are combined with AND: `status`/`entry_point`/`inputs_hash` are exact matches,
+        `text` a substring of the run id or message, and `param_min`/`param_max` bound the best
+        value of the parameter `param`. `order_by` is one of RUN_COLUMNS or "param_value".
+        """
+        where, args = [], []
+        if status:
+            where.append("r.status = ?")
+            args.append(status)
+        if entry_point:
+            where.append("r.entry_point = ?")
+            args.append(entry_point)
+        if inputs_hash:
+            where.append("r.inputs_hash = ?")
+            args.append(inputs_hash)
+        if text:
+            where.append("(r.run_id LIKE ? OR r.message LIKE ?)")
+            args += [f"%{text}%"] * 2
+        join = ""
+        if param:
+            join = "LEFT JOIN params p ON p.run_id = r.run_id AND p.name = ?"
+            args.insert(0, param)
+            if param_min is not None:
+                where.append("p.value >= ?")
+                args.append(float(param_min))
+            if param_max is not None:
+                where.append("p.value <= ?")
+                args.append(float(param_max))
+
+        if order_by not in RUN_COLUMNS and not (param and order_by == "param_value"):
+            raise ValueError(f"Unknown sort column: {order_by}")
+        order = "p.value" if order_by == "param_value" else f"r.{order_by}"
+        # NULLs last in both directions
+        sql = (f"SELECT r.*{', p.value AS param_value' if param else ''} FROM runs r {join}"
+               f"{' WHERE ' + ' AND '.join(where) if where else ''}"
+               f" ORDER BY {order} IS NULL, {order} {'DESC' if descending else 'ASC'} LIMIT ?")
+        args.append(int(limit))
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, args).fetchall()
+        return [{k: row[k] for k in row.keys() if k != "signature"} for row in rows]
+
+    def distinct(self, column):
+        """Distinct non-empty values of `status`, `entry_point` or `inputs_hash`."""
+        if column not in ("status", "entry_point", "inputs_hash"):
+            raise ValueError(f"Unknown column: {column}")
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT DISTINCT {column} FROM runs WHERE {column} IS NOT NULL "
+                                f"ORDER BY {column}").fetchall()
+        return [r[0] for r in rows]
+
+    def param_names(self):
+        with closing(self._connect()) as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT name FROM params ORDER BY name")]
+
+
+def update_run_catalog(workspace, run_paths=None, entry_point=None):
+    """Best-effort `RunCatalog(workspace).update(...)` (returns None if the catalog is unusable)."""
+    try:
+        return RunCatalog(workspace).update(run_paths, entry_point=entry_point)
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,120 @@
+"""
+Incremental reader of `simulation_info/evaluations.jsonl`, the evaluation log appended by Julia
+after every cost evaluation (see `record_evaluation!` in src/CostModule.jl). Each `poll()` reads
+only the bytes added since the previous one and updates the convergence statistics shown by
+the GUI dashboard (best-so-far curve, throughput, per-stage timings). Stdlib only.
+"""
+import json
+import math
+import os
+
+EVALUATIONS_FILE = "evaluations.jsonl"
+PENALTY_THRESHOLD = 9e7  # metrics at or above this are penalties (mask / watchdog), not results
+THROUGHPUT_WINDOW_S = 300.0
+
+
+def evaluations_path(run_path):
+    return os.path.join(run_path, "simulation_info", EVALUATIONS_FILE)
+
+
+def _finite(x):
+    return isinstance(x, (int, float)) and not isinstance(x, bool) and math.isfinite(x)
+
+
+class EvaluationLog:
+    """Tail of one evaluations.jsonl file and the statistics derived from it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.reset()
+
+    def reset(self):
+        self._offset = 0
+        self._partial = b""
+        self.param_names = []
+        self.index = []      # evaluation index
+        self.times = []      # unix time
+        self.metrics = []    # metric (None for penalties / non-finite values)
+        self.best = []       # best-so-far metric (None until the first valid one)
+        self.best_params = None
+        self.stages = {}     # stage -> {"n", "wall_s", "first_t", "last_t"}
+
+    def poll(self):
+        """Read the lines appended since the last call. Returns the number of new evaluations."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        if size < self._offset:  # file replaced (new run in the same folder): start over
+            self.reset()
+        if size == self._offset:
+            return 0
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = self._partial + f.read(size - self._offset)
+        self._offset = size
+
+        lines = data.split(b"\n")
+        self._partial = lines.pop()  # incomplete last line (still being written)
+        n = 0
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(rec, dict):
+                continue
+            if "param_names" in rec:
+                self.param_names = list(rec["param_names"])
+            elif "i" in rec:
+                self._add(rec)
+                n += 1
+        return n
+
+    def _add(self, rec):
+        metric = rec.get("metric")
+        valid = _finite(metric) and metric < PENALTY_THRESHOLD
+        previous = self.best[-1] if self.best else None
+        best = previous
+        if valid and (previous is None or metric < previous):
+            best = metric
+            self.best_params = rec.get("params")
+        t = rec.get("t") if _finite(rec.get("t")) else None
+
+        self.index.append(rec["i"])
+        self.times.append(t)
+        self.metrics.append(metric if valid else None)
+        self.best.append(best)
+
+        st = self.stages.setdefault(rec.get("stage") or "?", {"n": 0, "wall_s": 0.0, "first_t": t, "last_t": t})
+        st["n"] += 1
+        if _finite(rec.get("wall_time_s")):
+            st["wall_s"] += rec["wall_time_s"]
+        if t is not None:
+            st["first_t"] = t if st["first_t"] is None else st["first_t"]
+            st["last_t"] = t
+
+    @property
+    def n_evaluations(self):
+        return len(self.index)
+
+    @property
+    def n_penalties(self):
+        return sum(m is None for m in self.metrics)
+
+    def throughput_per_min(self, window_s=THROUGHPUT_WINDOW_S):
+        """Evaluations per minute over the last `window_s` seconds of the log (None if unknown)."""
+        times = [t for t in self.times if t is not None]
+        if len(times) < 2:
+            return None
+        recent = [t for t in times if t >= times[-1] - window_s]
+        span = recent[-1] - recent[0]
+        return 60.0 * (len(recent) - 1) / span if span > 0 else None
+
+    def best_params_dict(self):
+        if self.best_params is None:
+            return {}
+        names = self.param_names if len(self.param_names) == len(self.best_params) else \
+            [f"p{i + 1}" for i in range(len(self.best_params))]
+        return dict(zip(names, self.best_params))
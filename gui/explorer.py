@@ -0,0 +1,317 @@
+"""
+Dataset explorer: interactive views of the sweep datasets written by Julia
+(`df_uniform_analysis.h5`, `df_nonlinear_analysis*.h5`), read directly with h5py.
+
+Julia writes each table as a (rows × columns) matrix, which h5py sees transposed
+(columns × rows), so columns are read one at a time and only when a view needs them.
+The uniform datasets are chunked per column (blocks of rows of one column, see
+`_write_column_chunked` in src/simulator.jl): reading a column reads only its own chunks.
+Contiguous, uncompressed datasets (nonlinear datasets, older runs) are memory-mapped.
+Scatter plots and correlations are computed on an evenly strided subset of the rows for
+large tables (MAX_SCATTER_POINTS / MAX_CORR_ROWS); histograms use every row.
+
+Needs h5py, numpy and matplotlib (gui/requirements.txt).
+"""
+import math
+import os
+import time
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import filedialog, ttk
+
+import h5py
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.figure import Figure
+
+# (column names, {table label: matrix}) of the datasets written by save_dataset / save_nonlinear_dataset
+DATASET_LAYOUTS = (
+    ("df_column_names", (("filtered", "df_filtered_matrix"), ("all", "df_matrix"))),
+    ("df_nonlinear_column_names", (("converged", "df_nonlinear_conveging_results_matrix"),
+                                   ("all", "df_nonlinear_matrix"))),
+)
+DATASET_FILES = ("df_uniform_analysis.h5", "df_nonlinear_analysis.h5")
+
+MAX_SCATTER_POINTS = 50_000
+MAX_CORR_ROWS = 200_000
+COLUMN_CACHE_SIZE = 32
+VIEWS = ("Scatter", "Marginal", "Correlation")
+
+
+def _decode(names):
+    return [n.decode("utf-8") if isinstance(n, bytes) else str(n) for n in names]
+
+
+def stride_for(n_rows, max_rows):
+    """Step of the evenly strided subset with at most `max_rows` of `n_rows` rows."""
+    return max(math.ceil(n_rows / max_rows), 1) if max_rows else 1
+
+
+class H5Dataset:
+    """Lazy column access to one dataset file (`tables`: label -> matrix with `names` columns)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = h5py.File(path, "r")
+        self._cache = OrderedDict()
+        self._arrays = {}
+
+        for names_key, tables in DATASET_LAYOUTS:
+            if names_key in self._file:
+                self.names = _decode(self._file[names_key][()])
+                self.tables = OrderedDict((label, key) for label, key in tables if key in self._file)
+                break
+        else:
+            self._file.close()
+            raise ValueError(f"{os.path.basename(path)} is not a JCO dataset (no column names)")
+        if not self.tables:
+            self._file.close()
+            raise ValueError(f"{os.path.basename(path)} contains no data matrix")
+
+    def close(self):
+        self._cache.clear()
+        self._arrays.clear()
+        self._file.close()
+
+    def _array(self, table):
+        """(columns × rows) array-like of `table`: a memmap when possible, else the h5py dataset."""
+        if table not in self._arrays:
+            ds = self._file[self.tables[table]]
+            if ds.ndim != 2 or ds.shape[0] != len(self.names):
+                raise ValueError(f"{self.tables[table]}: shape {ds.shape} does not match the column names")
+            arr = ds
+            offset = ds.id.get_offset()
+            if ds.chunks is None and ds.compression is None and offset is not None and ds.size:
+                arr = np.memmap(self.path, dtype=ds.dtype, mode="r", offset=offset, shape=ds.shape)
+            self._arrays[table] = arr
+        return self._arrays[table]
+
+    def n_rows(self, table):
+        shape = self._file[self.tables[table]].shape
+        return shape[1] if len(shape) == 2 else 0
+
+    def column(self, table, name, step=1):
+        """Column `name` of `table` (every `step`-th row) as a float64 array."""
+        key = (table, name, step)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        j = self.names.index(name)
+        values = np.asarray(self._array(table)[j, ::step], dtype=np.float64)
+        self._cache[key] = values
+        if len(self._cache) > COLUMN_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return values
+
+    def correlation(self, table, names, max_rows=MAX_CORR_ROWS):
+        """Pearson correlation matrix of `names` on the rows where every column is finite.
+
+        Constant columns have no correlation (NaN). Returns `(matrix, rows used)`.
+        """
+        step = stride_for(self.n_rows(table), max_rows)
+        data = np.vstack([self.column(table, n, step) for n in names])
+        data = data[:, np.isfinite(data).all(axis=0)]
+        if data.shape[1] < 2:
+            return np.full((len(names), len(names)), np.nan), data.shape[1]
+        centered = data - data.mean(axis=1, keepdims=True)
+        norms = np.sqrt((centered ** 2).sum(axis=1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = (centered @ centered.T) / np.outer(norms, norms)
+        return np.clip(corr, -1.0, 1.0), data.shape[1]
+
+
+def find_datasets(run_path):
+    """Dataset files of a run folder (uniform first, then nonlinear ones)."""
+    try:
+        files = sorted(f for f in os.listdir(run_path) if f.endswith(".h5"))
+    except OSError:
+        return []
+    ordered = [f for f in DATASET_FILES if f in files] + [
+        f for f in files if f.startswith("df_nonlinear_analysis") and f not in DATASET_FILES]
+    return [os.path.join(run_path, f) for f in ordered]
+
+
+class DatasetExplorer(tk.Toplevel):
+    """Window with scatter / marginal / correlation views of one dataset file."""
+
+    def __init__(self, master, initial_dir, colors, on_close=None):
+        super().__init__(master)
+        self.title("Dataset Explorer")
+        self.configure(bg=colors['bg'])
+        self.initial_dir = initial_dir
+        self.on_close = on_close
+        self.dataset = None
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        bg, fg = colors['bg'], colors['text']
+        top = tk.Frame(self, bg=bg)
+        top.pack(fill='x', padx=10, pady=(10, 4))
+        ttk.Button(top, text="Open dataset…", command=self.browse,
+                   style="Primary.TButton").pack(side='left', padx=(0, 6))
+        self.file_label = tk.Label(top, text="No dataset", bg=bg, fg=fg, anchor='w')
+        self.file_label.pack(side='left', fill='x', expand=True)
+
+        controls = tk.Frame(self, bg=bg)
+        controls.pack(fill='x', padx=10, pady=4)
+        self.table_var = tk.StringVar(master=self)
+        self.view_var = tk.StringVar(master=self, value=VIEWS[0])
+        self.x_var = tk.StringVar(master=self)
+        self.y_var = tk.StringVar(master=self)
+        self.color_var = tk.StringVar(master=self)
+        self.logx_var = tk.BooleanVar(master=self, value=False)
+        self.logy_var = tk.BooleanVar(master=self, value=False)
+
+        self.combos = {}
+        for label, var, width in (("Table", self.table_var, 10), ("View", self.view_var, 11),
+                                  ("X", self.x_var, 20), ("Y", self.y_var, 20),
+                                  ("Color", self.color_var, 20)):
+            tk.Label(controls, text=label + ":", bg=bg, fg=fg).pack(side='left', padx=(0, 4))
+            combo = ttk.Combobox(controls, textvariable=var, state="readonly", width=width)
+            combo.pack(side='left', padx=(0, 8))
+            combo.bind("<<ComboboxSelected>>", lambda e: self.redraw())
+            self.combos[label] = combo
+        self.combos["View"].config(values=VIEWS)
+        for text, var in (("log x", self.logx_var), ("log y", self.logy_var)):
+            tk.Checkbutton(controls, text=text, variable=var, command=self.redraw,
+                           bg=bg, fg=fg).pack(side='left')
+
+        self.figure = Figure(figsize=(7, 5), dpi=100)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        toolbar = NavigationToolbar2Tk(self.canvas, self, pack_toolbar=False)
+        toolbar.update()
+        toolbar.pack(side='bottom', fill='x')
+        self.info_label = tk.Label(self, text="", bg=bg, fg=fg, anchor='w')
+        self.info_label.pack(side='bottom', fill='x', padx=10)
+        self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=10)
+
+    # --- dataset ---
+    def browse(self):
+        path = filedialog.askopenfilename(parent=self, title="Select dataset",
+                                          initialdir=self.initial_dir,
+                                          filetypes=[("HDF5 datasets", "*.h5"), ("All files", "*")])
+        if path:
+            self.open(path)
+
+    def open(self, path):
+        try:
+            dataset = H5Dataset(path)
+        except (OSError, ValueError) as e:
+            self.info_label.config(text=f"Could not open {path}: {e}")
+            return False
+        if self.dataset is not None:
+            self.dataset.close()
+        self.dataset = dataset
+        self.initial_dir = os.path.dirname(path)
+        self.file_label.config(text=path)
+
+        names = dataset.names
+        self.combos["Table"].config(values=list(dataset.tables))
+        for label in ("X", "Y"):
+            self.combos[label].config(values=names)
+        self.combos["Color"].config(values=[""] + names)
+        if self.table_var.get() not in dataset.tables:
+            self.table_var.set(next(iter(dataset.tables)))
+        if self.x_var.get() not in names:
+            self.x_var.set(names[0])
+        if self.y_var.get() not in names:
+            self.y_var.set(names[-1])
+        if self.color_var.get() not in names:
+            self.color_var.set("")
+        self.redraw()
+        return True
+
+    def reload_if(self, path):
+        """Re-open the current dataset if `path` is that file (it was rewritten by a run)."""
+        if self.dataset is not None and os.path.normcase(os.path.abspath(path)) == \
+                os.path.normcase(os.path.abspath(self.dataset.path)):
+            self.open(self.dataset.path)
+
+    def close(self):
+        if self.dataset is not None:
+            self.dataset.close()
+            self.dataset = None
+        self.destroy()
+        if self.on_close is not None:
+            self.on_close()
+
+    # --- views ---
+    def redraw(self):
+        if self.dataset is None:
+            return
+        t0 = time.perf_counter()
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+        view = self.view_var.get()
+        try:
+            if view == "Scatter":
+                info = self._scatter(ax)
+            elif view == "Marginal":
+                info = self._marginal(ax)
+            else:
+                info = self._correlation(ax)
+        except Exception as e:
+            info = f"Could not draw the {view.lower()} view: {e}"
+        self.canvas.draw_idle()
+        self.info_label.config(text=f"{info}  ({1000 * (time.perf_counter() - t0):.0f} ms)")
+
+    def _axes_scales(self, ax, x_log=True, y_log=True):
+        if x_log and self.logx_var.get():
+            ax.set_xscale("log")
+        if y_log and self.logy_var.get():
+            ax.set_yscale("log")
+
+    def _scatter(self, ax):
+        ds, table = self.dataset, self.table_var.get()
+        n = ds.n_rows(table)
+        step = stride_for(n, MAX_SCATTER_POINTS)
+        x = ds.column(table, self.x_var.get(), step)
+        y = ds.column(table, self.y_var.get(), step)
+        color = self.color_var.get()
+        c = ds.column(table, color, step) if color else None
+        ok = np.isfinite(x) & np.isfinite(y) & (np.isfinite(c) if c is not None else True)
+
+        if c is not None:
+            sc = ax.scatter(x[ok], y[ok], c=c[ok], s=6, cmap="viridis", linewidths=0)
+            self.figure.colorbar(sc, ax=ax, label=color)
+        else:
+            ax.scatter(x[ok], y[ok], s=6, linewidths=0)
+        ax.set_xlabel(self.x_var.get())
+        ax.set_ylabel(self.y_var.get())
+        self._axes_scales(ax)
+        shown = int(ok.sum())
+        return f"{shown} of {n} rows" + (f" (every {step}th row)" if step > 1 else "")
+
+    def _marginal(self, ax):
+        ds, table = self.dataset, self.table_var.get()
+        x = ds.column(table, self.x_var.get())
+        x = x[np.isfinite(x)]
+        if self.logx_var.get():
+            x = x[x > 0]
+            bins = np.logspace(np.log10(x.min()), np.log10(x.max()), 50) if x.size else 50
+        else:
+            bins = "auto" if x.size < 1_000_000 else 200
+        ax.hist(x, bins=bins, color="#3498DB")
+        ax.set_xlabel(self.x_var.get())
+        ax.set_ylabel("rows")
+        self._axes_scales(ax)
+        if x.size:
+            return (f"{x.size} rows, mean {x.mean():.6g}, median {np.median(x):.6g}, "
+                    f"min {x.min():.6g}, max {x.max():.6g}")
+        return "no finite values"
+
+    def _correlation(self, ax):
+        ds, table = self.dataset, self.table_var.get()
+        names = ds.names
+        corr, used = ds.correlation(table, names)
+        im = ax.imshow(corr, cmap="RdBu_r", vmin=-1, vmax=1)
+        ax.set_xticks(range(len(names)), names, rotation=60, ha="right", fontsize=8)
+        ax.set_yticks(range(len(names)), names, fontsize=8)
+        if len(names) <= 16:
+            for i in range(len(names)):
+                for j in range(len(names)):
+                    if np.isfinite(corr[i, j]):
+                        ax.text(j, i, f"{corr[i, j]:.2f}", ha="center", va="center", fontsize=7)
+        self.figure.colorbar(im, ax=ax)
+        self.figure.tight_layout()
+        step = stride_for(ds.n_rows(table), MAX_CORR_ROWS)
+        return f"{used} complete rows" + (f" (every {step}th row)" if step > 1 else "")
@@ -0,0 +1,701 @@
+"""
+Launching Julia runs without a display: one `JuliaJob` per Julia process and a `JobQueue` that
+schedules several jobs at once. Used by the GUI (pygui.py) and by the `jco` command line:
+
+    jco run WORKSPACE [WORKSPACE ...] [-j 2] [--threads 8] [--julia PATH]
+    jco sweep | opt | hb | from-dataset | yield | plan | calibrate | seed WORKSPACE ...
+
+Each job gets its own log buffer, event channel (JCO_EVENTS, see src/Events.jl), progress,
+STOP file (inside its workspace) and status (simulation_info/status.json of its output folder).
+When a job exits, its output folder is added to the run catalog of the workspace (catalog.py).
+The core budget from <repo>/threads.txt is split across the jobs running at the same time
+through JULIA_NUM_THREADS; the BLAS threads and CPU affinity of the execution profile of the
+workspace (execution_profile.json) are applied to every launch.
+
+Exit codes of the command line: 0 all jobs finished, 1 some job failed, 2 usage error,
+3 some job was stopped (STOP file), 130 interrupted with Ctrl-C.
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+from catalog import update_run_catalog
+
+PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")).replace("\\", "/")
+SRC_PATH = os.path.join(PROJECT_PATH, "src").replace("\\", "/")
+QUEUE_FILE = os.path.join(PROJECT_PATH, "gui_job_queue.json")
+RUN_PLAN_FILE = "run_plan.json"  # written by plan_run in <workspace>/outputs/
+EXECUTION_PROFILE_FILE = "execution_profile.json"  # <workspace>/, see src/execution.jl
+
+ENTRY_POINTS = (
+    "run",
+    "run_sweep_only",
+    "run_from_latest_dataset_only",
+    "run_optimization_only",
+    "run_nonlinear_only",
+    "run_yield_analysis",
+    "plan_run",
+    "calibrate_execution_profile",
+    "seed_next_run_from_latest!",
+)
+
+# Command line names
+COMMANDS = {
+    "run": "run",
+    "sweep": "run_sweep_only",
+    "from-dataset": "run_from_latest_dataset_only",
+    "opt": "run_optimization_only",
+    "hb": "run_nonlinear_only",
+    "yield": "run_yield_analysis",
+    "plan": "plan_run",
+    "calibrate": "calibrate_execution_profile",
+    "seed": "seed_next_run_from_latest!",
+}
+
+EVENTS_VERSION = 1
+STOP_KILL_TIMEOUT_S = 5  # fallback hard-kill if Julia doesn't exit
+JOB_LOG_LINES = 5000
+
+# Job states
+QUEUED, RUNNING, FINISHED, FAILED, STOPPED, INTERRUPTED = (
+    "queued", "running", "finished", "failed", "stopped", "interrupted")
+DONE_STATES = (FINISHED, FAILED, STOPPED, INTERRUPTED)
+
+
+def read_repo_threads(default: int = 1) -> int:
+    """Core budget from <repo>/threads.txt (an integer), else `default`."""
+    threads_file = os.path.join(PROJECT_PATH, "threads.txt")
+    if os.path.isfile(threads_file):
+        try:
+            with open(threads_file, "r", encoding="utf-8") as f:
+                n = int(f.read().strip())
+            if n >= 1:
+                return n
+        except Exception:
+            pass
+    return default
+
+
+def read_execution_profile(workspace) -> dict:
+    """`<workspace>/execution_profile.json` (threads, BLAS threads, workers, CPU affinity), else {}."""
+    try:
+        with open(os.path.join(workspace, EXECUTION_PROFILE_FILE), "r", encoding="utf-8") as f:
+            profile = json.load(f)
+        return profile if isinstance(profile, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def default_threads(workspace=None) -> int:
+    """Threads of a single run: julia_threads of the execution profile of `workspace`, else
+    threads.txt, else JULIA_NUM_THREADS, else 1."""
+    if workspace:
+        n = read_execution_profile(workspace).get("julia_threads")
+        if isinstance(n, int) and n >= 1:
+            return n
+    env_threads = os.environ.get("JULIA_NUM_THREADS", "")
+    return read_repo_threads(default=int(env_threads) if env_threads.isdigit() else 1)
+
+
+def _affinity_setter(cpus):
+    """`preexec_fn` pinning the child process (and all its threads) to `cpus` (Linux only)."""
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return None
+    cpus = {int(c) for c in cpus}
+    return lambda: os.sched_setaffinity(0, cpus)
+
+
+def _julia_literal(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return f'raw"{value}"'
+
+
+def julia_code(entry_point: str, workspace: str, options=None) -> str:
+    """`julia -e` snippet running `entry_point` on `workspace` (`options`: extra keyword arguments)."""
+    if entry_point not in ENTRY_POINTS:
+        raise ValueError(f"Unknown entry point: {entry_point}")
+    kwargs = f'workspace=raw"{workspace}"'
+    if entry_point != "seed_next_run_from_latest!":
+        kwargs += ", create_workspace=true"
+    for name, value in sorted((options or {}).items()):
+        kwargs += f", {name}={_julia_literal(value)}"
+    return f'''
+    using Pkg
+    Pkg.activate("{PROJECT_PATH}")
+    push!(LOAD_PATH, "{SRC_PATH}")
+    using JosephsonCircuitsOptimizer
+    JosephsonCircuitsOptimizer.{entry_point}({kwargs})
+    '''
+
+
+def read_run_plan(workspace):
+    """The last plan written by `plan_run` for `workspace` (a dict), or None."""
+    try:
+        with open(os.path.join(workspace, "outputs", RUN_PLAN_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def format_run_plan(plan):
+    """Short text summary of a run plan (list of lines)."""
+    lines = [f"Plan for {plan.get('entry_point')}: {plan.get('total_points')} points, "
+             f"{plan.get('wall_time') or 'unknown time'} with {plan.get('threads')} threads, "
+             f"peak memory ~{round((plan.get('memory_mb') or {}).get('peak') or 0)} MB"]
+    for st in plan.get("stages", []):
+        name = st["stage"] if not st.get("cycle") else f"{st['stage']} #{st['cycle']}"
+        wall = st.get("wall_time_s")
+        lines.append(f"  {name}: {st['points']} points"
+                     + (f", {format_duration(wall)}" if wall is not None else "")
+                     + (f" ({st['concurrency']} in parallel)" if st.get("concurrency", 1) > 1 else ""))
+    lines += [f"  WARNING: {w}" for w in plan.get("warnings", [])]
+    return lines
+
+
+def format_eta(seconds) -> str:
+    try:
+        if seconds is None or seconds < 0 or seconds != seconds:  # NaN or negative
+            return "—"
+        seconds = int(round(seconds))
+        m = seconds // 60
+        s = seconds % 60
+        if m > 0:
+            return f"{m}m {s:02d}s"
+        return f"{s}s"
+    except Exception:
+        return "—"
+
+
+def format_duration(seconds) -> str:
+    """`<d>d <h>h <m>m <s>s`, as `format_duration` in src/utils.jl."""
+    seconds = int(round(seconds))
+    return f"{seconds // 86400}d {seconds % 86400 // 3600}h {seconds % 3600 // 60}m {seconds % 60}s"
+
+
+def parse_progress_line(line: str):
+    """Event dict for the stdout progress protocol of runs without an event channel
+    (`STAGE name=..`, `PROGRESS i=.. N=.. [ETA=..s] stage=..`, `PROGRESS_DONE stage=..`), else None."""
+    if line.startswith("STAGE"):
+        return {"type": "stage", "stage": line.split("name=", 1)[1].strip() if "name=" in line else "—"}
+    if line.startswith("PROGRESS_DONE"):
+        return {"type": "stage_done", "stage": line.split("stage=", 1)[1].strip() if "stage=" in line else "—"}
+    if line.startswith("PROGRESS"):
+        parts = {}
+        for token in line[len("PROGRESS"):].split():
+            if "=" in token:
+                k, v = token.split("=", 1)
+                parts[k] = v
+        try:
+            return {"type": "progress", "stage": parts.get("stage", "—"),
+                    "i": int(parts.get("i", "0")), "N": int(parts.get("N", "0")),
+                    "eta_s": float(parts["ETA"].rstrip("s")) if "ETA" in parts else None}
+        except ValueError:
+            return None
+    return None
+
+
+def latest_snapshot_sources(ws):
+    """
+    Return {filename: blob_path} for the input snapshot of the latest run, read from
+    simulation_info/inputs_manifest.json (content-addressed outputs/snapshot_store/).
+    Returns None for legacy runs that only have an inputs_snapshot/ folder.
+    """
+    latest_ptr = os.path.join(ws, "outputs", "LATEST.txt")
+    if not os.path.isfile(latest_ptr):
+        raise FileNotFoundError("No LATEST.txt found in outputs. Run something first.")
+    with open(latest_ptr, "r", encoding="utf-8") as f:
+        run_folder = os.path.normpath(f.read().strip())
+
+    manifest_path = os.path.join(run_folder, "simulation_info", "inputs_manifest.json")
+    if not os.path.isfile(manifest_path):
+        return None
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    store = os.path.normpath(os.path.join(run_folder, manifest.get("store", os.path.join("..", "snapshot_store"))))
+
+    sources = {}
+    for name, meta in manifest.get("files", {}).items():
+        if not isinstance(meta, dict):  # "copy_failed"
+            continue
+        h = meta["sha256"]
+        blob = os.path.join(store, "blobs", h[:2], h)
+        if not os.path.isfile(blob):
+            raise FileNotFoundError(f"Snapshot blob for {name} not found at: {blob}")
+        sources[name] = blob
+    return sources
+
+
+def restore_snapshot(ws, sources, overwrite=False):
+    """Copy the snapshot files returned by `latest_snapshot_sources` into ws/user_inputs.
+
+    Existing files are kept unless `overwrite` (the GUI and `jco seed` ask for it explicitly).
+    Returns the lists of copied and skipped file names.
+    """
+    user_inputs = os.path.join(ws, "user_inputs")
+    os.makedirs(user_inputs, exist_ok=True)
+    copied, skipped = [], []
+    for name, blob in sorted(sources.items()):
+        dst = os.path.join(user_inputs, name)
+        if os.path.exists(dst) and not overwrite:
+            skipped.append(name)
+            continue
+        shutil.copyfile(blob, dst)
+        copied.append(name)
+    return copied, skipped
+
+
+def read_status(output_path):
+    """Content of `<output_path>/simulation_info/status.json`, or None."""
+    if not output_path:
+        return None
+    try:
+        with open(os.path.join(output_path, "simulation_info", "status.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class EventServer:
+    """Local socket receiving the JSON-lines events of one Julia process (and its workers)."""
+
+    def __init__(self, on_event):
+        self.on_event = on_event
+        self.connected = False
+        self._srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._srv.bind(("127.0.0.1", 0))
+        self._srv.listen(8)  # watchdog workers open their own connection
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    @property
+    def address(self):
+        return f"tcp://127.0.0.1:{self._srv.getsockname()[1]}"
+
+    def close(self):
+        try:
+            self._srv.close()
+        except OSError:
+            pass
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._srv.accept()
+            except OSError:
+                return  # closed at the end of the run
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    def _read(self, conn):
+        self.connected = True
+        try:
+            with conn, conn.makefile("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        ev = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(ev, dict) and ev.get("v") == EVENTS_VERSION:
+                        self.on_event(ev)
+        except OSError:
+            pass
+
+
+class JuliaJob:
+    """One Julia process running an entry point on a workspace."""
+
+    def __init__(self, workspace, entry_point="run", job_id=None, status=QUEUED, created=None,
+                 started=None, finished=None, returncode=None, output_path=None, threads=None, options=None):
+        self.id = job_id or uuid.uuid4().hex[:8]
+        self.workspace = os.path.abspath(workspace).replace("\\", "/")
+        self.entry_point = entry_point
+        self.status = status
+        self.created = created or time.time()
+        self.started = started
+        self.finished = finished
+        self.returncode = returncode
+        self.output_path = output_path
+        self.threads = threads
+        self.options = dict(options or {})  # extra keyword arguments of the entry point
+
+        # live state (not persisted)
+        self.process = None
+        self.stage = "—"
+        self.progress = (0, 0)
+        self.eta_s = None
+        self.log = deque(maxlen=JOB_LOG_LINES)
+        self.events = None
+        self.stop_requested = False
+        # optional callbacks, called from the reader threads
+        self.on_line = None   # on_line(line) for every stdout line (progress lines excluded)
+        self.on_event = None  # on_event(ev) for every event (channel or stdout progress protocol)
+        self.on_exit = None   # on_exit(job) once the process has exited
+
+    def to_dict(self):
+        return {
+            "id": self.id, "workspace": self.workspace, "entry_point": self.entry_point,
+            "status": self.status, "created": self.created, "started": self.started,
+            "finished": self.finished, "returncode": self.returncode,
+            "output_path": self.output_path, "threads": self.threads, "options": self.options,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["workspace"], d.get("entry_point", "run"), job_id=d.get("id"),
+                   status=d.get("status", QUEUED), created=d.get("created"), started=d.get("started"),
+                   finished=d.get("finished"), returncode=d.get("returncode"),
+                   output_path=d.get("output_path"), threads=d.get("threads"), options=d.get("options"))
+
+    @property
+    def stop_file(self):
+        return os.path.join(self.workspace, "STOP")
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self, julia_exe, threads):
+        """Launch the Julia process (non-blocking)."""
+        for sub in ("plots", "correlation_matrix", "outputs", "user_inputs"):
+            os.makedirs(os.path.join(self.workspace, sub), exist_ok=True)
+        try:
+            os.remove(self.stop_file)  # stale STOP file from a previous run
+        except OSError:
+            pass
+
+        env = os.environ.copy()
+        env["JULIA_NUM_THREADS"] = str(threads)
+        profile = read_execution_profile(self.workspace)
+        if isinstance(profile.get("blas_threads"), int) and profile["blas_threads"] >= 1:
+            env["OPENBLAS_NUM_THREADS"] = str(profile["blas_threads"])  # also set by Julia (BLAS.set_num_threads)
+        self.events = EventServer(self._on_event)
+        env["JCO_EVENTS"] = self.events.address
+
+        self.threads = threads
+        self.status = RUNNING
+        self.started = time.time()
+        self.stop_requested = False
+        self.process = subprocess.Popen(
+            [julia_exe, "--project=" + PROJECT_PATH, "-e", julia_code(self.entry_point, self.workspace, self.options)],
+            cwd=PROJECT_PATH,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            env=env,
+            preexec_fn=_affinity_setter(profile.get("cpu_affinity")),
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+
+    def request_stop(self):
+        """Graceful stop (WORKSPACE/STOP), hard kill after STOP_KILL_TIMEOUT_S."""
+        if not self.is_running():
+            return
+        self.stop_requested = True
+        try:
+            with open(self.stop_file, "w", encoding="utf-8") as f:
+                f.write("stop\n")
+        except OSError:
+            pass
+
+        def _hard_kill():
+            if self.is_running():
+                self.process.terminate()
+                self.log.append("Julia did not stop in time — hard-killed.")
+
+        threading.Timer(STOP_KILL_TIMEOUT_S, _hard_kill).start()
+
+    def poll(self):
+        """Update the status once the process has exited. Returns True if it just finished."""
+        if self.status != RUNNING or self.process is None or self.process.poll() is None:
+            return False
+        self.returncode = self.process.returncode
+        self.finished = time.time()
+        status = (read_status(self.output_path) or {}).get("status")
+        if self.stop_requested or status == "stopped":
+            self.status = STOPPED
+        elif self.returncode == 0 and status != "error":
+            self.status = FINISHED
+        else:
+            self.status = FAILED
+        if self.events is not None:
+            self.events.close()
+        return True
+
+    def _read_stdout(self):
+        for line in self.process.stdout:
+            line = line.rstrip()
+            ev = parse_progress_line(line.strip())
+            if ev is not None:
+                self._on_event(ev)
+                continue
+            self.log.append(line)
+            if self.on_line is not None:
+                self.on_line(line)
+        self.process.wait()
+        if self.output_path:
+            update_run_catalog(self.workspace, [self.output_path], entry_point=self.entry_point)
+        if self.on_exit is not None:
+            self.on_exit(self)
+
+    def _on_event(self, ev):
+        if self.on_event is not None:
+            self.on_event(ev)
+        typ = ev.get("type")
+        if typ == "stage":
+            self.stage, self.progress, self.eta_s = ev.get("stage") or "—", (0, 0), None
+        elif typ == "progress":
+            self.stage = ev.get("stage") or self.stage
+            self.progress = (ev.get("i", 0), ev.get("N", 0))
+            self.eta_s = ev.get("eta_s")
+        elif typ == "stage_done":
+            self.eta_s = None
+        elif typ == "status" and ev.get("output_path"):
+            self.output_path = ev["output_path"]
+
+
+class JobQueue:
+    """FIFO of jobs, at most `max_concurrent` running at once, persisted to `path`.
+
+    Jobs on the same workspace never run concurrently (they would share the STOP file and the
+    plots folder). Call `tick()` periodically (the GUI does it from the Tk loop).
+    """
+
+    def __init__(self, julia_exe, path=QUEUE_FILE, max_concurrent=1, core_budget=None):
+        self.julia_exe = julia_exe
+        self.path = path
+        self.max_concurrent = max(int(max_concurrent), 1)
+        self.core_budget = core_budget
+        self.paused = False
+        self.jobs = []
+        self._lock = threading.RLock()
+        self.load()
+
+    # --- persistence ---
+    def load(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.max_concurrent = max(int(data.get("max_concurrent", self.max_concurrent)), 1)
+        self.jobs = [JuliaJob.from_dict(d) for d in data.get("jobs", [])]
+        for job in self.jobs:
+            if job.status == RUNNING:  # the GUI was closed while it was running
+                job.status = INTERRUPTED
+        # a restored queue waits for an explicit resume
+        self.paused = any(job.status == QUEUED for job in self.jobs)
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            data = {"version": 1, "max_concurrent": self.max_concurrent,
+                    "jobs": [job.to_dict() for job in self.jobs]}
+        tmp = self.path + ".part"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    # --- queue operations ---
+    def enqueue(self, workspace, entry_point="run", options=None):
+        job = JuliaJob(workspace, entry_point, options=options)
+        with self._lock:
+            self.jobs.append(job)
+        self.save()
+        return job
+
+    def remove(self, job_id):
+        with self._lock:
+            job = self.get(job_id)
+            if job is None or job.status == RUNNING:
+                return False
+            self.jobs.remove(job)
+        self.save()
+        return True
+
+    def requeue(self, job_id):
+        with self._lock:
+            job = self.get(job_id)
+            if job is None or job.status not in DONE_STATES:
+                return False
+            job.status, job.returncode, job.output_path = QUEUED, None, None
+            job.started = job.finished = None
+        self.save()
+        return True
+
+    def stop(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.request_stop()
+
+    def stop_all(self):
+        for job in self.running():
+            job.request_stop()
+
+    def get(self, job_id):
+        return next((job for job in self.jobs if job.id == job_id), None)
+
+    def running(self):
+        return [job for job in self.jobs if job.status == RUNNING]
+
+    def set_max_concurrent(self, k):
+        self.max_concurrent = max(int(k), 1)
+        self.save()
+
+    def threads_per_job(self):
+        """Core budget split across the jobs that will run at the same time."""
+        budget = self.core_budget or read_repo_threads()
+        n_active = sum(job.status in (QUEUED, RUNNING) for job in self.jobs)
+        return max(budget // max(min(self.max_concurrent, n_active), 1), 1)
+
+    def tick(self):
+        """Reap finished jobs and start queued ones. Returns the jobs whose state changed."""
+        changed = []
+        with self._lock:
+            for job in self.running():
+                if job.poll():
+                    changed.append(job)
+
+            busy = {job.workspace for job in self.running()}
+            for job in self.jobs:
+                if self.paused or len(self.running()) >= self.max_concurrent:
+                    break
+                if job.status != QUEUED or job.workspace in busy:
+                    continue
+                try:
+                    job.start(self.julia_exe, self.threads_per_job())
+                except Exception as e:
+                    job.status, job.finished = FAILED, time.time()
+                    job.log.append(f"Could not start Julia: {e}")
+                busy.add(job.workspace)
+                changed.append(job)
+
+        if changed:
+            self.save()
+        return changed
+
+
+# ----------------------------------------- command line -----------------------------------------
+
+def _print_job_line(job, prefix=""):
+    i, N = job.progress
+    progress = f" {i}/{N} ({100 * i // N}%) ETA {format_eta(job.eta_s)}" if N else ""
+    print(f"[{job.id}] {os.path.basename(job.workspace)} {prefix}{job.stage}{progress}", flush=True)
+
+
+def run_jobs(entry_point, workspaces, julia_exe, max_concurrent=1, threads=None, verbose=False,
+             progress_interval_s=10.0, options=None):
+    """Run `entry_point` on every workspace (up to `max_concurrent` at once). Returns the exit code."""
+    queue = JobQueue(julia_exe, path=None, max_concurrent=max_concurrent,
+                     core_budget=threads or read_repo_threads(default=os.cpu_count() or 1))
+    for ws in workspaces:
+        job = queue.enqueue(ws, entry_point, options=options)
+        if verbose:
+            job.on_line = lambda line, j=job: print(f"[{j.id}] {line}", flush=True)
+
+    last_report = 0.0
+    try:
+        while True:
+            for job in queue.tick():
+                if job.status == RUNNING:
+                    print(f"[{job.id}] {job.workspace}: {entry_point} started ({job.threads} threads)", flush=True)
+                else:
+                    print(f"[{job.id}] {job.workspace}: {job.status} (exit code {job.returncode})"
+                          + (f" -> {job.output_path}" if job.output_path else ""), flush=True)
+                    if job.status == FAILED and not verbose:
+                        for line in list(job.log)[-20:]:
+                            print(f"[{job.id}]   {line}", flush=True)
+                    plan = read_run_plan(job.workspace) if entry_point == "plan_run" and job.status == FINISHED else None
+                    for line in format_run_plan(plan) if plan else []:
+                        print(f"[{job.id}] {line}", flush=True)
+
+            if all(job.status in DONE_STATES for job in queue.jobs):
+                break
+            if time.time() - last_report >= progress_interval_s:
+                last_report = time.time()
+                for job in queue.running():
+                    _print_job_line(job)
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("Interrupted: stopping the running jobs...", flush=True)
+        queue.stop_all()
+        while queue.running():
+            queue.tick()
+            time.sleep(0.5)
+        return 130
+
+    statuses = [job.status for job in queue.jobs]
+    if FAILED in statuses or INTERRUPTED in statuses:
+        return 1
+    if STOPPED in statuses:
+        return 3
+    return 0
+
+
+def seed_workspaces(workspaces, julia_exe, overwrite=False):
+    """`seed_next_run_from_latest!` for every workspace (without Julia when possible).
+
+    Existing input files are kept unless `overwrite`.
+    """
+    legacy = []
+    for ws in workspaces:
+        try:
+            sources = latest_snapshot_sources(ws)
+        except (OSError, ValueError) as e:
+            print(f"{ws}: {e}", file=sys.stderr)
+            return 1
+        if sources is None:
+            legacy.append(ws)
+        else:
+            copied, skipped = restore_snapshot(ws, sources, overwrite=overwrite)
+            print(f"{ws}: restored {len(copied)} input files"
+                  + (f", kept {len(skipped)} existing (use --overwrite)" if skipped else ""), flush=True)
+    return (run_jobs("seed_next_run_from_latest!", legacy, julia_exe, options={"overwrite": overwrite})
+            if legacy else 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="jco", description="Run JosephsonCircuitsOptimizer entry points headlessly.")
+    parser.add_argument("command", choices=sorted(set(COMMANDS) | set(ENTRY_POINTS)),
+                        help="run, sweep, from-dataset, opt, hb, yield, plan, calibrate, seed (or the Julia function name)")
+    parser.add_argument("workspaces", nargs="+", help="working space folder(s)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="jobs running at the same time")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="core budget split across the running jobs (default: threads.txt, else all cores)")
+    parser.add_argument("--julia", default=shutil.which("julia") or "julia", help="Julia executable")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the full Julia output")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="seconds between progress lines")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="seed: replace the existing files of user_inputs")
+    args = parser.parse_args(argv)
+
+    missing = [ws for ws in args.workspaces if not os.path.isdir(ws)]
+    if missing:
+        parser.error("workspace not found: " + ", ".join(missing))
+
+    entry_point = COMMANDS.get(args.command, args.command)
+    if entry_point == "seed_next_run_from_latest!":
+        return seed_workspaces(args.workspaces, args.julia, overwrite=args.overwrite)
+    if entry_point == "calibrate_execution_profile" and args.threads is None:
+        args.threads = os.cpu_count() or 1  # calibrate on all the cores of the host
+    return run_jobs(entry_point, args.workspaces, args.julia, max_concurrent=args.jobs,
+                    threads=args.threads, verbose=args.verbose, progress_interval_s=args.progress_interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
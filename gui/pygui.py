@@ -1,17 +1,26 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog
+from tkinter import messagebox
 import subprocess
 import threading
+import queue
+import datetime
+from collections import OrderedDict, deque
 import os
 from PIL import Image, ImageTk, UnidentifiedImageError
+from catalog import RunCatalog, update_run_catalog
+from evaluations import THROUGHPUT_WINDOW_S, EvaluationLog, evaluations_path
+from jco import (JobQueue, JuliaJob, ENTRY_POINTS, RUNNING, FINISHED, default_threads, format_eta,
+                 format_run_plan, latest_snapshot_sources, read_execution_profile, read_repo_threads, read_run_plan,
+                 restore_snapshot)
 import shutil
 import sys
 import json
 import re
 import math
 
-process = None
+current_job = None
 plot_files = []
 current_plot_index = 0
 corr_files = []
@@ -49,24 +58,7 @@ print(f"Using Julia executable: {JULIA_EXE}")
 
 # --- Thread control (repo-level) ---
 # Put an integer (e.g. 12) in <repo>/threads.txt to control how many Julia threads
-# are used for every Julia subprocess started by this GUI.
-def read_repo_threads(default: int = 1) -> int:
-    threads_file = os.path.join(project_path, "threads.txt")
-    if os.path.isfile(threads_file):
-        try:
-            with open(threads_file, "r", encoding="utf-8") as f:
-                n = int(f.read().strip())
-            if n >= 1:
-                return n
-        except Exception:
-            pass
-    return default
-
-def julia_env_with_threads() -> dict:
-    env = os.environ.copy()
-    nthreads = read_repo_threads(default=env.get("JULIA_NUM_THREADS", "1") if str(env.get("JULIA_NUM_THREADS","")).isdigit() else 1)
-    env["JULIA_NUM_THREADS"] = str(nthreads)
-    return env
+# are used for every Julia subprocess started by this GUI (see jco.default_threads).
 
 
 def update_workspace_paths():
@@ -99,22 +91,8 @@ def open_path(path: str):
         print(f"Could not open path: {abs_path} ({e})")
 
 # --- Graceful stop support ---
-STOP_KILL_TIMEOUT_S = 5  # fallback hard-kill if Julia doesn't exit
+# STOP file + hard-kill fallback are handled by jco.JuliaJob.request_stop
 
-def _stop_file_path() -> str:
-    return os.path.join(workspace_var.get(), "STOP").replace("\\", "/")
-
-def request_stop():
-    """Ask Julia to stop cleanly by creating WORKSPACE/STOP (no hard kill)."""
-    try:
-        ensure_workspace_structure(workspace_var.get())
-        sp = _stop_file_path()
-        with open(sp, "w", encoding="utf-8") as f:
-            f.write("stop\n")
-        log_message(f"Stop requested (created {sp}).", "warning")
-        refresh_file_tree()
-    except Exception as e:
-        log_message(f"Could not request stop: {e}", "error")
 
 def open_latest_output():
     """Open the latest output folder/file pointed by outputs/LATEST.txt."""
@@ -138,6 +116,10 @@ def open_latest_output():
 
 
 
+TREE_PAGE_SIZE = 300
+tree_more_nodes = {}  # "… more" node -> (folder, offset of the next page)
+
+
 def refresh_file_tree():
     """Refresh the embedded file browser tree (requires the GUI widgets to exist)."""
     global tree
@@ -147,6 +129,7 @@ def refresh_file_tree():
     # Clear existing
     for item in tree.get_children():
         tree.delete(item)
+    tree_more_nodes.clear()
 
     root_path = workspace_var.get()
     if not os.path.isdir(root_path):
@@ -161,39 +144,59 @@ def refresh_file_tree():
     for name in preferred:
         p = os.path.join(root_path, name)
         if os.path.isdir(p):
-            node = tree.insert(root_node, "end", text=name, open=False, values=(p,))
-            add_tree_children(node, p, max_items=300)
+            _add_tree_node(root_node, name, p, is_dir=True)
+
+
+def _add_tree_node(parent_node, name, full, is_dir):
+    node = tree.insert(parent_node, "end", text=name, open=False, values=(full,))
+    if is_dir:
+        # listed when the folder is expanded (see on_tree_open)
+        tree.insert(node, "end", text="…", values=("",), tags=("placeholder",))
+    return node
 
 
-def add_tree_children(parent_node, folder_path: str, max_items: int = 300):
+def add_tree_children(parent_node, folder_path: str, offset: int = 0, max_items: int = TREE_PAGE_SIZE):
+    """Insert one page of the entries of `folder_path`; the rest behind a "… more" node."""
     try:
-        entries = sorted(os.listdir(folder_path))
-    except Exception:
+        with os.scandir(folder_path) as it:
+            entries = sorted((e.name, e.is_dir()) for e in it)
+    except OSError:
         return
 
-    count = 0
-    for entry in entries:
-        if count >= max_items:
-            tree.insert(parent_node, "end", text="… (more)", values=("",))
-            break
+    for entry, is_dir in entries[offset:offset + max_items]:
+        _add_tree_node(parent_node, entry, os.path.join(folder_path, entry), is_dir)
 
-        full = os.path.join(folder_path, entry)
-        if os.path.isdir(full):
-            tree.insert(parent_node, "end", text=entry, open=False, values=(full,))
-        else:
-            tree.insert(parent_node, "end", text=entry, values=(full,))
-        count += 1
+    rest = len(entries) - offset - max_items
+    if rest > 0:
+        more = tree.insert(parent_node, "end", text=f"… ({rest} more, double-click to show)", values=("",))
+        tree_more_nodes[more] = (folder_path, offset + max_items)
+
+
+def on_tree_open(event):
+    node = tree.focus()
+    children = tree.get_children(node)
+    if len(children) == 1 and "placeholder" in tree.item(children[0], "tags"):
+        tree.delete(children[0])
+        add_tree_children(node, tree.item(node, "values")[0])
 
 
 def on_tree_double_click(event):
     item = tree.selection()
     if not item:
         return
+    if item[0] in tree_more_nodes:
+        folder, offset = tree_more_nodes.pop(item[0])
+        parent = tree.parent(item[0])
+        tree.delete(item[0])
+        add_tree_children(parent, folder, offset)
+        return
     vals = tree.item(item[0], "values")
     if not vals:
         return
     p = vals[0]
-    if p and os.path.exists(p):
+    if p and p.endswith(".h5") and os.path.basename(p).startswith("df_"):
+        open_dataset_explorer(p)
+    elif p and os.path.exists(p):
         open_path(p)
 
 
@@ -204,55 +207,61 @@ def browse_workspace():
         ensure_workspace_structure(workspace_var.get())
         update_workspace_paths()
         refresh_file_tree()
+        if run_window is not None:
+            update_run_catalog_async()
         log_message(f"Workspace set to: {workspace_var.get()}", "success")
 
 
 
 
 def restore_latest_inputs_snapshot():
-    """Restore inputs_snapshot from the latest run into the current workspace user_inputs."""
+    """Restore the input snapshot of the latest run into the current workspace user_inputs."""
     ensure_workspace_structure(workspace_var.get())
     update_workspace_paths()
     refresh_file_tree()
     log_message("Restoring latest inputs_snapshot into user_inputs...", "info")
 
-    julia_code = f'''
-    using Pkg
-    Pkg.activate("{project_path}")
-    push!(LOAD_PATH, "{src_path}")
-    using JosephsonCircuitsOptimizer
-    JosephsonCircuitsOptimizer.seed_next_run_from_latest!(workspace=raw"{workspace_var.get()}")
-    '''
+    # Runs with an inputs manifest are restored directly (no Julia startup needed)
+    try:
+        sources = latest_snapshot_sources(workspace_var.get())
+    except Exception as e:
+        log_message(f"Error restoring latest inputs_snapshot: {e}", "error")
+        return
 
-    def run_in_thread():
+    # Existing input files are only replaced when the user confirms it
+    user_inputs = os.path.join(workspace_var.get(), "user_inputs")
+    existing = (os.listdir(user_inputs) if sources is None else
+                [name for name in sources if os.path.exists(os.path.join(user_inputs, name))])
+    overwrite = False
+    if existing:
+        answer = messagebox.askyesnocancel(
+            "Restore latest inputs",
+            f"{len(existing)} file(s) already exist in user_inputs.\n\n"
+            "Yes: overwrite them.  No: restore only the missing files.")
+        if answer is None:
+            log_message("Restore cancelled.", "info")
+            return
+        overwrite = answer
+
+    if sources is not None:
         try:
-            env = julia_env_with_threads()
-            try:
-                root.after(0, lambda: log_message(
-                    f"Launching Julia with JULIA_NUM_THREADS={env.get('JULIA_NUM_THREADS','?')}", "info"
-                ))
-            except Exception:
-                pass
-
-            p = subprocess.Popen(
-                [JULIA_EXE, '--project=' + project_path, '-e', julia_code],
-                cwd=project_path,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                env=env
-            )
-
-            for line in p.stdout:
-                root.after(0, lambda l=line: log_message(l.strip(), "info"))
-
-            p.wait()
-            root.after(0, lambda: (refresh_file_tree(),
-                                   log_message("✓ Latest inputs_snapshot restored.", "success")))
+            copied, skipped = restore_snapshot(workspace_var.get(), sources, overwrite=overwrite)
+            refresh_file_tree()
+            log_message(f"✓ Latest inputs_snapshot restored ({len(copied)} files"
+                        + (f", {len(skipped)} existing kept" if skipped else "") + ").", "success")
         except Exception as e:
-            root.after(0, lambda: log_message(f"Error restoring latest inputs_snapshot: {e}", "error"))
+            log_message(f"Error restoring latest inputs_snapshot: {e}", "error")
+        return
 
-    threading.Thread(target=run_in_thread, daemon=True).start()
+    # Legacy runs (inputs_snapshot/ folder): restore through Julia
+    job = JuliaJob(workspace_var.get(), "seed_next_run_from_latest!", options={"overwrite": overwrite})
+    job.on_line = lambda line: log_message(line.strip(), "info")
+    job.on_exit = lambda j: root.after(0, lambda: (refresh_file_tree(),
+                                                   log_message("✓ Latest inputs_snapshot restored.", "success")))
+    try:
+        job.start(JULIA_EXE, default_threads(workspace_var.get()))
+    except Exception as e:
+        log_message(f"Error restoring latest inputs_snapshot: {e}", "error")
 
 
 def set_workspace_to_default():
@@ -278,6 +287,9 @@ def set_workspace_to_default():
     except Exception:
         pass
 
+    if run_window is not None:
+        update_run_catalog_async()
+
     log_message(f"Workspace set to default: {default_ws}", "success")
 
 
@@ -384,27 +396,79 @@ def is_type_visible(msg_type: str) -> bool:
     return True
 
 
-def rerender_output():
-    """Rebuild the output panel from log_buffer based on current filters."""
-    try:
-        output_box.config(state=tk.NORMAL)
-        output_box.delete("1.0", tk.END)
-
-        # Configure text tags for colors (once per render)
-        output_box.tag_configure("success", foreground=COLORS['success'])
-        output_box.tag_configure("error", foreground=COLORS['danger'])
-        output_box.tag_configure("warning", foreground=COLORS['warning'])
-        output_box.tag_configure("info", foreground=COLORS['text'])
-        output_box.tag_configure("timestamp", foreground=COLORS['dark'], font=('Consolas', 8))
-        output_box.tag_configure("progress", foreground=COLORS['secondary'])
+# --- Log pipeline ---
+# Reader threads only append to a bounded queue (log lines and run events); `flush_log_queue`
+# drains it on the Tk thread at a fixed rate and inserts all new lines with a single
+# Text.insert. Progress events are coalesced (only the latest one per frame is applied).
+# Every line keeps its type as a text tag: filters only toggle the tag's `elide` option, and the
+# oldest lines are trimmed from the widget beyond MAX_LOG_LINES.
+LOG_FLUSH_MS = 100
+LOG_QUEUE_MAX = 20000
+FILTERABLE_LOG_TYPES = ("info", "warning", "error", "progress")
+
+log_queue = deque(maxlen=LOG_QUEUE_MAX)
+log_dropped = 0
+
+
+def post_log_event(kind, payload):
+    """Thread-safe: queue a 'log' line or an 'event' (see jco.JuliaJob) for the UI."""
+    global log_dropped
+    if len(log_queue) >= LOG_QUEUE_MAX:
+        log_dropped += 1
+    log_queue.append((kind, payload))
+
+
+# --- Events ---
+# Runs stream JSON-lines events (src/Events.jl) through the channel opened by jco.JuliaJob:
+# stages, progress, evaluations, status and new files. Runs without an event channel (older
+# package versions) use the stdout progress protocol, converted to the same events by jco.
+# While events arrive, the viewers refresh on "file" events instead of polling the folders.
+events_connected = False
+plots_dirty = False
+corr_dirty = False
+
+
+def handle_event(ev):
+    global plots_dirty, corr_dirty, events_connected
+    typ = ev.get("type")
+    if "v" in ev:  # from the event channel (not from the stdout protocol)
+        events_connected = True
+    if typ == "stage":
+        _set_stage(ev.get("stage") or "—")
+    elif typ == "progress":
+        _set_progress(ev.get("stage") or "—", ev.get("i", 0), ev.get("N", 0), ev.get("eta_s"))
+    elif typ == "stage_done":
+        _set_stage_done(ev.get("stage") or "—")
+    elif typ == "file":
+        kind = ev.get("kind")
+        if kind == "plot":
+            plots_dirty = True
+        elif kind == "correlation":
+            corr_dirty = True
+        elif kind in ("dataset", "user_data"):
+            refresh_file_tree()
+            if kind == "dataset" and explorer_window is not None and ev.get("path"):
+                explorer_window.reload_if(ev["path"])
+    elif typ == "status" and ev.get("status") == "error":
+        log_message(f"Run failed: {ev.get('message')}", 'error')
+    # "evaluation" and "log" events are not displayed (log lines also arrive on stdout)
+
+
+def configure_output_tags():
+    output_box.tag_configure("success", foreground=COLORS['success'])
+    output_box.tag_configure("error", foreground=COLORS['danger'])
+    output_box.tag_configure("warning", foreground=COLORS['warning'])
+    output_box.tag_configure("info", foreground=COLORS['text'])
+    output_box.tag_configure("timestamp", foreground=COLORS['dark'], font=('Consolas', 8))
+    output_box.tag_configure("progress", foreground=COLORS['secondary'])
+    output_box.tag_raise("timestamp")
 
-        for ts, typ, msg in log_buffer:
-            if not is_type_visible(typ):
-                continue
-            output_box.insert(tk.END, f"[{ts}] ", "timestamp")
-            output_box.insert(tk.END, f"{msg}\n", typ)
 
-        output_box.config(state=tk.DISABLED)
+def rerender_output():
+    """Apply the current filters to the output panel (no re-insertion of the lines)."""
+    try:
+        for typ in FILTERABLE_LOG_TYPES:
+            output_box.tag_configure(typ, elide=not is_type_visible(typ))
         if auto_scroll.get():
             output_box.see(tk.END)
     except Exception:
@@ -413,49 +477,175 @@ def rerender_output():
 
 
 def clear_logs():
+    log_queue.clear()
     try:
-        log_buffer.clear()
+        output_box.config(state=tk.NORMAL)
+        output_box.delete("1.0", tk.END)
+        output_box.config(state=tk.DISABLED)
     except Exception:
         pass
-    rerender_output()
+
 
 def log_message(message, msg_type='info'):
-    """Append a message to the log buffer and (if visible) to the output box."""
-    import datetime
+    """Queue a message for the output box (safe to call from any thread)."""
     timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-    message = (message or "").rstrip("")
+    post_log_event("log", (timestamp, msg_type, (message or "").rstrip()))
 
-    # Store everything
+
+def flush_log_queue():
+    """Drain the log queue into the output box (runs every LOG_FLUSH_MS on the Tk thread)."""
+    global log_dropped
+    chunks = []
+    progress = None
     try:
-        log_buffer.append((timestamp, msg_type, message))
-        if len(log_buffer) > MAX_LOG_LINES:
-            del log_buffer[:len(log_buffer) - MAX_LOG_LINES]
+        while log_queue:
+            kind, payload = log_queue.popleft()
+            if kind == "log":
+                ts, typ, msg = payload
+                # the type tag on the timestamp too, so that filters hide the whole line
+                chunks += [f"[{ts}] ", ("timestamp", typ), f"{msg}\n", typ]
+            elif payload.get("type") == "progress":
+                progress = payload
+            else:
+                if progress is not None:
+                    handle_event(progress)
+                    progress = None
+                handle_event(payload)
+        if progress is not None:
+            handle_event(progress)
+
+        if log_dropped:
+            chunks += [f"[{datetime.datetime.now().strftime('%H:%M:%S')}] ", ("timestamp", "warning"),
+                       f"... {log_dropped} log lines dropped (output too fast)\n", "warning"]
+            log_dropped = 0
+
+        if chunks:
+            output_box.config(state=tk.NORMAL)
+            output_box.insert(tk.END, *chunks)
+            n_lines = int(output_box.index("end-1c").split(".")[0]) - 1
+            if n_lines > MAX_LOG_LINES:
+                output_box.delete("1.0", f"{n_lines - MAX_LOG_LINES + 1}.0")
+            output_box.config(state=tk.DISABLED)
+            if auto_scroll.get():
+                output_box.see(tk.END)
     except Exception:
         pass
+    root.after(LOG_FLUSH_MS, flush_log_queue)
 
-    # If filtered out, don't render now (it stays in buffer for later toggles)
-    if not is_type_visible(msg_type):
-        return
 
+# --- Image viewers ---
+# The plot and correlation viewers poll cheaply (folder mtime + mtime of the displayed file) and
+# only redraw when something changed. PNG decoding/resizing and sidecar JSON parsing run on a
+# background thread; the ready PhotoImages and metadata are kept in an LRU cache keyed by
+# (path, png mtime, json mtime), so navigating back and forth does not touch the disk again.
+VIEWER_MAX_SIZE = (600, 450)
+IMAGE_CACHE_SIZE = 64
+
+plot_dir_signature = None
+corr_dir_signature = None
+wanted_plot_key = None
+wanted_corr_key = None
+
+
+def file_mtime(path):
     try:
-        output_box.config(state=tk.NORMAL)
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
 
-        # Configure tags (safe even if repeated)
-        output_box.tag_configure("success", foreground=COLORS['success'])
-        output_box.tag_configure("error", foreground=COLORS['danger'])
-        output_box.tag_configure("warning", foreground=COLORS['warning'])
-        output_box.tag_configure("info", foreground=COLORS['text'])
-        output_box.tag_configure("timestamp", foreground=COLORS['dark'], font=('Consolas', 8))
-        output_box.tag_configure("progress", foreground=COLORS['secondary'])
 
-        output_box.insert(tk.END, f"[{timestamp}] ", "timestamp")
-        output_box.insert(tk.END, f"{message}", msg_type)
+def dir_signature(path):
+    """Changes whenever a file is created, removed or renamed in `path`."""
+    try:
+        st = os.stat(path)
+        return (path, st.st_mtime_ns, st.st_ino)
+    except OSError:
+        return None
+
+
+def image_key(path):
+    return (path, file_mtime(path), file_mtime(path[:-4] + ".json"))
+
+
+class ImageCache:
+    """LRU cache of (PhotoImage, metadata), used from the Tk thread only."""
+
+    def __init__(self, max_items=IMAGE_CACHE_SIZE):
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key, item):
+        self._items[key] = item
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+
+image_cache = ImageCache()
+decode_queue = queue.Queue()
+decode_pending = set()
+
+
+def decode_image(path, max_size=VIEWER_MAX_SIZE):
+    with Image.open(path) as img:
+        img = img.copy()  # force load into memory
+    ratio = min(max_size[0] / img.width, max_size[1] / img.height)
+    size = (max(int(img.width * ratio), 1), max(int(img.height * ratio), 1))
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+
+def decode_worker():
+    while True:
+        key, on_ready = decode_queue.get()
+        try:
+            img, meta = decode_image(key[0]), load_sidecar_json(key[0])
+        except (UnidentifiedImageError, OSError, ValueError):
+            img, meta = None, None  # incomplete plot: retried when its mtime changes
+        try:
+            root.after(0, _on_image_decoded, key, img, meta, on_ready)
+        except Exception:
+            return  # window closed
+
+
+def _on_image_decoded(key, img, meta, on_ready):
+    decode_pending.discard(key)
+    if img is None:
+        return
+    item = (ImageTk.PhotoImage(img), meta)  # PhotoImage must be created on the Tk thread
+    image_cache.put(key, item)
+    on_ready(key, item)
+
+
+def request_image(path, on_ready):
+    """Return (key, cached item or None). On a miss the image is decoded in the background
+    and `on_ready(key, item)` is called on the Tk thread."""
+    key = image_key(path)
+    item = image_cache.get(key)
+    if item is None and key[1] is not None and key not in decode_pending:
+        decode_pending.add(key)
+        decode_queue.put((key, on_ready))
+    return key, item
+
+
+def prefetch_images(files, index):
+    for i in (index - 1, index + 1):
+        if 0 <= i < len(files):
+            request_image(files[i], lambda key, item: None)
+
+
+def draw_on_canvas(canvas, photo):
+    canvas.delete("all")
+    canvas_width = canvas.winfo_width() or VIEWER_MAX_SIZE[0]
+    canvas_height = canvas.winfo_height() or VIEWER_MAX_SIZE[1]
+    canvas.create_image(canvas_width // 2, canvas_height // 2, image=photo)
+    canvas.image = photo  # Keep a reference
 
-        output_box.config(state=tk.DISABLED)
-        if auto_scroll.get():
-            output_box.see(tk.END)
-    except Exception:
-        pass
 
 def refresh_plot_list():
     global plot_files
@@ -465,49 +655,19 @@ def refresh_plot_list():
         )
 
 def show_plot(index):
+    global wanted_plot_key
     if 0 <= index < len(plot_files):
-        try:
-            # Try to open the image safely
-            with Image.open(plot_files[index]) as img:
-                img = img.copy()  # force load into memory
-
-            # Calculate aspect ratio for better fitting
-            img_width, img_height = img.size
-            max_width, max_height = 600, 450
-            ratio = min(max_width / img_width, max_height / img_height)
-            new_width = int(img_width * ratio)
-            new_height = int(img_height * ratio)
-
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-
-            # Clear canvas and draw new image centered
-            plot_canvas.delete("all")
-            canvas_width = plot_canvas.winfo_width() or 600
-            canvas_height = plot_canvas.winfo_height() or 450
-            x = (canvas_width - new_width) // 2
-            y = (canvas_height - new_height) // 2
-            plot_canvas.create_image(x + new_width // 2, y + new_height // 2, image=photo)
-            plot_canvas.image = photo  # Keep a reference
-
-            status_label.config(
-                text=f"Plot {index+1} of {len(plot_files)}: {os.path.basename(plot_files[index])}"
-            )
-
-            update_plot_metadata(plot_files[index])
-
-            # Update navigation buttons
-            prev_button.config(state='normal' if index > 0 else 'disabled')
-            next_button.config(state='normal' if index < len(plot_files) - 1 else 'disabled')
-
-        except UnidentifiedImageError:
-            #log_message(f"Skipping incomplete plot: {os.path.basename(plot_files[index])}", 'warning')
-            pass
-        except Exception as e:
-            #log_message(f"Error loading plot {os.path.basename(plot_files[index])}: {e}", 'error')
-            pass
+        wanted_plot_key, item = request_image(plot_files[index], _plot_image_ready)
+        if item is not None:
+            _render_plot(wanted_plot_key, item)
+        prefetch_images(plot_files, index)
+
+        # Update navigation buttons
+        prev_button.config(state='normal' if index > 0 else 'disabled')
+        next_button.config(state='normal' if index < len(plot_files) - 1 else 'disabled')
     else:
         # No valid plots
+        wanted_plot_key = None
         plot_canvas.delete("all")
         plot_canvas.create_text(300, 225, text="No plots available",
                                 font=('Arial', 14), fill=COLORS['dark'])
@@ -517,6 +677,21 @@ def show_plot(index):
         next_button.config(state='disabled')
 
 
+def _plot_image_ready(key, item):
+    if key == wanted_plot_key:
+        _render_plot(key, item)
+
+
+def _render_plot(key, item):
+    photo, meta = item
+    draw_on_canvas(plot_canvas, photo)
+    path = key[0]
+    status_label.config(
+        text=f"Plot {current_plot_index+1} of {len(plot_files)}: {os.path.basename(path)}"
+    )
+    update_plot_metadata(path, meta)
+
+
 def next_plot():
     global current_plot_index
     if current_plot_index < len(plot_files) - 1:
@@ -530,14 +705,24 @@ def prev_plot():
         show_plot(current_plot_index)
 
 def update_plot():
-    global current_plot_index
-    refresh_plot_list()
-    if plot_files:
-        if current_plot_index >= len(plot_files):
-            current_plot_index = len(plot_files) - 1
+    """Redraw only if the plots folder or the displayed file changed (cheap stat checks)."""
+    global current_plot_index, plot_dir_signature, plots_dirty
+    if events_connected and not plots_dirty:  # the run announces new plots
+        root.after(500, update_plot)
+        return
+    plots_dirty = False
+    sig = dir_signature(plot_path)
+    if sig != plot_dir_signature:
+        plot_dir_signature = sig
+        refresh_plot_list()
+        if plot_files:
+            if current_plot_index >= len(plot_files):
+                current_plot_index = len(plot_files) - 1
+            show_plot(current_plot_index)
+        else:
+            show_plot(-1)
+    elif plot_files and image_key(plot_files[current_plot_index]) != wanted_plot_key:
         show_plot(current_plot_index)
-    else:
-        show_plot(-1)
     root.after(500, update_plot)
 
 
@@ -568,37 +753,17 @@ def refresh_corr_list():
 
 
 def show_corr(index):
+    global wanted_corr_key
     if 0 <= index < len(corr_files):
-        try:
-            with Image.open(corr_files[index]) as img:
-                img = img.copy()
-            img_width, img_height = img.size
-            max_width, max_height = 600, 450
-            ratio = min(max_width / img_width, max_height / img_height)
-            new_width, new_height = int(img_width * ratio), int(img_height * ratio)
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-
-            corr_canvas.delete("all")
-            canvas_width = corr_canvas.winfo_width() or 600
-            canvas_height = corr_canvas.winfo_height() or 450
-            x = (canvas_width - new_width) // 2
-            y = (canvas_height - new_height) // 2
-            corr_canvas.create_image(x + new_width // 2, y + new_height // 2, image=photo)
-            corr_canvas.image = photo
-
-            corr_status_label.config(
-                text=f"Matrix {index+1} of {len(corr_files)}: {os.path.basename(corr_files[index])}"
-            )
-            update_corr_metadata(corr_files[index])
-
-            corr_prev_button.config(state='normal' if index > 0 else 'disabled')
-            corr_next_button.config(state='normal' if index < len(corr_files) - 1 else 'disabled')
+        wanted_corr_key, item = request_image(corr_files[index], _corr_image_ready)
+        if item is not None:
+            _render_corr(wanted_corr_key, item)
+        prefetch_images(corr_files, index)
 
-        except Exception as e:
-            #log_message(f"Error loading correlation matrix: {e}", 'error')
-            pass
+        corr_prev_button.config(state='normal' if index > 0 else 'disabled')
+        corr_next_button.config(state='normal' if index < len(corr_files) - 1 else 'disabled')
     else:
+        wanted_corr_key = None
         corr_canvas.delete("all")
         corr_canvas.create_text(300, 225, text="No correlation matrices available",
                                 font=('Arial', 14), fill=COLORS['dark'])
@@ -608,6 +773,21 @@ def show_corr(index):
         corr_next_button.config(state='disabled')
 
 
+def _corr_image_ready(key, item):
+    if key == wanted_corr_key:
+        _render_corr(key, item)
+
+
+def _render_corr(key, item):
+    photo, meta = item
+    draw_on_canvas(corr_canvas, photo)
+    path = key[0]
+    corr_status_label.config(
+        text=f"Matrix {current_corr_index+1} of {len(corr_files)}: {os.path.basename(path)}"
+    )
+    update_corr_metadata(path, meta)
+
+
 def next_corr():
     global current_corr_index
     if current_corr_index < len(corr_files) - 1:
@@ -623,62 +803,40 @@ def prev_corr():
 
 
 def update_corr():
-    global current_corr_index
-    refresh_corr_list()
-    if corr_files:
-        if current_corr_index >= len(corr_files):
-            current_corr_index = len(corr_files) - 1
+    global current_corr_index, corr_dir_signature, corr_dirty
+    if events_connected and not corr_dirty:
+        root.after(1000, update_corr)
+        return
+    corr_dirty = False
+    sig = dir_signature(corr_path)
+    if sig != corr_dir_signature:
+        corr_dir_signature = sig
+        refresh_corr_list()
+        if corr_files:
+            if current_corr_index >= len(corr_files):
+                current_corr_index = len(corr_files) - 1
+            show_corr(current_corr_index)
+        else:
+            show_corr(-1)
+    elif corr_files and image_key(corr_files[current_corr_index]) != wanted_corr_key:
         show_corr(current_corr_index)
-    else:
-        show_corr(-1)
-    root.after(10000, update_corr)
+    root.after(1000, update_corr)
 
 
 
 
 def toggle_simulation():
     """Toggle between start and stop simulation"""
-    global process
-    if process is None:
+    if current_job is None:
         start_simulation()
     else:
         stop_simulation()
 
 
-
-def clear_plots():
-    removed = 0
-    if os.path.exists(plot_path):
-        for f in os.listdir(plot_path):
-            if f.endswith(".png") or f.endswith(".json"):
-                try:
-                    os.remove(os.path.join(plot_path, f))
-                    removed += 1
-                except Exception:
-                    pass
-    log_message(f"✓ Cleared plots + metadata ({removed} files).", 'success')
-    refresh_plot_list()
-    show_plot(-1)
-    update_plot_metadata(None)
-
-
-def clear_corr():
-    removed = 0
-    if os.path.exists(corr_path):
-        for f in os.listdir(corr_path):
-            if f.endswith(".png") or f.endswith(".json"):
-                os.remove(os.path.join(corr_path, f))
-                removed += 1
-    log_message(f"✓ Cleared matrices + metadata ({removed} files).", 'success')
-    refresh_corr_list()
-    show_corr(-1)
-    update_corr_metadata(None)
-
-
-def _start_run(julia_code: str, label: str):
-    """Start a Julia run (full / sweep-only / dataset-only) using the shared UI & parsing."""
-    global process, current_plot_index
-    if process is not None:
+def _start_run(entry_point: str, label: str):
+    """Start a Julia run (full / sweep-only / dataset-only / ...) using the shared UI & parsing."""
+    global current_job, current_plot_index, events_connected
+    if current_job is not None:
         log_message("Simulation already running!", 'warning')
         return
 
@@ -693,157 +851,693 @@ def _start_run(julia_code: str, label: str):
         sweep_only_button.state(['disabled'])
         opt_only_button.state(['disabled'])
         hb_only_button.state(['disabled'])
+        yield_button.state(['disabled'])
     except Exception:
         pass
 
-    ensure_workspace_structure(workspace_var.get())
     update_workspace_paths()
-
-    # Remove stale STOP file from previous runs (best-effort)
-    try:
-        sp = _stop_file_path()
-        if os.path.exists(sp):
-            os.remove(sp)
-    except Exception:
-        pass
-
     refresh_plot_list()
     refresh_corr_list()
     log_message(label, 'info')
 
-    def run_in_thread():
-        global process
-        try:
-            env = julia_env_with_threads()
-            try:
-                root.after(0, lambda: log_message(
-                    f"Launching Julia with JULIA_NUM_THREADS={env.get('JULIA_NUM_THREADS','?')}",
-                    "info"
-                ))
-            except Exception:
-                pass
-
-            process = subprocess.Popen(
-                [JULIA_EXE, '--project=' + project_path, '-e', julia_code],
-                cwd=project_path,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                env=env
-            )
-
-            for line in process.stdout:
-                if process is None:
-                    break
-                line = line.strip()
-                if line.startswith("STAGE"):
-                    root.after(0, _handle_stage_line, line)
-                elif line.startswith("PROGRESS_DONE"):
-                    root.after(0, _handle_progress_done, line)
-                elif line.startswith("PROGRESS"):
-                    root.after(0, _handle_progress_line, line)
-                else:
-                    msg, typ = classify_log_line(line)
-                    if msg:
-                        root.after(0, lambda m=msg, t=typ: log_message(m, t))
-
-            process.wait()
-            root.after(0, simulation_finished)
+    job = JuliaJob(workspace_var.get(), entry_point)
+    job.on_line = _on_run_line
+    job.on_event = lambda ev: post_log_event("event", ev)
+    job.on_exit = lambda j: root.after(0, simulation_finished)
+    events_connected = False
 
-        except Exception as e:
-            root.after(0, lambda: log_message(f"Error running simulation: {e}", 'error'))
-            root.after(0, simulation_finished)
+    threads = default_threads(workspace_var.get())
+    log_message(f"Launching Julia with JULIA_NUM_THREADS={threads}", "info")
+    try:
+        job.start(JULIA_EXE, threads)
+        current_job = job
+    except Exception as e:
+        log_message(f"Error running simulation: {e}", 'error')
+        simulation_finished()
 
-    threading.Thread(target=run_in_thread, daemon=True).start()
+
+def _on_run_line(line):
+    msg, typ = classify_log_line(line)
+    if msg:
+        log_message(msg, typ)
 
 
 def start_simulation():
-    julia_code = f'''
-    using Pkg
-    Pkg.activate("{project_path}")
-    push!(LOAD_PATH, "{src_path}")
-    using JosephsonCircuitsOptimizer
-    JosephsonCircuitsOptimizer.run(workspace=raw"{workspace_var.get()}", create_workspace=true)
-    '''
-    _start_run(julia_code, "Starting Josephson simulation + optimization...")
+    _start_run("run", "Starting Josephson simulation + optimization...")
 
 
 def start_sweep_only():
-    julia_code = f'''
-    using Pkg
-    Pkg.activate("{project_path}")
-    push!(LOAD_PATH, "{src_path}")
-    using JosephsonCircuitsOptimizer
-    JosephsonCircuitsOptimizer.run_sweep_only(workspace=raw"{workspace_var.get()}", create_workspace=true)
-    '''
-    _start_run(julia_code, "Starting sweep-only simulation...")
+    _start_run("run_sweep_only", "Starting sweep-only simulation...")
 
 
 def start_from_latest_dataset_only():
-    julia_code = f'''
-    using Pkg
-    Pkg.activate("{project_path}")
-    push!(LOAD_PATH, "{src_path}")
-    using JosephsonCircuitsOptimizer
-    JosephsonCircuitsOptimizer.run_from_latest_dataset_only(workspace=raw"{workspace_var.get()}", create_workspace=true)
-    '''
-    _start_run(julia_code, "Starting optimization + nonlinear from latest dataset...")
+    _start_run("run_from_latest_dataset_only", "Starting optimization + nonlinear from latest dataset...")
 
 
 def start_optimization_only():
-    julia_code = f'''
-    using Pkg
-    Pkg.activate("{project_path}")
-    push!(LOAD_PATH, "{src_path}")
-    using JosephsonCircuitsOptimizer
-    JosephsonCircuitsOptimizer.run_optimization_only(workspace=raw"{workspace_var.get()}", create_workspace=true)
-    '''
-    _start_run(julia_code, "Starting optimization only (from latest dataset)...")
+    _start_run("run_optimization_only", "Starting optimization only (from latest dataset)...")
 
 
 def start_nonlinear_only():
-    julia_code = f'''
-    using Pkg
-    Pkg.activate("{project_path}")
-    push!(LOAD_PATH, "{src_path}")
-    using JosephsonCircuitsOptimizer
-    JosephsonCircuitsOptimizer.run_nonlinear_only(workspace=raw"{workspace_var.get()}", create_workspace=true)
-    '''
-    _start_run(julia_code, "Starting nonlinear (HB) only (from latest optimal params)...")
+    _start_run("run_nonlinear_only", "Starting nonlinear (HB) only (from latest optimal params)...")
 
 
-def stop_simulation():
-    global process
-    if process is None:
-        log_message("No simulation running.", 'info')
+def start_yield_analysis():
+    _start_run("run_yield_analysis", "Starting yield analysis (from latest optimal params)...")
+
+
+# --- Tool jobs: dry-run planner (plan_run) and execution profile calibration ---
+tool_jobs = {}  # entry point -> running JuliaJob
+
+
+def _start_tool_job(entry_point, label, button, threads, on_finished):
+    """Run a short Julia entry point beside the main run; `on_finished(job)` is called on exit."""
+    if entry_point in tool_jobs:
+        log_message(f"{entry_point} is already running.", "warning")
         return
 
-    # Ask for graceful stop first (WORKSPACE/STOP)
-    request_stop()
+    def finished(job):
+        tool_jobs.pop(entry_point, None)
+        button.state(['!disabled'])
+        job.poll()
+        on_finished(job)
 
-    # Fallback hard kill if Julia doesn't exit
-    def _hard_kill():
-        global process
-        try:
-            if process is not None and process.poll() is None:
-                process.terminate()
-                log_message("✗ Julia did not stop in time — hard-killed.", 'warning')
-        except Exception as e:
-            log_message(f"Hard-kill failed: {e}", 'error')
+    job = JuliaJob(workspace_var.get(), entry_point)
+    job.on_line = _on_run_line
+    job.on_exit = lambda j: root.after(0, lambda: finished(j))
+    log_message(label, "info")
+    try:
+        job.start(JULIA_EXE, threads)
+        tool_jobs[entry_point] = job
+        button.state(['disabled'])
+    except Exception as e:
+        log_message(f"Error starting {entry_point}: {e}", "error")
+
+
+def start_plan_run():
+    _start_tool_job("plan_run", "Planning the full run (counting points, timing one calibration evaluation)...",
+                    plan_button, default_threads(workspace_var.get()), plan_run_finished)
+
+
+def plan_run_finished(job):
+    plan = read_run_plan(job.workspace) if job.status == FINISHED else None
+    if plan is None:
+        log_message(f"Run planner {job.status} (exit code {job.returncode}).", "error")
+        return
+    over = plan.get("over_time_budget") or plan.get("over_memory_budget")
+    for line in format_run_plan(plan):
+        log_message(line, "warning" if line.strip().startswith("WARNING") else "info")
+    if over:
+        log_message("The planned run exceeds its budget (plan_budget_hours / plan_memory_budget_mb).", "warning")
+    else:
+        log_message("The planned run fits in its budget.", "success")
+
+
+def start_execution_calibration():
+    threads = os.cpu_count() or 1
+    _start_tool_job("calibrate_execution_profile",
+                    f"Calibrating threads / BLAS threads on {threads} cores (execution_profile.json)...",
+                    calibrate_button, threads, execution_calibration_finished)
+
+
+def execution_calibration_finished(job):
+    profile = read_execution_profile(job.workspace) if job.status == FINISHED else {}
+    if "calibration" not in profile:
+        log_message(f"Calibration {job.status} (exit code {job.returncode}).", "error")
+        return
+    log_message(f"✓ Execution profile: {profile.get('julia_threads')} Julia threads, "
+                f"{profile.get('threads_per_task')} per evaluation, {profile.get('blas_threads')} BLAS threads "
+                f"(used by the next runs of this workspace).", "success")
+
+
+# --- Job queue (several runs, scheduled by gui/jco.py) ---
+JOB_QUEUE_TICK_MS = 1000
+
+job_queue = JobQueue(JULIA_EXE)
+job_window = None
+
+
+def job_queue_tick():
+    changed = job_queue.tick()
+    for job in changed:
+        if job.status == RUNNING:
+            log_message(f"Job {job.id} started: {job.entry_point} on {job.workspace} "
+                        f"({job.threads} threads)", 'info')
+        else:
+            log_message(f"Job {job.id} {job.status}: {job.entry_point} on {job.workspace}",
+                        'success' if job.status == FINISHED else 'warning')
+    if job_window is not None:
+        refresh_job_window()
+    if run_window is not None and any(job.status != RUNNING for job in changed):
+        update_run_catalog_async()
+    root.after(JOB_QUEUE_TICK_MS, job_queue_tick)
+
+
+def _job_progress_text(job):
+    i, N = job.progress
+    if job.status != RUNNING:
+        return ""
+    text = f"{i}/{N} ({100 * i // N}%)" if N else ""
+    if job.eta_s is not None:
+        text += f" ETA {format_eta(float(job.eta_s))}"
+    return text
+
+
+def _selected_job():
+    sel = job_tree.selection()
+    return job_queue.get(sel[0]) if sel else None
+
+
+def refresh_job_window():
+    existing = set(job_tree.get_children())
+    for job in job_queue.jobs:
+        values = (job.id, os.path.basename(job.workspace), job.entry_point, job.status,
+                  job.stage if job.status == RUNNING else "", _job_progress_text(job), job.threads or "")
+        if job.id in existing:
+            job_tree.item(job.id, values=values)
+            existing.discard(job.id)
+        else:
+            job_tree.insert("", tk.END, iid=job.id, values=values)
+    for iid in existing:
+        job_tree.delete(iid)
+
+    pause_button.config(text="Resume queue" if job_queue.paused else "Pause queue")
+
+    job = _selected_job()
+    text = "\n".join(list(job.log)[-500:]) if job is not None else ""
+    if job_log_box.get("1.0", "end-1c") != text:
+        job_log_box.config(state=tk.NORMAL)
+        job_log_box.delete("1.0", tk.END)
+        job_log_box.insert(tk.END, text)
+        job_log_box.config(state=tk.DISABLED)
+        job_log_box.see(tk.END)
+
+
+def enqueue_job(workspace=None):
+    ws = workspace or workspace_var.get()
+    job = job_queue.enqueue(ws, job_entry_var.get())
+    log_message(f"Queued job {job.id}: {job.entry_point} on {ws}", 'info')
+    refresh_job_window()
+
+
+def enqueue_other_workspace():
+    ws = filedialog.askdirectory(title="Select workspace to queue", initialdir=workspace_var.get())
+    if ws:
+        enqueue_job(ws)
+
+
+def _on_job_action(action):
+    job = _selected_job()
+    if job is None:
+        return
+    if action == "stop":
+        job_queue.stop(job.id)
+    elif action == "remove":
+        job_queue.remove(job.id) or log_message("Running jobs cannot be removed (stop them first).", 'warning')
+    elif action == "requeue":
+        job_queue.requeue(job.id)
+    elif action == "open" and job.output_path:
+        open_path(job.output_path)
+    refresh_job_window()
+
+
+def toggle_queue_pause():
+    job_queue.paused = not job_queue.paused
+    refresh_job_window()
+
+
+def open_job_window():
+    global job_window, job_tree, job_log_box, job_entry_var, pause_button
+    if job_window is not None:
+        job_window.lift()
+        return
+
+    job_window = tk.Toplevel(root)
+    job_window.title("Job Queue")
+    job_window.configure(bg=COLORS['bg'])
+
+    def _close():
+        global job_window
+        job_window.destroy()
+        job_window = None
+
+    job_window.protocol("WM_DELETE_WINDOW", _close)
+
+    top = tk.Frame(job_window, bg=COLORS['bg'])
+    top.pack(fill='x', padx=10, pady=(10, 6))
+
+    job_entry_var = tk.StringVar(master=job_window, value="run")
+    ttk.Combobox(top, textvariable=job_entry_var, values=ENTRY_POINTS, state="readonly",
+                 width=28).pack(side='left', padx=(0, 6))
+    ttk.Button(top, text="Queue current workspace", command=enqueue_job,
+               style="Primary.TButton").pack(side='left', padx=(0, 6))
+    ttk.Button(top, text="Queue other workspace…", command=enqueue_other_workspace,
+               style="Primary.TButton").pack(side='left', padx=(0, 6))
+
+    max_var = tk.IntVar(master=job_window, value=job_queue.max_concurrent)
+    tk.Spinbox(top, from_=1, to=64, width=4, textvariable=max_var,
+               command=lambda: job_queue.set_max_concurrent(max_var.get())).pack(side='right')
+    tk.Label(top, text=f"Concurrent jobs (core budget {read_repo_threads()}):",
+             bg=COLORS['bg'], fg=COLORS['text']).pack(side='right', padx=(0, 4))
+
+    columns = ("id", "workspace", "entry", "status", "stage", "progress", "threads")
+    job_tree = ttk.Treeview(job_window, columns=columns, show="headings", height=8)
+    for col, width in zip(columns, (70, 180, 190, 80, 70, 150, 60)):
+        job_tree.heading(col, text=col.capitalize())
+        job_tree.column(col, width=width, anchor='w')
+    job_tree.pack(fill='both', expand=True, padx=10)
+    job_tree.bind("<<TreeviewSelect>>", lambda e: refresh_job_window())
+
+    actions = tk.Frame(job_window, bg=COLORS['bg'])
+    actions.pack(fill='x', padx=10, pady=6)
+    for text, action in (("Stop", "stop"), ("Remove", "remove"), ("Requeue", "requeue"),
+                         ("Open output", "open")):
+        ttk.Button(actions, text=text, command=lambda a=action: _on_job_action(a),
+                   style="Primary.TButton").pack(side='left', padx=(0, 6))
+    pause_button = ttk.Button(actions, text="Pause queue", command=toggle_queue_pause,
+                              style="Primary.TButton")
+    pause_button.pack(side='right')
+
+    job_log_box = tk.Text(job_window, height=14, font=('Consolas', 9), bg='#1e1e1e', fg='#ffffff',
+                          wrap=tk.NONE, state=tk.DISABLED)
+    job_log_box.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+
+    refresh_job_window()
+
+
+# --- Dataset explorer (gui/explorer.py, optional: needs h5py, numpy, matplotlib) ---
+explorer_window = None
+
+
+def latest_run_path():
+    """Run folder from outputs/LATEST.txt, else the newest output_* folder (or None)."""
+    outputs = os.path.join(workspace_var.get(), "outputs")
+    try:
+        with open(os.path.join(outputs, "LATEST.txt"), "r", encoding="utf-8") as f:
+            p = f.read().strip()
+        if os.path.isdir(p):
+            return p
+    except OSError:
+        pass
+    try:
+        runs = sorted(d for d in os.listdir(outputs) if d.startswith("output_"))
+    except OSError:
+        return None
+    return os.path.join(outputs, runs[-1]) if runs else None
+
+
+def open_dataset_explorer(path=None):
+    """Open the explorer on `path` (default: the first dataset of the latest run)."""
+    global explorer_window
+    try:
+        from explorer import DatasetExplorer, find_datasets
+    except ImportError as e:
+        log_message(f"The dataset explorer needs h5py, numpy and matplotlib ({e}). "
+                    "Install them with: pip install -r gui/requirements.txt", 'error')
+        return
+
+    def _closed():
+        global explorer_window
+        explorer_window = None
+
+    if explorer_window is None:
+        explorer_window = DatasetExplorer(root, os.path.join(workspace_var.get(), "outputs"), COLORS,
+                                          on_close=_closed)
+    else:
+        explorer_window.lift()
+
+    if path is None and explorer_window.dataset is None:
+        run = latest_run_path()
+        datasets = find_datasets(run) if run else []
+        path = datasets[0] if datasets else None
+    if path is not None and not explorer_window.open(path):
+        log_message(f"Could not open dataset: {path}", 'warning')
+
+
+# --- Convergence dashboard (simulation_info/evaluations.jsonl, see gui/evaluations.py) ---
+CONVERGENCE_REFRESH_MS = 1000
+CONVERGENCE_MAX_POINTS = 2000  # metric dots drawn (evenly strided); the best-so-far curve is exact
+
+convergence_window = None
+convergence_log = None
+convergence_pinned_run = None  # run chosen with "Open run…" (else: the running / latest run)
+convergence_drawn = None
+convergence_after = None
+
+
+def _convergence_run_path():
+    if convergence_pinned_run:
+        return convergence_pinned_run
+    if current_job is not None and current_job.output_path:
+        return current_job.output_path
+    ws = os.path.abspath(workspace_var.get()).replace("\\", "/")
+    for job in job_queue.running():
+        if job.workspace == ws and job.output_path:
+            return job.output_path
+    return latest_run_path()
+
+
+def pin_convergence_run():
+    global convergence_pinned_run
+    folder = filedialog.askdirectory(title="Select run folder",
+                                     initialdir=os.path.join(workspace_var.get(), "outputs"))
+    convergence_pinned_run = folder or None
+    update_convergence()
+
+
+def update_convergence(reschedule=False):
+    global convergence_log, convergence_drawn, convergence_after
+    if convergence_window is None:
+        return
+    run = _convergence_run_path()
+    path = evaluations_path(run) if run else None
+    if convergence_log is None or convergence_log.path != path:
+        convergence_log = EvaluationLog(path) if path else None
+        convergence_drawn = None
+    if convergence_log is not None:
+        convergence_log.poll()
+
+    size = (convergence_canvas.winfo_width(), convergence_canvas.winfo_height())
+    key = (path, convergence_log.n_evaluations if convergence_log else 0, size, convergence_logy.get())
+    if key != convergence_drawn:
+        convergence_drawn = key
+        draw_convergence(run)
+    if reschedule:
+        convergence_after = root.after(CONVERGENCE_REFRESH_MS, lambda: update_convergence(reschedule=True))
+
+
+def draw_convergence(run):
+    log = convergence_log
+    c = convergence_canvas
+    c.delete("all")
+    w, h = max(c.winfo_width(), 200), max(c.winfo_height(), 150)
+    left, right, top, bottom = 70, 15, 15, 30
+
+    convergence_run_label.config(text=f"Run: {run or '—'}")
+    if log is None or log.n_evaluations == 0:
+        c.create_text(w / 2, h / 2, text="No evaluations yet", fill=COLORS['dark'])
+        convergence_stats_label.config(text="")
+        return
+
+    points = [(i, m) for i, m in zip(log.index, log.metrics) if m is not None]
+    best = [(i, b) for i, b in zip(log.index, log.best) if b is not None]
+    values = [m for _, m in points]
+    use_log = convergence_logy.get() and values and min(values) > 0
+    ty = math.log10 if use_log else (lambda v: v)
+
+    if values:
+        ymin, ymax = ty(min(values)), ty(max(values))
+        if ymax - ymin < 1e-12:
+            ymin, ymax = ymin - 1, ymax + 1
+        xmin, xmax = log.index[0], max(log.index[-1], log.index[0] + 1)
+
+        def xy(i, v):
+            return (left + (i - xmin) / (xmax - xmin) * (w - left - right),
+                    top + (ymax - ty(v)) / (ymax - ymin) * (h - top - bottom))
+
+        c.create_rectangle(left, top, w - right, h - bottom, outline=COLORS['light'])
+        step = max(len(points) // CONVERGENCE_MAX_POINTS, 1)
+        for i, m in points[::step]:
+            x, y = xy(i, m)
+            c.create_oval(x - 1.5, y - 1.5, x + 1.5, y + 1.5, fill=COLORS['secondary'], outline="")
+        # best-so-far as a step curve through its change points
+        curve = []
+        for k, (i, b) in enumerate(best):
+            if k == 0 or b != best[k - 1][1]:
+                if curve:
+                    curve.extend(xy(i, best[k - 1][1]))
+                curve.extend(xy(i, b))
+        curve.extend(xy(log.index[-1], best[-1][1]))
+        if len(curve) >= 4:
+            c.create_line(*curve, fill=COLORS['danger'], width=2)
+        fmt = (lambda v: f"1e{v:.2g}") if use_log else (lambda v: f"{v:.4g}")
+        c.create_text(left - 5, top, text=fmt(ymax), anchor='ne', font=('Arial', 8))
+        c.create_text(left - 5, h - bottom, text=fmt(ymin), anchor='se', font=('Arial', 8))
+        c.create_text(left, h - bottom + 4, text=str(xmin), anchor='nw', font=('Arial', 8))
+        c.create_text(w - right, h - bottom + 4, text=f"evaluation {xmax}", anchor='ne', font=('Arial', 8))
+
+    lines = [f"Evaluations: {log.n_evaluations} ({log.n_penalties} penalties)"]
+    if best:
+        lines.append(f"Best so far: {best[-1][1]:.6g}")
+    rate = log.throughput_per_min()
+    if rate is not None:
+        lines.append(f"Throughput: {rate:.1f} evaluations/min (last {int(THROUGHPUT_WINDOW_S / 60)} min)")
+    for stage, st in log.stages.items():
+        span = (st["last_t"] - st["first_t"]) if st["first_t"] is not None else 0
+        per_eval = st["wall_s"] / st["n"] if st["n"] else 0
+        lines.append(f"{stage}: {st['n']} evaluations, {per_eval:.3g} s each, "
+                     f"{format_eta(span)} elapsed")
+    params = log.best_params_dict()
+    if params:
+        lines.append("Best parameters: " + ", ".join(f"{k}={v:.6g}" for k, v in params.items()))
+    convergence_stats_label.config(text="\n".join(lines))
+
+
+def open_convergence_window():
+    global convergence_window, convergence_canvas, convergence_stats_label, convergence_run_label
+    global convergence_logy, convergence_log, convergence_pinned_run
+    if convergence_window is not None:
+        convergence_window.lift()
+        return
+
+    convergence_window = tk.Toplevel(root)
+    convergence_window.title("Convergence")
+    convergence_window.configure(bg=COLORS['bg'])
+    convergence_log = None
+    convergence_pinned_run = None
+
+    def _close():
+        global convergence_window
+        root.after_cancel(convergence_after)
+        convergence_window.destroy()
+        convergence_window = None
+
+    convergence_window.protocol("WM_DELETE_WINDOW", _close)
+
+    top = tk.Frame(convergence_window, bg=COLORS['bg'])
+    top.pack(fill='x', padx=10, pady=(10, 4))
+    ttk.Button(top, text="Open run…", command=pin_convergence_run,
+               style="Primary.TButton").pack(side='left', padx=(0, 6))
+    convergence_logy = tk.BooleanVar(master=convergence_window, value=False)
+    tk.Checkbutton(top, text="log y", variable=convergence_logy, command=update_convergence,
+                   bg=COLORS['bg'], fg=COLORS['text']).pack(side='left', padx=(0, 6))
+    convergence_run_label = tk.Label(top, text="", bg=COLORS['bg'], fg=COLORS['text'], anchor='w')
+    convergence_run_label.pack(side='left', fill='x', expand=True)
+
+    convergence_canvas = tk.Canvas(convergence_window, width=700, height=320, bg='white',
+                                   highlightthickness=0)
+    convergence_canvas.pack(fill='both', expand=True, padx=10)
+    convergence_stats_label = tk.Label(convergence_window, text="", justify='left', anchor='w',
+                                       bg=COLORS['bg'], fg=COLORS['text'], font=('Consolas', 9))
+    convergence_stats_label.pack(fill='x', padx=10, pady=(4, 10))
+
+    update_convergence(reschedule=True)
+
+
+# --- Run history (SQLite catalog of the output folders, see gui/catalog.py) ---
+RUN_TABLE_LIMIT = 2000
+RUN_TABLE_COLUMNS = (
+    ("run_id", "Run", 170), ("entry_point", "Entry point", 170), ("status", "Status", 80),
+    ("stage", "Stage", 70), ("started_unix", "Started", 130), ("duration_s", "Duration", 80),
+    ("best_metric", "Best metric", 100), ("best_performance", "Best performance", 110),
+    ("n_evaluations", "Evaluations", 80), ("param_value", "Parameter", 100),
+)
 
-    threading.Timer(STOP_KILL_TIMEOUT_S, lambda: root.after(0, _hard_kill)).start()
+run_window = None
+run_sort = ["started_unix", True]  # column, descending
+run_inputs_hash = None
+run_rows = {}  # path -> catalog row of the rows shown
+
+
+def _format_run_value(col, v):
+    if v is None:
+        return ""
+    if col in ("started_unix", "finished_unix"):
+        return datetime.datetime.fromtimestamp(v).strftime("%Y-%m-%d %H:%M")
+    if col == "duration_s":
+        return format_eta(v)
+    if isinstance(v, float):
+        return f"{v:.6g}"
+    return str(v)
+
+
+def update_run_catalog_async():
+    """Re-index the outputs of the current workspace in the background, then refresh the table."""
+    ws = workspace_var.get()
+
+    def _work():
+        update_run_catalog(ws)
+        if run_window is not None:
+            root.after(0, refresh_run_table)
+
+    threading.Thread(target=_work, daemon=True).start()
+
+
+def _float_or_none(text):
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def refresh_run_table():
+    if run_window is None:
+        return
+    catalog = RunCatalog(workspace_var.get())
+    param = run_param_var.get() or None
+    order_by, descending = run_sort
+    if order_by == "param_value" and not param:
+        order_by = "started_unix"
+    try:
+        rows = catalog.query(status=run_status_var.get() or None,
+                             entry_point=run_entry_var.get() or None,
+                             text=run_text_var.get().strip(),
+                             param=param,
+                             param_min=_float_or_none(run_min_var.get()),
+                             param_max=_float_or_none(run_max_var.get()),
+                             inputs_hash=run_inputs_hash,
+                             order_by=order_by, descending=descending, limit=RUN_TABLE_LIMIT)
+        run_status_combo.config(values=[""] + catalog.distinct("status"))
+        run_entry_combo.config(values=[""] + catalog.distinct("entry_point"))
+        run_param_combo.config(values=[""] + catalog.param_names())
+    except Exception as e:
+        log_message(f"Could not read the run catalog: {e}", 'error')
+        return
+
+    run_tree.delete(*run_tree.get_children())
+    run_rows.clear()
+    for row in rows:
+        run_rows[row["path"]] = row
+        run_tree.insert("", tk.END, iid=row["path"],
+                        values=[_format_run_value(col, row.get(col)) for col, _, _ in RUN_TABLE_COLUMNS])
+    for col, text, _ in RUN_TABLE_COLUMNS:
+        if col == "param_value":
+            text = param or text
+        if col == run_sort[0]:
+            text += " ▼" if run_sort[1] else " ▲"
+        run_tree.heading(col, text=text)
+    same = " (same inputs as the selected run)" if run_inputs_hash else ""
+    run_count_label.config(text=f"{len(rows)} runs{same}")
+
+
+def sort_run_table(col):
+    run_sort[:] = [col, not run_sort[1] if run_sort[0] == col else col != "run_id"]
+    refresh_run_table()
+
+
+def toggle_same_inputs():
+    global run_inputs_hash
+    if run_inputs_hash is not None:
+        run_inputs_hash = None
+    else:
+        sel = run_tree.selection()
+        if not sel:
+            return
+        run_inputs_hash = run_rows[sel[0]]["inputs_hash"]
+        if run_inputs_hash is None:
+            log_message("The selected run has no inputs manifest.", 'info')
+    refresh_run_table()
+
+
+def open_run_window():
+    global run_window, run_tree, run_count_label, run_text_var, run_status_var, run_entry_var
+    global run_param_var, run_min_var, run_max_var, run_status_combo, run_entry_combo, run_param_combo
+    if run_window is not None:
+        run_window.lift()
+        return
+
+    run_window = tk.Toplevel(root)
+    run_window.title("Run History")
+    run_window.configure(bg=COLORS['bg'])
+
+    def _close():
+        global run_window
+        run_window.destroy()
+        run_window = None
+
+    run_window.protocol("WM_DELETE_WINDOW", _close)
+
+    filters = tk.Frame(run_window, bg=COLORS['bg'])
+    filters.pack(fill='x', padx=10, pady=(10, 6))
+
+    def _label(text):
+        tk.Label(filters, text=text, bg=COLORS['bg'], fg=COLORS['text']).pack(side='left', padx=(0, 4))
+
+    run_text_var = tk.StringVar(master=run_window)
+    run_status_var = tk.StringVar(master=run_window)
+    run_entry_var = tk.StringVar(master=run_window)
+    run_param_var = tk.StringVar(master=run_window)
+    run_min_var = tk.StringVar(master=run_window)
+    run_max_var = tk.StringVar(master=run_window)
+
+    _label("Search:")
+    search = ttk.Entry(filters, textvariable=run_text_var, width=18)
+    search.pack(side='left', padx=(0, 8))
+    search.bind("<Return>", lambda e: refresh_run_table())
+    _label("Status:")
+    run_status_combo = ttk.Combobox(filters, textvariable=run_status_var, state="readonly", width=10)
+    run_status_combo.pack(side='left', padx=(0, 8))
+    _label("Entry point:")
+    run_entry_combo = ttk.Combobox(filters, textvariable=run_entry_var, state="readonly", width=26)
+    run_entry_combo.pack(side='left', padx=(0, 8))
+    _label("Parameter:")
+    run_param_combo = ttk.Combobox(filters, textvariable=run_param_var, state="readonly", width=18)
+    run_param_combo.pack(side='left', padx=(0, 4))
+    for var in (run_min_var, run_max_var):
+        entry = ttk.Entry(filters, textvariable=var, width=8)
+        entry.pack(side='left', padx=(0, 4))
+        entry.bind("<Return>", lambda e: refresh_run_table())
+    for combo in (run_status_combo, run_entry_combo, run_param_combo):
+        combo.bind("<<ComboboxSelected>>", lambda e: refresh_run_table())
+
+    columns = [col for col, _, _ in RUN_TABLE_COLUMNS]
+    run_tree = ttk.Treeview(run_window, columns=columns, show="headings", height=18)
+    for col, text, width in RUN_TABLE_COLUMNS:
+        run_tree.heading(col, text=text, command=lambda c=col: sort_run_table(c))
+        run_tree.column(col, width=width, anchor='w')
+    run_tree.pack(fill='both', expand=True, padx=10)
+    run_tree.bind("<Double-1>", lambda e: run_tree.selection() and open_path(run_tree.selection()[0]))
+
+    actions = tk.Frame(run_window, bg=COLORS['bg'])
+    actions.pack(fill='x', padx=10, pady=(6, 10))
+    ttk.Button(actions, text="Refresh", command=update_run_catalog_async,
+               style="Primary.TButton").pack(side='left', padx=(0, 6))
+    ttk.Button(actions, text="Open folder",
+               command=lambda: run_tree.selection() and open_path(run_tree.selection()[0]),
+               style="Primary.TButton").pack(side='left', padx=(0, 6))
+    ttk.Button(actions, text="Same inputs", command=toggle_same_inputs,
+               style="Primary.TButton").pack(side='left', padx=(0, 6))
+    run_count_label = tk.Label(actions, text="", bg=COLORS['bg'], fg=COLORS['text'])
+    run_count_label.pack(side='right')
+
+    refresh_run_table()
+    update_run_catalog_async()
+
+
+def stop_simulation():
+    if current_job is None:
+        log_message("No simulation running.", 'info')
+        return
+
+    # Graceful stop (WORKSPACE/STOP) first, hard kill if Julia doesn't exit
+    current_job.request_stop()
+    log_message(f"Stop requested (created {current_job.stop_file}).", "warning")
+    refresh_file_tree()
 
 def simulation_finished():
 
     """Called when simulation completes or stops"""
-    global process
-    process = None
+    global current_job, events_connected
+    current_job = None
+    events_connected = False
     main_button.config(text="Start Simulation", style="Success.TButton")
     progress_bar.stop()
     progress_bar.config(mode='determinate', value=0)
     stage_value_label.config(text="Stage: —")
     eta_value_label.config(text="ETA: —")
     log_message("Simulation finished.", 'success')
+    if run_window is not None:
+        refresh_run_table()
 
     # Re-enable other start buttons
     try:
@@ -851,60 +1545,10 @@ def simulation_finished():
         #dataset_only_button.state(['!disabled'])
         opt_only_button.state(['!disabled'])
         hb_only_button.state(['!disabled'])
+        yield_button.state(['!disabled'])
     except Exception:
         pass
 
-def run_function(func_name="run"):
-    global process
-    if process is not None:
-        log_message("Simulation already running!", 'warning')
-        return
-
-    log_message(f"Running function: {func_name}", 'info')
-
-    julia_code = f'''
-    using Pkg
-    Pkg.activate("{project_path}")
-    push!(LOAD_PATH, "{src_path}")
-    using JosephsonCircuitsOptimizer
-    JosephsonCircuitsOptimizer.{func_name}()
-    '''
-
-    def run_in_thread():
-        global process
-        try:
-            env = julia_env_with_threads()
-            try:
-                root.after(0, lambda: log_message(
-                    f"Launching Julia with JULIA_NUM_THREADS={env.get('JULIA_NUM_THREADS','?')}",
-                    "info"
-                ))
-            except Exception:
-                pass
-
-            process = subprocess.Popen(
-                [JULIA_EXE, '--project=' + project_path, '-e', julia_code],
-                cwd=project_path,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                env=env
-            )
-
-            for line in process.stdout:
-                if process is None:
-                    break
-                root.after(0, lambda l=line: log_message(l.strip(), 'info'))
-
-            process.wait()
-            process = None
-
-        except Exception as e:
-            root.after(0, lambda: log_message(f"Error: {e}", 'error'))
-            process = None
-
-    threading.Thread(target=run_in_thread, daemon=True).start()
-
 def make_scrollable(parent, bg):
     canvas = tk.Canvas(parent, bg=bg, highlightthickness=0)
     vscroll = ttk.Scrollbar(parent, orient="vertical", command=canvas.yview)
@@ -953,8 +1597,7 @@ show_error = tk.BooleanVar(value=True)
 show_progress = tk.BooleanVar(value=True)
 auto_scroll = tk.BooleanVar(value=True)
 
-# --- Log buffer (for filtering / re-render) ---
-log_buffer = []  # (timestamp, msg_type, message)
+# --- Output panel size (older lines are trimmed) ---
 MAX_LOG_LINES = 5000
 
 # Workspace selector variable (must be created after root exists)
@@ -1066,6 +1709,62 @@ hb_only_button = ttk.Button(
 )
 hb_only_button.pack(side='left', padx=(0, 10))
 
+yield_button = ttk.Button(
+    button_frame,
+    text="Yield Analysis",
+    command=start_yield_analysis,
+    style="Primary.TButton"
+)
+yield_button.pack(side='left', padx=(0, 10))
+
+plan_button = ttk.Button(
+    button_frame,
+    text="Plan Run",
+    command=start_plan_run,
+    style="Primary.TButton"
+)
+plan_button.pack(side='left', padx=(0, 10))
+
+calibrate_button = ttk.Button(
+    button_frame,
+    text="Calibrate Threads",
+    command=start_execution_calibration,
+    style="Primary.TButton"
+)
+calibrate_button.pack(side='left', padx=(0, 10))
+
+job_queue_button = ttk.Button(
+    button_frame,
+    text="Job Queue",
+    command=open_job_window,
+    style="Primary.TButton"
+)
+job_queue_button.pack(side='left', padx=(0, 10))
+
+run_history_button = ttk.Button(
+    button_frame,
+    text="Run History",
+    command=open_run_window,
+    style="Primary.TButton"
+)
+run_history_button.pack(side='left', padx=(0, 10))
+
+explorer_button = ttk.Button(
+    button_frame,
+    text="Dataset Explorer",
+    command=open_dataset_explorer,
+    style="Primary.TButton"
+)
+explorer_button.pack(side='left', padx=(0, 10))
+
+convergence_button = ttk.Button(
+    button_frame,
+    text="Convergence",
+    command=open_convergence_window,
+    style="Primary.TButton"
+)
+convergence_button.pack(side='left', padx=(0, 10))
+
 restore_btn = ttk.Button(button_frame,
                          text="Restore LATEST inputs",
                          command=restore_latest_inputs_snapshot,
@@ -1135,26 +1834,7 @@ eta_value_label = tk.Label(progress_frame,
 eta_value_label.pack(side='right', padx=(10, 0))
 
 
-def _format_eta(seconds: float) -> str:
-    try:
-        if seconds < 0 or seconds != seconds:  # NaN or negative
-            return "—"
-        seconds = int(round(seconds))
-        m = seconds // 60
-        s = seconds % 60
-        if m > 0:
-            return f"{m}m {s:02d}s"
-        return f"{s}s"
-    except Exception:
-        return "—"
-
-
-def _handle_stage_line(line: str):
-    # STAGE name=HB
-    try:
-        name = line.split("name=", 1)[1].strip()
-    except Exception:
-        name = "—"
+def _set_stage(name):
     stage_value_label.config(text=f"Stage: {name}")
     eta_value_label.config(text="ETA: —")
     # Spinner during stage-only updates (INIT/LIN/PLOT)
@@ -1162,21 +1842,7 @@ def _handle_stage_line(line: str):
     progress_bar.start()
 
 
-def _handle_progress_line(line: str):
-    # PROGRESS i=12 N=40 ETA=183.5s stage=HB
-    parts = {}
-    for token in line.replace("PROGRESS", "").strip().split():
-        if "=" in token:
-            k, v = token.split("=", 1)
-            parts[k.strip()] = v.strip()
-
-    try:
-        i = int(parts.get("i", "0"))
-        N = int(parts.get("N", "0"))
-    except Exception:
-        return
-
-    stage = parts.get("stage", "—")
+def _set_progress(stage, i, N, eta_s=None):
     stage_value_label.config(text=f"Stage: {stage}")
 
     # determinate progress
@@ -1184,29 +1850,21 @@ def _handle_progress_line(line: str):
     progress_bar.config(mode='determinate', maximum=max(N, 1), value=min(i, max(N, 1)))
 
     # ETA may be absent
-    if "ETA" in parts:
-        eta_s = parts["ETA"].replace("s", "")
-        try:
-            eta_value_label.config(text=f"ETA: {_format_eta(float(eta_s))}")
-        except Exception:
-            eta_value_label.config(text="ETA: —")
-    else:
+    if eta_s is None:
         eta_value_label.config(text="ETA: —")
+    else:
+        eta_value_label.config(text=f"ETA: {format_eta(float(eta_s))}")
 
 
-def _handle_progress_done(line: str):
-    # PROGRESS_DONE stage=HB
-    try:
-        stage = line.split("stage=", 1)[1].strip()
-    except Exception:
-        stage = "—"
+def _set_stage_done(stage):
     stage_value_label.config(text=f"Stage: {stage}")
     eta_value_label.config(text="ETA: —")
     progress_bar.stop()
 
 
-def update_plot_metadata(image_path):
-    meta = load_sidecar_json(image_path)
+def update_plot_metadata(image_path, meta=None):
+    if meta is None:
+        meta = load_sidecar_json(image_path)
     new_text = format_metadata(meta)
 
     # Save scroll position
@@ -1256,6 +1914,7 @@ output_scrollbar = ttk.Scrollbar(output_frame, orient='vertical', command=output
 output_box.configure(yscrollcommand=output_scrollbar.set)
 
 output_box.pack(side='left', fill='both', expand=True)
+configure_output_tags()
 output_scrollbar.pack(side='right', fill='y')
 
 # File browser under output (open files/folders externally on double-click)
@@ -1288,6 +1947,7 @@ tree.configure(yscrollcommand=tree_scroll.set)
 tree_scroll.pack(side='right', fill='y')
 
 tree.bind("<Double-1>", on_tree_double_click)
+tree.bind("<<TreeviewOpen>>", on_tree_open)
 
 # Right panel - Plots
 right_panel = tk.LabelFrame(content_frame, text="Plot Viewer", 
@@ -1374,8 +2034,9 @@ corr_panel = tk.LabelFrame(content_frame, text="Correlation Viewer",
 corr_panel.pack(side='right', fill='both', expand=True)
 
 
-def update_corr_metadata(image_path):
-    meta = load_sidecar_json(image_path)
+def update_corr_metadata(image_path, meta=None):
+    if meta is None:
+        meta = load_sidecar_json(image_path)
     corr_metadata_box.delete(1.0, tk.END)
     corr_metadata_box.insert(tk.END, format_metadata(meta))
 
@@ -1441,13 +2102,18 @@ corr_meta_scroll.config(command=corr_metadata_box.yview)
 log_message("GUI initialized. Ready to run simulations.", 'success')
 ensure_workspace_structure(workspace_var.get())
 refresh_file_tree()
+threading.Thread(target=decode_worker, daemon=True).start()
+flush_log_queue()
+job_queue_tick()
 update_corr()
 update_plot()
 
 # Handle window closing
 def on_closing():
-    if process is not None:
+    if current_job is not None:
         stop_simulation()
+    job_queue.stop_all()
+    job_queue.save()
     root.destroy()
 
 root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import catalog  # noqa: E402
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+class RunCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workspace = self.tmp.name
+        self.catalog = catalog.RunCatalog(self.workspace)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _make_run(self, run_id, status="finished", metric=None, params=None, inputs=None, entry_point="run"):
+        run_path = os.path.join(self.workspace, "outputs", run_id)
+        _write_json(os.path.join(run_path, "simulation_info", "status.json"),
+                    {"status": status, "stage": "HB", "timestamp_utc": "2030-01-01T00:00:00Z", "message": run_id})
+        _write_json(os.path.join(run_path, "simulation_info", "run_config.json"), {
+            "entry_point": entry_point,
+            "inputs_files": {name: {"sha256": h} for name, h in (inputs or {}).items()},
+            "results": {"best_metric": metric, "best_device_parameters": params or {}},
+        })
+        return run_path
+
+    def test_update_and_query(self):
+        self._make_run("output_2030-01-01_00-00-01", metric=3.0, params={"Lj": 1e-10}, inputs={"a.json": "h1"})
+        self._make_run("output_2030-01-01_00-00-02", metric=1.0, params={"Lj": 2e-10}, inputs={"a.json": "h1"})
+        self._make_run("output_2030-01-01_00-00-03", status="error", entry_point="run_sweep_only")
+
+        self.assertEqual(self.catalog.update(), 3)
+        self.assertEqual(self.catalog.update(), 0)  # nothing changed
+
+        runs = self.catalog.query(order_by="best_metric", descending=False)
+        self.assertEqual([r["best_metric"] for r in runs], [1.0, 3.0, None])  # NULLs last
+        self.assertEqual([r["run_id"] for r in self.catalog.query(status="error")], ["output_2030-01-01_00-00-03"])
+        self.assertEqual(self.catalog.distinct("entry_point"), ["run", "run_sweep_only"])
+        self.assertEqual(self.catalog.param_names(), ["Lj"])
+
+        same_inputs = {r["inputs_hash"] for r in runs[:2]}
+        self.assertEqual(len(same_inputs), 1)
+        self.assertIsNone(runs[2]["inputs_hash"])
+
+        by_param = self.catalog.query(param="Lj", param_min=1.5e-10)
+        self.assertEqual([(r["run_id"], r["param_value"]) for r in by_param], [("output_2030-01-01_00-00-02", 2e-10)])
+        self.assertEqual(len(self.catalog.query(text="00-00-0")), 3)
+        with self.assertRaises(ValueError):
+            self.catalog.query(order_by="signature; DROP TABLE runs")
+
+    def test_changed_and_deleted_runs(self):
+        first = self._make_run("output_2030-01-01_00-00-01", status="running")
+        self._make_run("output_2030-01-01_00-00-02")
+        self.catalog.update()
+
+        self._make_run("output_2030-01-01_00-00-01", metric=2.0, params={"Cj": 1.0})
+        os.utime(os.path.join(first, "simulation_info", "status.json"), ns=(1, 1))  # mtime always changes
+        self.assertEqual(self.catalog.update(run_paths=[first]), 1)
+        updated = self.catalog.query(param="Cj", param_min=0.0)
+        self.assertEqual([(r["status"], r["best_metric"], r["param_value"]) for r in updated], [("finished", 2.0, 1.0)])
+
+        shutil.rmtree(os.path.join(self.workspace, "outputs", "output_2030-01-01_00-00-02"))
+        self.assertEqual(self.catalog.update(), 1)
+        self.assertEqual([r["run_id"] for r in self.catalog.query()], ["output_2030-01-01_00-00-01"])
+
+    def test_read_run_without_files(self):
+        run_path = os.path.join(self.workspace, "outputs", "output_bad-name")
+        os.makedirs(run_path)
+        run, params, inputs = catalog.read_run(run_path, entry_point="run_nonlinear_only")
+        self.assertEqual(run["entry_point"], "run_nonlinear_only")
+        self.assertIsNone(run["started_unix"])
+        self.assertEqual((params, inputs), ({}, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import evaluations  # noqa: E402
+
+
+class EvaluationLogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = evaluations.evaluations_path(self.tmp.name)
+        os.makedirs(os.path.dirname(self.path))
+        self.log = evaluations.EvaluationLog(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _append(self, text):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_incremental_poll(self):
+        self.assertEqual(self.log.poll(), 0)  # no file yet
+        self._append(json.dumps({"param_names": ["Lj", "Cj"]}) + "\n")
+        self._append(json.dumps({"i": 1, "t": 100.0, "stage": "LIN", "metric": 5.0, "wall_time_s": 2.0,
+                                 "params": [1, 2]}) + "\n")
+        self._append(json.dumps({"i": 2, "t": 160.0, "stage": "LIN", "metric": 1e8, "params": [3, 4]}) + "\n")
+        self._append('{"i": 3, "t": 220.0, "stage": "BO", "met')  # line still being written
+        self.assertEqual(self.log.poll(), 2)
+
+        self._append('ric": 2.0, "params": [5, 6]}\nnot json\n')
+        self.assertEqual(self.log.poll(), 1)
+        self.assertEqual(self.log.poll(), 0)
+
+        self.assertEqual(self.log.index, [1, 2, 3])
+        self.assertEqual(self.log.metrics, [5.0, None, 2.0])  # the penalty is not a result
+        self.assertEqual(self.log.best, [5.0, 5.0, 2.0])
+        self.assertEqual(self.log.n_penalties, 1)
+        self.assertEqual(self.log.best_params_dict(), {"Lj": 5, "Cj": 6})
+        self.assertEqual(self.log.stages["LIN"]["n"], 2)
+        self.assertEqual(self.log.stages["LIN"]["wall_s"], 2.0)
+        self.assertAlmostEqual(self.log.throughput_per_min(), 1.0)
+        self.assertAlmostEqual(self.log.throughput_per_min(window_s=60.0), 1.0)
+
+    def test_replaced_file_starts_over(self):
+        self._append("".join(json.dumps({"i": i, "metric": float(i)}) + "\n" for i in range(1, 4)))
+        self.assertEqual(self.log.poll(), 3)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"i": 1, "metric": 7.0}) + "\n")
+        self.assertEqual(self.log.poll(), 1)
+        self.assertEqual((self.log.n_evaluations, self.log.best), (1, [7.0]))
+        self.assertIsNone(self.log.throughput_per_min())
+        self.assertEqual(self.log.best_params_dict(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+try:
+    import h5py
+    import numpy as np
+
+    import explorer
+except ImportError:  # optional GUI dependencies (gui/requirements.txt)
+    explorer = None
+
+
+@unittest.skipIf(explorer is None, "h5py, numpy or matplotlib not installed")
+class H5DatasetTest(unittest.TestCase):
+    NAMES = ["Lj", "Cj", "metric"]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rows = 1000
+        lj = np.linspace(1.0, 2.0, rows)
+        self.data = np.vstack([lj, 3.0 * lj + 1.0, np.full(rows, 5.0)])  # (columns × rows), as h5py sees Julia
+        self.data[1, 7] = np.nan
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, chunks):
+        path = os.path.join(self.tmp.name, "df_uniform_analysis.h5")
+        with h5py.File(path, "w") as f:
+            f.create_dataset("df_matrix", data=self.data, chunks=chunks)
+            f.create_dataset("df_filtered_matrix", data=self.data[:, :10])
+            f.create_dataset("df_column_names", data=[n.encode() for n in self.NAMES])
+        return explorer.H5Dataset(path)
+
+    def _check(self, ds):
+        self.assertEqual(list(ds.tables), ["filtered", "all"])
+        self.assertEqual((ds.n_rows("all"), ds.n_rows("filtered")), (1000, 10))
+        np.testing.assert_array_equal(ds.column("all", "Lj"), self.data[0])
+        np.testing.assert_array_equal(ds.column("all", "Lj", step=100), self.data[0, ::100])
+        self.assertIs(ds.column("all", "Lj"), ds.column("all", "Lj"))  # cached
+
+        corr, used = ds.correlation("all", ["Lj", "Cj", "metric"])
+        self.assertEqual(used, 999)  # the NaN row is left out
+        self.assertAlmostEqual(corr[0, 1], 1.0)
+        self.assertTrue(np.isnan(corr[0, 2]))  # constant column
+        _, used = ds.correlation("all", ["Lj", "Cj"], max_rows=100)
+        self.assertEqual(used, 100)
+
+    def test_column_chunked_dataset(self):
+        ds = self._write(chunks=(1, 256))
+        try:
+            self._check(ds)
+            self.assertNotIsInstance(ds._array("all"), np.memmap)
+        finally:
+            ds.close()
+
+    def test_contiguous_dataset_is_memory_mapped(self):
+        ds = self._write(chunks=None)
+        try:
+            self._check(ds)
+            self.assertIsInstance(ds._array("all"), np.memmap)
+        finally:
+            ds.close()
+
+    def test_not_a_dataset(self):
+        path = os.path.join(self.tmp.name, "other.h5")
+        with h5py.File(path, "w") as f:
+            f.create_dataset("x", data=[1.0])
+        with self.assertRaises(ValueError):
+            explorer.H5Dataset(path)
+
+    def test_find_datasets(self):
+        for name in ("df_nonlinear_analysis_2.h5", "df_nonlinear_analysis.h5", "df_uniform_analysis.h5", "a.txt"):
+            open(os.path.join(self.tmp.name, name), "w").close()
+        self.assertEqual([os.path.basename(p) for p in explorer.find_datasets(self.tmp.name)],
+                         ["df_uniform_analysis.h5", "df_nonlinear_analysis.h5", "df_nonlinear_analysis_2.h5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import jco  # noqa: E402
+
+
+class JobQueuePersistenceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "queue.json")
+        self.ws_a = os.path.join(self.tmp.name, "ws_a")
+        self.ws_b = os.path.join(self.tmp.name, "ws_b")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_jobs_survive_a_restart(self):
+        queue = jco.JobQueue("julia", path=self.path, max_concurrent=2)
+        a = queue.enqueue(self.ws_a, "run_sweep_only")
+        b = queue.enqueue(self.ws_b, "seed_next_run_from_latest!", options={"overwrite": True})
+        a.status = jco.RUNNING  # the GUI is closed while it runs
+        queue.save()
+
+        restored = jco.JobQueue("julia", path=self.path)
+        self.assertEqual(restored.max_concurrent, 2)
+        self.assertEqual([j.id for j in restored.jobs], [a.id, b.id])
+        self.assertEqual(restored.get(a.id).status, jco.INTERRUPTED)
+        self.assertEqual(restored.get(a.id).entry_point, "run_sweep_only")
+        self.assertEqual(restored.get(b.id).status, jco.QUEUED)
+        self.assertEqual(restored.get(b.id).options, {"overwrite": True})
+        self.assertTrue(restored.paused)  # a restored queue waits for an explicit resume
+        self.assertEqual(restored.tick(), [])
+
+    def test_remove_and_requeue(self):
+        queue = jco.JobQueue("julia", path=self.path)
+        job = queue.enqueue(self.ws_a)
+        self.assertFalse(queue.requeue(job.id))  # only finished jobs
+        job.status, job.returncode = jco.FAILED, 1
+        self.assertTrue(queue.requeue(job.id))
+        self.assertEqual((job.status, job.returncode), (jco.QUEUED, None))
+
+        self.assertTrue(queue.remove(job.id))
+        self.assertFalse(queue.remove(job.id))
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["jobs"], [])
+
+    def test_unreadable_file_gives_an_empty_queue(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        queue = jco.JobQueue("julia", path=self.path)
+        self.assertEqual(queue.jobs, [])
+        self.assertFalse(queue.paused)
+
+    def test_threads_are_split_across_active_jobs(self):
+        queue = jco.JobQueue("julia", path=None, max_concurrent=2, core_budget=8)
+        queue.enqueue(self.ws_a)
+        self.assertEqual(queue.threads_per_job(), 8)
+        queue.enqueue(self.ws_b)
+        queue.enqueue(self.ws_b)
+        self.assertEqual(queue.threads_per_job(), 4)
+        self.assertFalse(os.path.exists(self.path))  # path=None: nothing is written
+
+
+class JuliaCodeTest(unittest.TestCase):
+    def test_options_are_keyword_arguments(self):
+        code = jco.julia_code("seed_next_run_from_latest!", "/w", {"overwrite": False, "tag": "x"})
+        self.assertIn('seed_next_run_from_latest!(workspace=raw"/w", overwrite=false, tag=raw"x")', code)
+        self.assertIn("run(workspace=raw\"/w\", create_workspace=true)", jco.julia_code("run", "/w"))
+        with self.assertRaises(ValueError):
+            jco.julia_code("rm", "/w")
+
+
+if __name__ == "__main__":
+    unittest.main()
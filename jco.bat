@@ -0,0 +1,11 @@
+@echo off
+REM ---------------------------------------------------------
+REM Josephson Circuits Optimizer - headless command line
+REM Usage: jco run path\to\working_space [more workspaces] [-j 2] [--threads 8]
+REM ---------------------------------------------------------
+
+SET REPO_DIR=%~dp0
+SET PYTHON=%REPO_DIR%JCOvenv\Scripts\python.exe
+IF NOT EXIST "%PYTHON%" SET PYTHON=python
+
+"%PYTHON%" "%REPO_DIR%gui\jco.py" %*
@@ -22,26 +22,249 @@ INRIM_blue = RGB(34/256,73/256,104/256)
 INRIM_yellow = RGB(224/256,195/256,33/256)
 
 
+#---------------------------- STREAMING DATASET STATISTICS ----------------------------
+
+# Sweeps can have millions of rows, so the correlation matrix and the 1D density panels are
+# computed from chunked, single-pass statistics instead of full standardized copies of the
+# DataFrame. The same accumulators work on in-memory DataFrames and on row blocks streamed
+# from `df_uniform_analysis.h5`, so memory use is bounded by `chunk_rows`.
+
+const DEFAULT_STATS_CHUNK_ROWS = 65_536
+
+# 1D density panels group rows by exact value (sweep grids have few distinct values). A column
+# with more distinct values than MAX_DENSITY_GROUPS (e.g. after the optimizer points are appended)
+# switches, in the same pass, to a fixed-width histogram of about DENSITY_BINS bins.
+const MAX_DENSITY_GROUPS = 4_096
+const DENSITY_BINS = 64
+
+"""
+    BinnedGroups
+
+Fixed-width histogram of a continuous column: bin `k` covers `origin + [k, k+1) * width` and
+holds `(count, metric_sum)`. When more than `2 * DENSITY_BINS` bins are used the width doubles
+(bin `k` goes into bin `fld(k, 2)`), so the range can grow while the data is streamed.
+"""
+mutable struct BinnedGroups
+    origin::Float64
+    width::Float64
+    bins::Dict{Int,Tuple{Int,Float64}}
+end
+
+const DensityGroups = Union{Dict{Float64,Tuple{Int,Float64}},BinnedGroups}
+
+_bin_index(b::BinnedGroups, x::Real) = floor(Int, (x - b.origin) / b.width)
+
+function _add_to_bin!(b::BinnedGroups, x::Real, count::Int, metric_sum::Float64)
+    isfinite(x) || return b
+    k = _bin_index(b, x)
+    c, s = get(b.bins, k, (0, 0.0))
+    b.bins[k] = (c + count, s + metric_sum)
+    while length(b.bins) > 2 * DENSITY_BINS
+        merged = Dict{Int,Tuple{Int,Float64}}()
+        for (kb, (cb, sb)) in b.bins
+            c0, s0 = get(merged, fld(kb, 2), (0, 0.0))
+            merged[fld(kb, 2)] = (c0 + cb, s0 + sb)
+        end
+        b.bins = merged
+        b.width *= 2
+    end
+    return b
+end
+
+"Histogram of the exact groups `g` (a column that has just become continuous)."
+function BinnedGroups(g::Dict{Float64,Tuple{Int,Float64}})
+    lo, hi = extrema(v for v in keys(g) if isfinite(v))
+    b = BinnedGroups(lo, max(hi - lo, eps(abs(lo)) + eps()) / DENSITY_BINS, Dict{Int,Tuple{Int,Float64}}())
+    for (v, (c, s)) in g
+        _add_to_bin!(b, v, c, s)
+    end
+    return b
+end
+
+"""
+    density_groups(g) -> (values, counts, metric_sums)
+
+Sorted values (bin centres for a histogram) with their row counts and metric sums.
+"""
+function density_groups(g::Dict{Float64,Tuple{Int,Float64}})
+    values = sort!(collect(keys(g)))
+    return values, [g[v][1] for v in values], [g[v][2] for v in values]
+end
+
+function density_groups(b::BinnedGroups)
+    ks = sort!(collect(keys(b.bins)))
+    return [b.origin + (k + 0.5) * b.width for k in ks], [b.bins[k][1] for k in ks], [b.bins[k][2] for k in ks]
+end
+
+# Position of value `v` among the `values` of `ref` (its bin for a histogram); `nothing` if absent
+function _group_position(ref::Dict{Float64,Tuple{Int,Float64}}, values, v)
+    i = searchsortedfirst(values, v)
+    return i <= length(values) && values[i] == v ? i : nothing
+end
+
+function _group_position(ref::BinnedGroups, values, v)
+    isfinite(v) || return nothing
+    center = ref.origin + (_bin_index(ref, v) + 0.5) * ref.width
+    i = searchsortedfirst(values, center - ref.width / 4)
+    return i <= length(values) && abs(values[i] - center) < ref.width / 4 ? i : nothing
+end
+
+
+"""
+    OnlineCorrelation(ncols)
+
+Streaming mean / co-moment accumulator (Welford-style, merged chunk by chunk with
+Chan's update) plus per-column min/max for detecting constant columns.
+"""
+mutable struct OnlineCorrelation
+    n::Int
+    mean::Vector{Float64}
+    comoment::Matrix{Float64}
+    minval::Vector{Float64}
+    maxval::Vector{Float64}
+end
+
+OnlineCorrelation(ncols::Int) = OnlineCorrelation(0, zeros(ncols), zeros(ncols, ncols),
+                                                  fill(Inf, ncols), fill(-Inf, ncols))
+
+function accumulate_chunk!(oc::OnlineCorrelation, X::AbstractMatrix{<:Real})
+    nb = size(X, 1)
+    nb == 0 && return oc
+
+    mean_b = vec(mean(X; dims=1))
+    Xc = X .- mean_b'
+    na = oc.n
+    n = na + nb
+    delta = mean_b .- oc.mean
+
+    # Merge chunk co-moments into the running ones (one BLAS call per chunk)
+    oc.comoment .+= Xc' * Xc .+ (delta * delta') .* (na * nb / n)
+    oc.mean .+= delta .* (nb / n)
+    oc.n = n
+
+    oc.minval .= min.(oc.minval, vec(minimum(X; dims=1)))
+    oc.maxval .= max.(oc.maxval, vec(maximum(X; dims=1)))
+    return oc
+end
+
+"Pearson correlation matrix from the accumulated co-moments (constant columns give 0)."
+function correlation_matrix(oc::OnlineCorrelation)
+    sd = sqrt.(max.(diag(oc.comoment), 0.0))
+    cor_matrix = oc.comoment ./ (sd * sd')
+    cor_matrix[.!isfinite.(cor_matrix)] .= 0
+    return cor_matrix
+end
+
+
+"""
+    DatasetStats
+
+Everything the correlation figure needs, accumulated in one pass over the rows:
+- `corr`: online correlation over all non-metric columns
+- `groups`: per column, `value => (count, metric_sum)`, or a `BinnedGroups` histogram if the
+  column has more than `MAX_DENSITY_GROUPS` distinct values
+"""
+mutable struct DatasetStats
+    names::Vector{String}
+    corr::OnlineCorrelation
+    groups::Vector{DensityGroups}
+end
+
+function DatasetStats(col_names::AbstractVector{<:AbstractString})
+    m = length(col_names)
+    groups = DensityGroups[Dict{Float64,Tuple{Int,Float64}}() for _ in 1:m]
+    return DatasetStats(String.(col_names), OnlineCorrelation(m), groups)
+end
+
+function accumulate_chunk!(st::DatasetStats, X::AbstractMatrix{<:Real}, metric::AbstractVector{<:Real})
+    accumulate_chunk!(st.corr, X)
+
+    for (j, g) in enumerate(st.groups)
+        col = view(X, :, j)
+        if g isa BinnedGroups
+            @inbounds for i in eachindex(col, metric)
+                _add_to_bin!(g, col[i], 1, Float64(metric[i]))
+            end
+            continue
+        end
+        @inbounds for i in eachindex(col, metric)
+            c, s = get(g, col[i], (0, 0.0))
+            g[col[i]] = (c + 1, s + metric[i])
+        end
+        if length(g) > MAX_DENSITY_GROUPS
+            @info "Column $(st.names[j]) has more than $MAX_DENSITY_GROUPS distinct values: density panel binned."
+            st.groups[j] = BinnedGroups(g)
+        end
+    end
+    return st
+end
+
+"""
+    dataset_stats(df::AbstractDataFrame; chunk_rows=DEFAULT_STATS_CHUNK_ROWS)
+    dataset_stats(h5_path::AbstractString; dataset="df_matrix", chunk_rows=DEFAULT_STATS_CHUNK_ROWS)
+
+Accumulate `DatasetStats` for all columns except `metric`.
+
+The HDF5 method streams `chunk_rows` rows at a time from a file written by `save_dataset`
+(a run folder is also accepted), so the dataset never has to fit in memory.
+"""
+function dataset_stats(df::AbstractDataFrame; chunk_rows::Int=DEFAULT_STATS_CHUNK_ROWS)
+    cols = [c for c in names(df) if c != "metric"]
+    st = DatasetStats(cols)
+    metric = df.metric
+    n = nrow(df)
+
+    for r1 in 1:chunk_rows:n
+        r2 = min(r1 + chunk_rows - 1, n)
+        X = Matrix{Float64}(df[r1:r2, cols])
+        accumulate_chunk!(st, X, view(metric, r1:r2))
+    end
+    return st
+end
+
+function dataset_stats(h5_path::AbstractString; dataset::AbstractString="df_matrix",
+                       chunk_rows::Int=DEFAULT_STATS_CHUNK_ROWS)
+    if isdir(h5_path)
+        h5_path = joinpath(h5_path, "df_uniform_analysis.h5")
+    end
+    isfile(h5_path) || error("Dataset file not found: $(h5_path)")
+
+    return h5open(h5_path, "r") do file
+        colnames = String.(read(file, "df_column_names"))
+        metric_idx = findfirst(==("metric"), colnames)
+        metric_idx === nothing && error("Dataset $(h5_path) has no `metric` column.")
+        keep = [j for j in eachindex(colnames) if j != metric_idx]
+
+        st = DatasetStats(colnames[keep])
+        haskey(file, dataset) || return st
+
+        dset = file[dataset]
+        n = size(dset, 1)
+        for r1 in 1:chunk_rows:n
+            r2 = min(r1 + chunk_rows - 1, n)
+            block = Float64.(dset[r1:r2, :])
+            accumulate_chunk!(st, view(block, :, keep), view(block, :, metric_idx))
+        end
+        st
+    end
+end
+
+
 # Function to visualize the correlation matrix
-function visualize_correlation_matrix(fig, df)
+visualize_correlation_matrix(fig, df::AbstractDataFrame) = visualize_correlation_matrix(fig, dataset_stats(df))
 
-    if isempty(df)
+function visualize_correlation_matrix(fig, st::DatasetStats)
+
+    if st.corr.n == 0
         error("The input DataFrame is empty. Please provide a non-empty DataFrame.")
     end 
-    
-    df = select(df, Not([:metric]))
 
     # Remove constant columns (columns where all values are the same)
-    non_constant_cols = [col for col in names(df) if length(unique(df[!, col])) > 1]
-    df = df[!, non_constant_cols]
-
-    standardized_df = mapcols(safe_standardize, df)
+    non_constant = findall(st.corr.minval .< st.corr.maxval)
 
-    # Replace NaNs with 0 after computing the correlation matrix
-    cor_matrix = cor(Matrix(standardized_df))
-    cor_matrix[isnan.(cor_matrix)] .= 0
+    cor_matrix = correlation_matrix(st.corr)[non_constant, non_constant]
 
-    col_names = names(df)  # Column names for labeling
+    col_names = st.names[non_constant]  # Column names for labeling
 
     ax = Axis(fig[1, 1]; 
         title = "Correlation Matrix", 
@@ -60,102 +283,99 @@ function visualize_correlation_matrix(fig, df)
 end
 
 
-function plot_1d_density_heatmap(fig, df; optimal_params=nothing)
+# One column of the 1D density panel: heatmap of normalized counts + optional optimum line
+function _density_axis!(grid, i, col, yvalues, normalized_counts; optimal_params=nothing)
+    ax = Axis(grid[1, i],
+        xlabel = "",
+        ylabel = col,
+        xticklabelsvisible = false,
+        xticksize = 0,
+        title = ""
+    )
+    apply_style!(ax)
 
-    if isempty(df)
-        error("The input DataFrame is empty. Please provide a non-empty DataFrame.")
+    hm_matrix = repeat(normalized_counts', outer = (2, 1))
+    @debug "Heatmap Matrix: $hm_matrix"
+
+    xvals = range(0, stop = 1, length = 2)
+
+    colormap = cgrad([INRIM_blue, INRIM_yellow])
+    hm = heatmap!(ax, xvals, yvalues, hm_matrix, colormap = colormap, colorrange = (0, 1))
+
+    # Overlay chosen optimal parameter as a horizontal line (if provided)
+    if optimal_params !== nothing
+        try
+            key = col isa Symbol ? col : Symbol(col)
+            if haskey(optimal_params, key)
+                y = Float64(optimal_params[key])
+                hlines!(ax, [y]; linewidth=3, color=:red)
+            end
+        catch err
+            @debug "Failed to draw optimal line for $col: $err"
+        end
     end
 
-    metric = df.metric
-    df = select(df, Not([:metric]))
+    y_min = minimum(yvalues)
+    y_max = maximum(yvalues)
+
+    if length(yvalues) <= 10
+        if y_min == y_max
+            padding = 0.001 * abs(y_min)
+            padding = padding == 0 ? 0.001 : padding
+            ylims!(ax, y_min - padding, y_max + padding)
+        else
+            padding = 0.5 * (y_max - y_min) / length(yvalues)
+            ylims!(ax, y_min - padding, y_max + padding)
+        end
+        ax.yticks = (yvalues, string.(yvalues))
+    else
+        padding = 0.5 * (y_max - y_min) / length(yvalues)
+        ylims!(ax, y_min - padding, y_max + padding)
+    end
+
+    return hm
+end
+
+
+function plot_1d_density_heatmap(fig, df::AbstractDataFrame; optimal_params=nothing)
+    return plot_1d_density_heatmap(fig, dataset_stats(df); optimal_params=optimal_params)
+end
+
+function plot_1d_density_heatmap(fig, st::DatasetStats; optimal_params=nothing)
+
+    if st.corr.n == 0
+        error("The input DataFrame is empty. Please provide a non-empty DataFrame.")
+    end
 
-    col_names = names(df)  # Get column names
     heatmaps = []  # Store heatmaps for colorbar reference
 
     # Create a grid layout for the 1D density heatmaps
     grid = fig[2, 1] = GridLayout()
 
-    for (i, col) in enumerate(col_names)
+    i = 0
+    for (col, g) in zip(st.names, st.groups)
         @debug "Column: $col"
+        unique_values, value_counts, metric_sums = density_groups(g)
+        isempty(unique_values) && continue
+        i += 1
 
-        ax = Axis(grid[1, i],
-            xlabel = "",
-            ylabel = col,
-            xticklabelsvisible = false,
-            xticksize = 0,
-            title = ""
-        )
-        apply_style!(ax)
-
-        values = df[:, col]
-        unique_values = unique(values)
-        @debug "Unique Values (unsorted): $unique_values"
-        unique_values = sort(unique_values)
-        @debug "Unique Values (sorted): $unique_values"
-
-        value_counts = []
-        metric_values = []
-
-        for unique_val in unique_values
-            mask = values .== unique_val
-            counter = sum(mask)
-            total_metric = sum(metric[mask])
-            push!(value_counts, counter)
-            push!(metric_values, total_metric / counter)
-        end
+        # Grouped in one pass by `dataset_stats`: value (or bin) => (count, metric sum)
+        metric_values = metric_sums ./ value_counts
 
         @debug "Value Counts: $value_counts"
         @debug "total_metric (mean per value): $metric_values"
 
         weighted_values = value_counts ./ metric_values
-        @debug "weighted_values: $weighted_values"
-
         normalized_counts = weighted_values ./ maximum(weighted_values)
         @debug "Normalized Counts: $normalized_counts"
 
-        hm_matrix = repeat(normalized_counts', outer = (2, 1))
-        @debug "Heatmap Matrix: $hm_matrix"
-
-        xvals = range(0, stop = 1, length = 2)
-        @debug "X Values: $xvals"
-
-        colormap = cgrad([INRIM_blue, INRIM_yellow])
-        hm = heatmap!(ax, xvals, unique_values, hm_matrix, colormap = colormap, colorrange = (0, 1))
-        push!(heatmaps, hm)
-
-        # Overlay chosen optimal parameter as a horizontal line (if provided)
-        if optimal_params !== nothing
-            try
-                key = col isa Symbol ? col : Symbol(col)
-                if haskey(optimal_params, key)
-                    y = Float64(optimal_params[key])
-                    hlines!(ax, [y]; linewidth=3, color=:red)
-                end
-            catch err
-                @debug "Failed to draw optimal line for $col: $err"
-            end
-        end
-
-
-        y_min = minimum(unique_values)
-        @debug "Y Min: $y_min"
-        y_max = maximum(unique_values)
-        @debug "Y Max: $y_max"
+        push!(heatmaps, _density_axis!(grid, i, col, unique_values, normalized_counts;
+                                       optimal_params=optimal_params))
+    end
 
-        if length(unique_values) <= 10
-            if y_min == y_max
-                padding = 0.001 * abs(y_min)
-                padding = padding == 0 ? 0.001 : padding
-                ylims!(ax, y_min - padding, y_max + padding)
-            else
-                padding = 0.5 * (y_max - y_min) / length(unique_values)
-                ylims!(ax, y_min - padding, y_max + padding)
-            end
-            ax.yticks = (unique_values, string.(unique_values))
-        else
-            padding = 0.5 * (maximum(values) - minimum(values)) / length(unique_values)
-            ylims!(ax, minimum(values) - padding, maximum(values) + padding)
-        end
+    if isempty(heatmaps)
+        @info "No column with values to show: density heatmap skipped."
+        return nothing
     end
 
     Colorbar(grid[1, end+1], heatmaps[end], label = "Weighted device counts",
@@ -163,46 +383,37 @@ function plot_1d_density_heatmap(fig, df; optimal_params=nothing)
 end
 
 
-function plot_1d_density_heatmap(fig, df, ref_df; optimal_params=nothing)
+function plot_1d_density_heatmap(fig, df::AbstractDataFrame, ref_df::AbstractDataFrame; optimal_params=nothing)
+    return plot_1d_density_heatmap(fig, dataset_stats(df), dataset_stats(ref_df); optimal_params=optimal_params)
+end
 
-    metric = df.metric
-    df = select(df, Not([:metric]))
+function plot_1d_density_heatmap(fig, st::DatasetStats, ref_st::DatasetStats; optimal_params=nothing)
 
-    col_names = names(df)
     heatmaps = []
 
     grid = fig[2, 1] = GridLayout()
 
-    for (i, col) in enumerate(col_names)
+    i = 0
+    for (col, g) in zip(st.names, st.groups)
         @debug "Column: $col"
-
-        ax = Axis(grid[1, i],
-            xlabel = "",
-            ylabel = col,
-            xticklabelsvisible = false,
-            xticksize = 0,
-            title = ""
-        )
-        apply_style!(ax)
-
-        values = df[:, col]
-        ref_values = ref_df[:, col]
-        unique_ref_values = sort(unique(ref_values))
+        ref_idx = findfirst(==(col), ref_st.names)
+        ref_idx === nothing && continue
+        ref_g = ref_st.groups[ref_idx]
+        unique_ref_values = first(density_groups(ref_g))
+        isempty(unique_ref_values) && continue
+        i += 1
         @debug "Unique Reference Values: $unique_ref_values"
 
+        # Values (or bin centres) of this dataset placed on the values / bins of the reference
         value_counts = zeros(length(unique_ref_values))
-        metric_values = zeros(length(unique_ref_values))
-
-        for (idx, unique_val) in enumerate(unique_ref_values)
-            mask = values .== unique_val
-            if any(mask)
-                value_counts[idx] = sum(mask)
-                metric_values[idx] = sum(metric[mask]) / value_counts[idx]
-            else
-                value_counts[idx] = 0
-                metric_values[idx] = 0
-            end
+        metric_sums = zeros(length(unique_ref_values))
+        for (v, counter, total_metric) in zip(density_groups(g)...)
+            idx = _group_position(ref_g, unique_ref_values, v)
+            idx === nothing && continue
+            value_counts[idx] += counter
+            metric_sums[idx] += total_metric
         end
+        metric_values = [c > 0 ? m / c : 0.0 for (c, m) in zip(value_counts, metric_sums)]
 
         @debug "Value Counts: $value_counts"
         @debug "Metric Values: $metric_values"
@@ -211,46 +422,13 @@ function plot_1d_density_heatmap(fig, df, ref_df; optimal_params=nothing)
         normalized_counts = weighted_values ./ maximum(weighted_values)
         @debug "Normalized Counts: $normalized_counts"
 
-        hm_matrix = repeat(normalized_counts', outer = (2, 1))
-        @debug "Heatmap Matrix: $hm_matrix"
-
-        xvals = range(0, stop = 1, length = 2)
-
-        colormap = cgrad([INRIM_blue, INRIM_yellow])
-        hm = heatmap!(ax, xvals, unique_ref_values, hm_matrix, colormap = colormap, colorrange = (0, 1))
-        push!(heatmaps, hm)
-
-        # Overlay chosen optimal parameter as a horizontal line (if provided)
-        if optimal_params !== nothing
-            try
-                key = col isa Symbol ? col : Symbol(col)
-                if haskey(optimal_params, key)
-                    y = Float64(optimal_params[key])
-                    hlines!(ax, [y]; linewidth=3, color=:red)
-                end
-            catch err
-                @debug "Failed to draw optimal line for $col: $err"
-            end
-        end
-
-
-        y_min = minimum(unique_ref_values)
-        y_max = maximum(unique_ref_values)
+        push!(heatmaps, _density_axis!(grid, i, col, unique_ref_values, normalized_counts;
+                                       optimal_params=optimal_params))
+    end
 
-        if length(unique_ref_values) <= 10
-            if y_min == y_max
-                padding = 0.001 * abs(y_min)
-                padding = padding == 0 ? 0.001 : padding
-                ylims!(ax, y_min - padding, y_max + padding)
-            else
-                padding = 0.5 * (y_max - y_min) / length(unique_ref_values)
-                ylims!(ax, y_min - padding, y_max + padding)
-            end
-            ax.yticks = (unique_ref_values, string.(unique_ref_values))
-        else
-            padding = 0.5 * (y_max - y_min) / length(unique_ref_values)
-            ylims!(ax, y_min - padding, y_max + padding)
-        end
+    if isempty(heatmaps)
+        @info "No column with values to show: density heatmap skipped."
+        return nothing
     end
 
     Colorbar(grid[1, end+1], heatmaps[end], label = "Weighted device counts",
@@ -316,9 +494,28 @@ function create_gui(df_ref, df)
 end
 """
 
-function create_corr_figure(df; df_ref=nothing, optimal_params=nothing)
+"""
+    create_corr_figure(data; df_ref=nothing, optimal_params=nothing, chunk_rows=DEFAULT_STATS_CHUNK_ROWS)
 
-    if isempty(df)
+Build the correlation + 1D density figure and queue it with `correlation_update`.
+
+`data` (and `df_ref`) may be a DataFrame or the path of a dataset written by `save_dataset`
+(the entry points pass the path); in the latter case rows are streamed from the HDF5 file in
+blocks of `chunk_rows`.
+"""
+function create_corr_figure(data; df_ref=nothing, optimal_params=nothing,
+                            chunk_rows::Int=DEFAULT_STATS_CHUNK_ROWS)
+
+    if !makie_available()
+        @warn "No Makie backend loaded (headless mode without CairoMakie?): skipping correlation figure."
+        return nothing
+    end
+
+    # `save_dataset` writes in the background: wait for the file before streaming it
+    (data isa AbstractString || df_ref isa AbstractString) && flush_io_service!()
+    st = dataset_stats(data; chunk_rows=chunk_rows)
+
+    if st.corr.n == 0
         error("The input DataFrame is empty. Please provide a non-empty DataFrame.")
     end 
 
@@ -330,32 +527,26 @@ function create_corr_figure(df; df_ref=nothing, optimal_params=nothing)
 
     # Left: correlation matrix
     ax1 = Axis(fig[1, 1])
-    visualize_correlation_matrix(fig, df)  # assumes it plots into fig[1,1]
+    visualize_correlation_matrix(fig, st)  # assumes it plots into fig[1,1]
 
     # Right: 1D density heatmap
     ax2 = Axis(fig[1, 2])
     if isnothing(df_ref)
-        plot_1d_density_heatmap(fig, df; optimal_params=optimal_params)
+        plot_1d_density_heatmap(fig, st; optimal_params=optimal_params)
     else
-        plot_1d_density_heatmap(fig, df, df_ref; optimal_params=optimal_params)
+        plot_1d_density_heatmap(fig, st, dataset_stats(df_ref; chunk_rows=chunk_rows); optimal_params=optimal_params)
     end
 
     # Adjust layout spacing
     colgap!(fig.layout, 10)  # Add gap between columns
     rowgap!(fig.layout, 20)  # Add gap between rows
 
-    # Build filename with timestamp
-    timestamp = Dates.format(now(), "yyyy-mm-dd_HH-MM-SS-sss")
-    filename  = "corr_$timestamp.png"
-    filepath  = joinpath(corr_path, filename)
-
     extra = Dict(
-        "n_points" => nrow(df),
-        "n_columns" => ncol(df)
+        "n_points" => st.corr.n,
+        "n_columns" => length(st.names) + 1
     )
 
-    correlation_update(fig; plot_type="correlation", run_id=nothing, extra=extra)
+    filepath = correlation_update(fig; plot_type="correlation", run_id=nothing, extra=extra)
 
-    @info "Saved correlation figure to $filepath"
     return filepath
-end
\ No newline at end of file
+end
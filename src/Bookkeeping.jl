@@ -4,6 +4,9 @@ module Bookkeeping
 using Dates
 using JSON
 using Pkg
+using HDF5
+using Statistics
+using SHA
 
 export write_run_bookkeeping
 
@@ -44,6 +47,27 @@ end
 
 "Best-effort git commit hash for a repo root. Returns `nothing` if not available."
 function _git_commit_hash(repo_root::AbstractString)
+    # Parse .git/HEAD first (no subprocess; works for non-worktrees)
+    head_path = joinpath(repo_root, ".git", "HEAD")
+    if isfile(head_path)
+        head = strip(read(head_path, String))
+        if !startswith(head, "ref:")
+            return head
+        end
+        ref = strip(replace(head, "ref:" => ""))
+        ref_path = joinpath(repo_root, ".git", split(ref, '/')...)
+        isfile(ref_path) && return strip(read(ref_path, String))
+
+        packed = joinpath(repo_root, ".git", "packed-refs")
+        if isfile(packed)
+            for line in eachline(packed)
+                parts = split(line)
+                length(parts) == 2 && parts[2] == ref && return String(parts[1])
+            end
+        end
+    end
+
+    # Fallback: ask git (worktrees, unusual layouts)
     git = Sys.which("git")
     if !isnothing(git)
         try
@@ -51,61 +75,109 @@ function _git_commit_hash(repo_root::AbstractString)
         catch
         end
     end
+    return nothing
+end
 
-    # Fallback: parse .git/HEAD (works for non-worktrees)
-    head_path = joinpath(repo_root, ".git", "HEAD")
-    if !isfile(head_path)
-        return nothing
+# Content-addressed store shared by all runs of a workspace: `outputs/snapshot_store/`
+#   blobs/<sha256[1:2]>/<sha256>   input files, stored once
+#   versions/<key>.txt             cached `versions.txt` body (key = active project + Manifest + git HEAD + Julia version)
+const SNAPSHOT_STORE_DIR = "snapshot_store"
+const INPUTS_MANIFEST_FILE = "inputs_manifest.json"
+
+_sha256_file(path::AbstractString) = bytes2hex(open(sha256, path))
+
+"Copy `src` into the blob store (if not already there) and return its sha256."
+function _store_blob!(store_dir::AbstractString, src::AbstractString)
+    h = _sha256_file(src)
+    blob = joinpath(store_dir, "blobs", h[1:2], h)
+    if !isfile(blob)
+        mkpath(dirname(blob))
+        tmp = blob * ".part"
+        cp(src, tmp; force=true)
+        mv(tmp, blob; force=true)
     end
-    head = strip(read(head_path, String))
-    if startswith(head, "ref:")
-        ref = strip(replace(head, "ref:" => ""))
-        ref_path = joinpath(repo_root, ".git", split(ref, '/')...)
-        return isfile(ref_path) ? strip(read(ref_path, String)) : nothing
-    else
-        return head
+    return h
+end
+
+"Manifest of the active project (the environment reported by `Pkg.status`), or `nothing`."
+function _active_manifest_path()
+    project = Base.active_project()
+    (project === nothing || !isfile(project)) && return nothing
+    dir = dirname(project)
+    v = "v$(VERSION.major).$(VERSION.minor)"
+    for name in ("JuliaManifest-$v.toml", "Manifest-$v.toml", "JuliaManifest.toml", "Manifest.toml")
+        path = joinpath(dir, name)
+        isfile(path) && return path
     end
+    return nothing
 end
 
-"Write versions.txt inside the run folder."
-function _write_versions_txt(output_path::AbstractString; repo_root::AbstractString)
+"Key of the cached `versions.txt`: changes whenever the active project or its Manifest, the git HEAD or Julia change."
+function _versions_cache_key(repo_root::AbstractString)
+    project = Base.active_project()
+    manifest = _active_manifest_path()
     io = IOBuffer()
-    println(io, "date_utc: ", Dates.format(Dates.now(Dates.UTC), dateformat"yyyy-mm-ddTHH:MM:SS"))
-    println(io, "julia_version: ", VERSION)
-    commit = _git_commit_hash(repo_root)
-    println(io, "git_commit: ", isnothing(commit) ? "n/a" : commit)
-    println(io, "\n--- Pkg.status() ---\n")
-    print(io, _pkg_status_string())
+    print(io, VERSION, '\n')
+    print(io, something(_git_commit_hash(repo_root), "n/a"), '\n')
+    print(io, something(project, "n/a"), '\n')
+    project !== nothing && isfile(project) && write(io, read(project))
+    manifest !== nothing && write(io, read(manifest))
+    return bytes2hex(sha256(take!(io)))
+end
+
+"Write versions.txt inside the run folder (the Pkg/git part is cached in the snapshot store)."
+function _write_versions_txt(output_path::AbstractString; repo_root::AbstractString,
+                             store_dir::Union{Nothing,AbstractString}=nothing)
+    key = _versions_cache_key(repo_root)
+    cached = isnothing(store_dir) ? nothing : joinpath(store_dir, "versions", key * ".txt")
+
+    body = if !isnothing(cached) && isfile(cached)
+        read(cached, String)
+    else
+        io = IOBuffer()
+        println(io, "julia_version: ", VERSION)
+        commit = _git_commit_hash(repo_root)
+        println(io, "git_commit: ", isnothing(commit) ? "n/a" : commit)
+        println(io, "\n--- Pkg.status() ---\n")
+        print(io, _pkg_status_string())
+        b = String(take!(io))
+        if !isnothing(cached)
+            mkpath(dirname(cached))
+            write(cached * ".part", b)
+            mv(cached * ".part", cached; force=true)
+        end
+        b
+    end
 
     siminfo_dir = (basename(normpath(output_path)) == "simulation_info") ? output_path : joinpath(output_path, "simulation_info")
     mkpath(siminfo_dir)
 
     open(joinpath(siminfo_dir, "versions.txt"), "w") do f
-        write(f, String(take!(io)))
+        println(f, "date_utc: ", Dates.format(Dates.now(Dates.UTC), dateformat"yyyy-mm-ddTHH:MM:SS"))
+        write(f, body)
     end
     return nothing
 end
 
 """
-Snapshot all files inside `user_inputs_dir` into `output_path/inputs_snapshot/`.
+Snapshot all files inside `user_inputs_dir` into the content-addressed store `store_dir`
+(each distinct file content is stored once) and write `simulation_info/inputs_manifest.json`
+in `output_path`, mapping filenames => sha256 (+ bytes, mtime_utc).
 
-Returns a Dict mapping filenames => small file metadata (bytes, mtime_utc).
+Returns a Dict mapping filenames => file metadata (sha256, bytes, mtime_utc).
 """
-function _snapshot_user_inputs(output_path::AbstractString; user_inputs_dir::AbstractString)
-    snap_dir = joinpath(output_path, "inputs_snapshot")
-    mkpath(snap_dir)
-
+function _snapshot_user_inputs(output_path::AbstractString; user_inputs_dir::AbstractString,
+                               store_dir::AbstractString)
     files = isdir(user_inputs_dir) ? readdir(user_inputs_dir) : String[]
     meta = Dict{String,Any}()
 
     for f in files
         src = joinpath(user_inputs_dir, f)
-        dst = joinpath(snap_dir, f)
         if isfile(src)
             try
-                cp(src, dst; force=true)
-                st = stat(dst)
+                st = stat(src)
                 meta[f] = Dict(
+                    "sha256" => _store_blob!(store_dir, src),
                     "bytes" => st.size,
                     "mtime_utc" => Dates.format(Dates.unix2datetime(st.mtime), dateformat"yyyy-mm-ddTHH:MM:SS"),
                 )
@@ -114,9 +186,107 @@ function _snapshot_user_inputs(output_path::AbstractString; user_inputs_dir::Abs
             end
         end
     end
+
+    siminfo_dir = joinpath(output_path, "simulation_info")
+    mkpath(siminfo_dir)
+    manifest = Dict(
+        "version" => 1,
+        # relative to the run folder, so that the workspace can be moved
+        "store" => relpath(store_dir, output_path),
+        "files" => meta,
+    )
+    open(joinpath(siminfo_dir, INPUTS_MANIFEST_FILE), "w") do io
+        JSON.print(io, manifest, 2)
+    end
     return meta
 end
 
+const EVALUATION_HISTORY_FILE = "evaluation_history.h5"
+const HISTORY_CHUNK_ROWS = 4096
+
+"Write a column into `parent` as a row-chunked dataset (vectors or row-per-evaluation matrices)."
+function _write_history_column(parent, name::AbstractString, data::AbstractArray{<:Real})
+    dims = size(data)
+    chunk = ntuple(i -> i == 1 ? min(dims[1], HISTORY_CHUNK_ROWS) : dims[i], length(dims))
+    ds = create_dataset(parent, name, eltype(data), dims; chunk=chunk)
+    write(ds, data)
+    return ds
+end
+
+"""
+Write the evaluation history (`cost_history`) as typed columns into
+`simulation_info/evaluation_history.h5`:
+
+- `params`          (n × d Float64, column names in the `names` attribute)
+- `metric`, `wall_time_s`, `timestamp_unix` (n Float64)
+- `stage`           (n strings: "SWEEP", "BO", ...)
+- `metrics/<name>`  (n Float64, one per metric returned by `user_cost`)
+
+Returns the summary statistics stored in run_config.json, or `nothing` if the history is empty.
+"""
+function _write_evaluation_history(siminfo_dir::AbstractString, history; param_names=String[])
+    history isa AbstractDict || return nothing
+    metrics = Float64.(get(history, "metrics", Float64[]))
+    n = length(metrics)
+    n == 0 && return nothing
+
+    params_vecs = get(history, "params_vecs", Vector{Vector{Float64}}())
+    d = isempty(params_vecs) ? 0 : length(first(params_vecs))
+    params = Matrix{Float64}(undef, n, d)
+    for (i, v) in enumerate(params_vecs)
+        params[i, :] .= v
+    end
+    names = length(param_names) == d ? string.(param_names) : ["p$(j)" for j in 1:d]
+
+    wall_times = Float64.(get(history, "wall_times_s", fill(NaN, n)))
+    timestamps = Float64.(get(history, "timestamps_unix", fill(NaN, n)))
+    stages = String.(get(history, "stages", fill("", n)))
+    extra = get(history, "extra_metrics", Dict{String,Vector{Float64}}())
+
+    path = joinpath(siminfo_dir, EVALUATION_HISTORY_FILE)
+    tmp = path * ".part"
+    h5open(tmp, "w") do file
+        if d > 0
+            ds = _write_history_column(file, "params", params)
+            attributes(ds)["names"] = names
+        end
+        _write_history_column(file, "metric", metrics)
+        _write_history_column(file, "wall_time_s", wall_times)
+        _write_history_column(file, "timestamp_unix", timestamps)
+        write(file, "stage", stages)
+
+        g = create_group(file, "metrics")
+        for (name, col) in extra
+            _write_history_column(g, name, Float64.(col))
+        end
+    end
+    mv(tmp, path; force=true)
+
+    finite = filter(isfinite, metrics)
+    best_index = isempty(finite) ? nothing : argmin(i -> isfinite(metrics[i]) ? metrics[i] : Inf, 1:n)
+    stage_counts = Dict{String,Int}()
+    for st in stages
+        stage_counts[st] = get(stage_counts, st, 0) + 1
+    end
+    fmt_ts(t) = isfinite(t) ? Dates.format(Dates.unix2datetime(t), dateformat"yyyy-mm-ddTHH:MM:SS") : nothing
+
+    return Dict{String,Any}(
+        "file" => joinpath("simulation_info", EVALUATION_HISTORY_FILE),
+        "n_evaluations" => n,
+        "n_finite" => length(finite),
+        "stage_counts" => stage_counts,
+        "metric_names" => sort!(collect(keys(extra))),
+        "best_metric" => isempty(finite) ? nothing : minimum(finite),
+        "best_index" => best_index,
+        "metric_mean" => isempty(finite) ? nothing : mean(finite),
+        "metric_median" => isempty(finite) ? nothing : median(finite),
+        "metric_max" => isempty(finite) ? nothing : maximum(finite),
+        "total_wall_time_s" => sum(filter(isfinite, wall_times); init=0.0),
+        "first_evaluation_utc" => fmt_ts(first(timestamps)),
+        "last_evaluation_utc" => fmt_ts(last(timestamps)),
+    )
+end
+
 "Write run_config.json inside the run folder (metadata + results; no full duplication of inputs)."
 function _write_run_config_json(
     output_path::AbstractString;
@@ -126,13 +296,15 @@ function _write_run_config_json(
     parameter_space::Dict,
     best_device_parameters,
     best_metric,
-    metric_history,
+    history_summary,
     sim_settings,
-    optimizer_settings
+    optimizer_settings,
+    entry_point=nothing
 )
     payload = Dict(
         "created_at_utc" => Dates.format(Dates.now(Dates.UTC), dateformat"yyyy-mm-ddTHH:MM:SS"),
         "workspace" => workspace,
+        "entry_point" => entry_point,
 
         # Snapshot pointer + file list
         "inputs_snapshot" => inputs_snapshot_rel,
@@ -144,10 +316,11 @@ function _write_run_config_json(
         "optimizer_settings" => _jsonify(optimizer_settings),
 
         # Results
+        # Full evaluation history lives in simulation_info/evaluation_history.h5
         "results" => Dict(
             "best_metric" => best_metric,
             "best_device_parameters" => _jsonify(best_device_parameters),
-            "metric_history" => _jsonify(metric_history),
+            "evaluation_history" => _jsonify(history_summary),
         ),
     )
 
@@ -172,12 +345,16 @@ end
 
 """
     write_run_bookkeeping(output_path; config, parameter_space, best_device_parameters, best_metric,
-                          metric_history=Dict(), sim_settings=Dict(), optimizer_settings=Dict())
+                          metric_history=Dict(), sim_settings=Dict(), optimizer_settings=Dict(),
+                          entry_point=nothing)
 
 Creates:
-- `inputs_snapshot/` inside `output_path` (copy of `config.user_inputs_dir`)
-- `run_config.json` inside `output_path` (metadata + resolved configs + results)
-- `versions.txt` inside `output_path`
+- `simulation_info/inputs_manifest.json` (hashes of the files in `config.user_inputs_dir`, whose
+  contents are stored once in `config.outputs_dir/snapshot_store/`)
+- `simulation_info/evaluation_history.h5` (evaluation history from `metric_history`, as typed columns)
+- `run_config.json` inside `output_path` (metadata + resolved configs + results + history summary;
+  `entry_point` is the name of the function that produced the run, used by the GUI run catalog)
+- `versions.txt` inside `output_path` (cached per Manifest/git HEAD in the snapshot store)
 - `LATEST.txt` inside `config.outputs_dir`
 """
 function write_run_bookkeeping(
@@ -188,7 +365,8 @@ function write_run_bookkeeping(
     best_metric,
     metric_history=Dict(),
     sim_settings=Dict(),
-    optimizer_settings=Dict()
+    optimizer_settings=Dict(),
+    entry_point=nothing
 )
     # `output_path` should normally be the run folder. If the caller passes
     # `<run_folder>/simulation_info`, recover the run root to keep datasets in the run folder
@@ -202,25 +380,36 @@ function write_run_bookkeeping(
     # repo root = package root (src/..)
     repo_root = normpath(joinpath(@__DIR__, ".."))
 
-    # 1) Snapshot user inputs used for the run
-    inputs_files = _snapshot_user_inputs(output_root; user_inputs_dir=config.user_inputs_dir)
+    store_dir = joinpath(config.outputs_dir, SNAPSHOT_STORE_DIR)
+
+    # 1) Snapshot user inputs used for the run (content-addressed, deduplicated)
+    inputs_files = _snapshot_user_inputs(output_root; user_inputs_dir=config.user_inputs_dir,
+                                         store_dir=store_dir)
+
+    # 2) Evaluation history (typed columns, HDF5) + run metadata/results (summary only)
+    history_summary = try
+        _write_evaluation_history(siminfo_dir, metric_history; param_names=collect(keys(parameter_space)))
+    catch err
+        @warn "Could not write $(EVALUATION_HISTORY_FILE): $err"
+        nothing
+    end
 
-    # 2) Write run metadata + results
     _write_run_config_json(
         output_root;
         workspace=config.WORKING_SPACE,
-        inputs_snapshot_rel="inputs_snapshot",
+        inputs_snapshot_rel=joinpath("simulation_info", INPUTS_MANIFEST_FILE),
         inputs_files=inputs_files,
         parameter_space=parameter_space,
         best_device_parameters=best_device_parameters,
         best_metric=best_metric,
-        metric_history=metric_history,
+        history_summary=history_summary,
         sim_settings=sim_settings,
-        optimizer_settings=optimizer_settings
+        optimizer_settings=optimizer_settings,
+        entry_point=entry_point
     )
 
     # 3) Environment fingerprints + convenience pointer
-    _write_versions_txt(output_root; repo_root=repo_root)
+    _write_versions_txt(output_root; repo_root=repo_root, store_dir=store_dir)
     _write_latest_pointer(config.outputs_dir, output_root)
     return nothing
 end
@@ -3,13 +3,57 @@
 
 using ..Config  # Access WORKING_SPACE
 
-# History of metric evaluations (for reproducibility / post-mortem)
+# History of metric evaluations (for reproducibility / post-mortem), kept as typed columns.
+# Written to `simulation_info/evaluation_history.h5` by the bookkeeping step.
+# "extra_metrics" holds one column per key of `last_cost_metrics` (NaN where a metric is missing).
 global cost_history = Dict{String,Any}(
-    "params_vecs" => Vector{Vector{Float64}}(),
-    "metrics"     => Float64[],
-    "timestamps_utc" => String[]
+    "params_vecs"     => Vector{Vector{Float64}}(),
+    "metrics"         => Float64[],
+    "stages"          => String[],
+    "wall_times_s"    => Float64[],
+    "timestamps_unix" => Float64[],
+    "extra_metrics"   => Dict{String,Vector{Float64}}()
 )
 
+# Stage recorded in `cost_history` (`nothing` = "SWEEP"/"BO" from the evaluation index)
+global cost_stage = nothing
+
+# Live copy of the history for the GUI convergence dashboard: `simulation_info/evaluations.jsonl`
+# of the current run, append-only and flushed after every evaluation, so a reader only has to read
+# the new bytes. The first line is a header with the parameter names, then one object per evaluation:
+#   {"i", "stage", "t" (unix time), "wall_time_s", "metric", "params" (vector), "metrics" (dict)}
+const EVALUATIONS_LOG_FILE = "evaluations.jsonl"
+const EVALUATIONS_LOG = Ref{Union{Nothing,IOStream}}(nothing)
+const EVALUATIONS_LOG_PATH = Ref{Union{Nothing,String}}(nothing)
+
+function _evaluations_log()
+    output_path = CURRENT_OUTPUT_PATH[]
+    output_path === nothing && return nothing
+    path = joinpath(output_path, "simulation_info", EVALUATIONS_LOG_FILE)
+    if EVALUATIONS_LOG_PATH[] != path
+        close_evaluations_log!()
+        mkpath(dirname(path))
+        io = open(path, "a")
+        if position(io) == 0
+            names = isdefined(@__MODULE__, :device_parameters_space) && device_parameters_space isa AbstractDict ?
+                    string.(collect(keys(device_parameters_space))) : String[]
+            println(io, JSON.json(Dict("version" => 1, "param_names" => names)))
+        end
+        EVALUATIONS_LOG[] = io
+        EVALUATIONS_LOG_PATH[] = path
+    end
+    return EVALUATIONS_LOG[]
+end
+
+"Close `simulation_info/evaluations.jsonl` (called at the end of every entry point)."
+function close_evaluations_log!()
+    io = EVALUATIONS_LOG[]
+    io === nothing || try close(io) catch end
+    EVALUATIONS_LOG[] = nothing
+    EVALUATIONS_LOG_PATH[] = nothing
+    return nothing
+end
+
 global last_cost_metrics = Dict{Symbol, Float64}()
 global last_performance_metrics = Dict{Symbol, Float64}()
 
@@ -30,12 +74,63 @@ function unpack_user_metrics(out; default_name::Symbol)
     end
 end
 
+"""
+    record_evaluation!(vec, metric, metrics_dict; stage, wall_time_s)
+
+Append one evaluation to `cost_history` (and to `simulation_info/evaluations.jsonl`). Metric
+columns appearing for the first time are back-filled with NaN so that all columns keep the same length.
+"""
+function record_evaluation!(vec, metric, metrics_dict::AbstractDict; stage::AbstractString, wall_time_s::Real)
+    # Convert everything before touching cost_history: a failed conversion must not leave the
+    # columns with different lengths
+    params = collect(Float64, vec)
+    metric_f = Float64(metric)
+    wall_f = Float64(wall_time_s)
+    metrics = Dict(String(k) => (v isa Real ? Float64(v) : NaN) for (k, v) in metrics_dict)
+
+    n = length(cost_history["metrics"])
+    extra = cost_history["extra_metrics"]
+    for name in keys(metrics)
+        haskey(extra, name) || (extra[name] = fill(NaN, n))
+    end
+    for (name, col) in extra
+        push!(col, get(metrics, name, NaN))
+    end
+
+    push!(cost_history["params_vecs"], params)
+    push!(cost_history["metrics"], metric_f)
+    push!(cost_history["stages"], String(stage))
+    push!(cost_history["wall_times_s"], wall_f)
+    push!(cost_history["timestamps_unix"], time())
+
+    index = length(cost_history["metrics"])
+    emit_event("evaluation"; index=index, stage=String(stage), params=params, metric=metric_f,
+               metrics=metrics, wall_time_s=wall_f)
+
+    try
+        io = _evaluations_log()
+        if io !== nothing
+            println(io, JSON.json(Dict("i" => index, "stage" => String(stage), "t" => last(cost_history["timestamps_unix"]),
+                                       "wall_time_s" => wall_f, "metric" => metric_f,
+                                       "params" => params, "metrics" => metrics)))
+            flush(io)
+        end
+    catch err
+        @debug "Could not append to $(EVALUATIONS_LOG_FILE): $err"
+        close_evaluations_log!()
+    end
+    return nothing
+end
+
 function setup_cost()
 
     # reset history for a fresh run
     empty!(cost_history["params_vecs"])
     empty!(cost_history["metrics"])
-    empty!(cost_history["timestamps_utc"])
+    empty!(cost_history["stages"])
+    empty!(cost_history["wall_times_s"])
+    empty!(cost_history["timestamps_unix"])
+    empty!(cost_history["extra_metrics"])
 
     user_cost_path = joinpath(config.user_inputs_dir, "user_cost_and_performance.jl")
     
@@ -77,6 +172,14 @@ function sim_sys(vec)
     return S, device_params_temp
 end
 
+"Linear simulation + `user_cost` of one parameter set (watchdog workers). Returns `(metric, metrics_dict)`."
+function evaluate_linear_point(device_params_set::Dict, delta)
+    circuit = create_circuit(device_params_set)
+    S = linear_simulation(device_params_set, circuit)
+    out = call_user_hook(user_cost, S, device_params_set, delta)
+    return unpack_user_metrics(out; default_name=:metric)
+end
+
 """
     mask(input_mask, conditions_mask)
 
@@ -96,98 +199,173 @@ function mask(input_mask, conditions_mask)
     if conditions_mask(input_mask)
         return false
     else
-        global point_exluded
-        global number_initial_points
-        point_exluded += 1
-        println("Points excluded: ", point_exluded, " that are the ", round(100 * (point_exluded / number_initial_points)), " % of the total")
+        lock(COST_LOCK) do
+            global point_exluded
+            global number_initial_points
+            point_exluded += 1
+            println("Points excluded: ", point_exluded, " that are the ", round(100 * (point_exluded / number_initial_points)), " % of the total")
+        end
         return true  # or some other default/penalty value
     end
 end
 
-"""
-    cost(vec)
+# Guards the shared state touched by `cost` (counters, progress, history), so that
+# several evaluations can run concurrently (batch optimization, see optimizer.jl).
+const COST_LOCK = ReentrantLock()
 
-Computes the cost based on the system simulation and user-defined metric. The function simulates the system, 
-calculates the scattering parameters, and evaluates the cost based on the user-defined `user_cost` function.
+# The user hooks (user_cost, user_performance) may build plots (GR is not thread-safe), print or
+# update globals: concurrent evaluations run them one at a time, only the simulations around
+# them run in parallel. With "user_hooks_thread_safe": true in simulation_config.json they are
+# called concurrently as well.
+const USER_HOOK_LOCK = ReentrantLock()
 
-# Arguments
-- `vec::Vector`: A vector of parameters for the device.
+user_hooks_thread_safe() =
+    isdefined(@__MODULE__, :sim_vars) && Bool(get(sim_vars, :user_hooks_thread_safe, false))
 
-# Returns
-- `metric`: The user-defined metric computed using the scattering parameters.
+"Run `f()` under the user hook lock, unless the hooks are declared thread-safe."
+with_user_hook_lock(f) = user_hooks_thread_safe() ? f() : lock(f, USER_HOOK_LOCK)
 
-"""
-function cost(vec)
+"Call the user hook `f(args...)` (latest world) through `with_user_hook_lock`."
+call_user_hook(f, args...) = with_user_hook_lock(() -> Base.invokelatest(f, args...))
 
-    global plot_index
-    global number_initial_points
-    plot_index += 1
+"Bookkeeping before an evaluation (counter, STOP check, progress). Returns the evaluation index."
+function _cost_begin!()
+    lock(COST_LOCK) do
+        global plot_index
+        global number_initial_points
+        plot_index += 1
 
-    println("-----------------------------------------------------")
+        println("-----------------------------------------------------")
 
-    # Graceful stop (WORKSPACE/STOP)
-    check_stop()
+        # Graceful stop (WORKSPACE/STOP)
+        check_stop()
 
-    # If a BO progress context exists, emit parseable progress lines for GUI
-    # (we count only evaluations performed after the initial dataset)
-    if isdefined(@__MODULE__, :cost_progress_ctx) && plot_index > number_initial_points
-        i_bo = plot_index - number_initial_points
-        try
-            Progress.tick!(cost_progress_ctx; i=i_bo)
-        catch
+        # If a BO progress context exists, emit parseable progress lines for GUI
+        # (we count only evaluations performed after the initial dataset)
+        if isdefined(@__MODULE__, :cost_progress_ctx) && cost_progress_ctx !== nothing && plot_index > number_initial_points
+            i_bo = plot_index - number_initial_points
+            try
+                Progress.tick!(cost_progress_ctx; i=i_bo)
+            catch
+            end
         end
-    end
 
-    if plot_index < number_initial_points+1
-        println("Linear Simulation process. Point number ", plot_index, " of ", number_initial_points, ", that are the ", round(100*(plot_index/number_initial_points))," % of the total" )
-    else
-        iter = plot_index - number_initial_points
-        println("Optimization process: iteration number ", iter)
+        if plot_index < number_initial_points+1
+            println("Linear Simulation process. Point number ", plot_index, " of ", number_initial_points, ", that are the ", round(100*(plot_index/number_initial_points))," % of the total" )
+        else
+            iter = plot_index - number_initial_points
+            println("Optimization process: iteration number ", iter)
+        end
+        return plot_index
     end
-    
-    # Get simulation results for the given parameters.
-    S, device_params_temp = sim_sys(vec)
+end
+
+"""
+    cost_with_metrics(vec)
+
+Same as `cost(vec)`, but also returns the Dict of all metrics returned by `user_cost`.
+Safe to call from several tasks at once: the simulations run concurrently, `user_cost` through
+`call_user_hook`.
+"""
+function cost_with_metrics(vec)
+
+    index = _cost_begin!()
+    t0 = time()
 
     global delta_correction
-    # Calculate the user-defined metric based on the simulation results.
-    out = Base.invokelatest(user_cost, S, device_params_temp, delta_correction)
+    if watchdog_enabled()
+        # Same evaluation in a watchdog worker (see watchdog.jl)
+        device_params_temp = vector_to_param(vec, keys(device_parameters_space))
+        ok, out, reason = watchdog_call(evaluate_linear_point, device_params_temp, delta_correction)
+        if ok
+            metric, metrics_dict = out
+        else
+            record_watchdog_failure!(; stage="LIN", reason=reason, params=device_params_temp)
+            metric, metrics_dict = WATCHDOG_PENALTY, Dict(:metric => WATCHDOG_PENALTY)
+        end
+    else
+        # Get simulation results for the given parameters.
+        S, device_params_temp = sim_sys(vec)
 
-    metric, metrics_dict = unpack_user_metrics(out; default_name=:metric)
-    
-    global last_cost_metrics
-    last_cost_metrics = metrics_dict
+        # Calculate the user-defined metric based on the simulation results.
+        out = call_user_hook(user_cost, S, device_params_temp, delta_correction)
 
+        metric, metrics_dict = unpack_user_metrics(out; default_name=:metric)
+    end
 
-    # Save history (best-effort)
-    try
-        push!(cost_history["params_vecs"], Float64.(vec))
-        push!(cost_history["metrics"], Float64(metric))
-        push!(cost_history["timestamps_utc"], Dates.format(Dates.now(Dates.UTC), dateformat"yyyy-mm-ddTHH:MM:SS"))
-    catch
+    lock(COST_LOCK) do
+        global last_cost_metrics
+        last_cost_metrics = metrics_dict
+
+        # Save history (best-effort)
+        try
+            stage = cost_stage !== nothing ? cost_stage : (index <= number_initial_points ? "SWEEP" : "BO")
+            record_evaluation!(vec, metric, metrics_dict; stage=stage, wall_time_s=time() - t0)
+        catch err
+            @debug "Could not record evaluation: $err"
+        end
     end
 
     # Add additional conditions or checks for the cost if needed.
-    return metric
+    return metric, metrics_dict
 end
 
+"""
+    cost(vec)
+
+Computes the cost based on the system simulation and user-defined metric. The function simulates the system, 
+calculates the scattering parameters, and evaluates the cost based on the user-defined `user_cost` function.
+
+# Arguments
+- `vec::Vector`: A vector of parameters for the device.
+
+# Returns
+- `metric`: The user-defined metric computed using the scattering parameters.
+
+"""
+cost(vec) = first(cost_with_metrics(vec))
+
+
+# Calls of `user_performance` made only to compare two harmonic truncations (adaptive harmonics,
+# "performance" criterion) are probes: `plot_update` does not save plots and
+# last_performance_metrics is restored afterwards. User hooks can check `performance_probe()`
+# to skip their other side effects (prints, files).
+const PERFORMANCE_PROBE_KEY = :jco_performance_probe
+
+"True inside a probe call of `user_performance` (see `as_performance_probe`)."
+performance_probe() = get(task_local_storage(), PERFORMANCE_PROBE_KEY, false)::Bool
+
+"Run `f()` as a performance probe: no saved plots, last_performance_metrics left unchanged."
+function as_performance_probe(f)
+    global last_performance_metrics
+    saved = last_performance_metrics
+    try
+        return task_local_storage(f, PERFORMANCE_PROBE_KEY, true)
+    finally
+        last_performance_metrics = saved
+    end
+end
 
 function performance(sol, device_params_set, source_amps, source_freqs)
     
     check_stop()
-    out = Base.invokelatest(
-        user_performance,
-        sol,
-        device_params_set,
-        source_amps,
-        source_freqs
-    )
-    
-    perf, metrics_dict = unpack_user_metrics(out; default_name=:performance)
-    
-    global last_performance_metrics
-    last_performance_metrics = metrics_dict
-    
-    return perf
+    # The hook and last_performance_metrics are updated together, under the user hook lock
+    return with_user_hook_lock() do
+        out = Base.invokelatest(
+            user_performance,
+            sol,
+            device_params_set,
+            source_amps,
+            source_freqs
+        )
+
+        perf, metrics_dict = unpack_user_metrics(out; default_name=:performance)
+
+        global last_performance_metrics
+        last_performance_metrics = metrics_dict
+
+        perf
+    end
 
 end
 
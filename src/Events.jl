@@ -0,0 +1,88 @@
+module Events
+
+# Machine-readable event stream (JSON lines) for the GUI and other front-ends.
+#
+# The channel is selected with the `JCO_EVENTS` environment variable:
+#   tcp://127.0.0.1:PORT   connect to a local socket opened by the front-end (the GUI does this)
+#   /path/to/events.jsonl  append the events to a file
+# Without `JCO_EVENTS` no events are emitted and the stdout protocol of `Progress` is used.
+#
+# Every event is one JSON object per line:
+#   {"v": 1, "type": "...", "t": <unix time>, ...fields}
+# Types: "stage", "progress", "stage_done", "status", "evaluation", "file", "log"
+# (see the emitting functions for the fields). Write errors close the channel silently:
+# events never abort a run.
+
+using JSON, Sockets
+
+export emit_event, events_enabled
+
+const EVENTS_VERSION = 1
+
+const SINK = Ref{Union{Nothing,IO}}(nothing)
+const OPENED = Ref(false)
+const LOCK = ReentrantLock()
+
+function _open_sink(spec::AbstractString)
+    if startswith(spec, "tcp://")
+        host, port = rsplit(spec[7:end], ":"; limit=2)
+        return Sockets.connect(host, parse(Int, port))
+    end
+    mkpath(dirname(abspath(spec)))
+    return open(spec, "a")
+end
+
+function _sink()
+    OPENED[] && return SINK[]
+    OPENED[] = true
+    spec = strip(get(ENV, "JCO_EVENTS", ""))
+    isempty(spec) && return nothing
+    try
+        SINK[] = _open_sink(spec)
+    catch err
+        @warn "Could not open the event channel $spec: $err"
+    end
+    return SINK[]
+end
+
+"`true` if events are being emitted (`JCO_EVENTS` set and the channel is open)."
+events_enabled() = lock(() -> _sink() !== nothing, LOCK)
+
+"""
+    emit_event(type; fields...)
+
+Write one event to the channel (no-op when no channel is configured).
+"""
+function emit_event(type::AbstractString; fields...)
+    lock(LOCK) do
+        io = _sink()
+        io === nothing && return nothing
+
+        ev = Dict{String,Any}("v" => EVENTS_VERSION, "type" => type, "t" => time())
+        for (k, v) in fields
+            ev[String(k)] = v
+        end
+
+        try
+            println(io, JSON.json(ev))
+            flush(io)
+        catch
+            try close(io) catch end
+            SINK[] = nothing
+        end
+        return nothing
+    end
+end
+
+"Close the channel (reopened on the next event, e.g. by the next run in the same session)."
+function close_events!()
+    lock(LOCK) do
+        io = SINK[]
+        io === nothing || try close(io) catch end
+        SINK[] = nothing
+        OPENED[] = false
+    end
+    return nothing
+end
+
+end # module
@@ -3,36 +3,44 @@ module JosephsonCircuitsOptimizer
 
 using JosephsonCircuits
 using DataFrames, Symbolics, LaTeXStrings
-using DSP, JSON, HDF5, GaussianProcesses, Surrogates
-using Makie, Colors, StatsBase, KernelDensity
+using DSP, JSON, HDF5
+using Colors, StatsBase
 using Statistics, LinearAlgebra, Dates, Logging, LoggingExtras, Interpolations
-using Pkg, QuasiMonteCarlo, Random
-import Plots as P
-import Plots: savefig
-import GLMakie as M
+using Pkg, QuasiMonteCarlo, Random, SHA, Mmap
 using FileIO
 
 export plot, mplot, run, run_sweep_only, run_from_latest_dataset_only, seed_next_run_from_latest!
-export run_optimization_only, run_nonlinear_only
+export run_optimization_only, run_nonlinear_only, run_yield_analysis, realization_rng
+export plan_run, calibrate_execution_profile
 
-const plot = P.plot
-const mplot = M.plot
+# Plots / Makie / Surrogates are loaded on demand by each entry point
+include("backends.jl")
 
 # Import the Config module
 include("Config.jl")
 using .Config
 
 # Include other module files
+include("param_expressions.jl")
 include("utils.jl")
+include("io_service.jl")
+include("plot_renderer.jl")
+include("watchdog.jl")
+include("execution.jl")
+include("Events.jl")
+using .Events
 include("Progress.jl")
 using .Progress
 include("Bookkeeping.jl")
 using .Bookkeeping
 include("CircuitModule.jl")
 include("CostModule.jl")
+include("nonlinear_results.jl")
 include("simulator.jl")
 include("optimizer.jl")
 include("Analysis_plots.jl")
+include("yield.jl")
+include("planner.jl")
 include("Resume.jl")
 using .Resume
 
@@ -53,6 +61,7 @@ function set_plain_logger!(minlevel::LogLevel=Logging.Info)
                   args.level == Logging.Info  ? "INFO"  : "DEBUG"
             # one line only:
             println(io, "[$ts] [$lvl] ", args.message)
+            args.level >= Logging.Warn && emit_event("log"; level=lvl, message=string(args.message))
         end,
         minlevel
     )
@@ -115,6 +124,10 @@ function modules_setup(config::Configuration; stages=(:sources,:circuit,:cost,:s
     setup_cost()
     setup_simulator()
     setup_optimizer()
+    setup_io_service(sim_vars)
+    setup_plot_renderer(sim_vars)
+    apply_execution_profile!(config.WORKING_SPACE, sim_vars)
+    setup_watchdog(sim_vars)
 
     @info "All modules initialized successfully."
 end
@@ -126,14 +139,17 @@ function __init__()
 end
 
 """\
-    seed_next_run_from_latest!(; workspace=nothing)
+    seed_next_run_from_latest!(; workspace=nothing, overwrite=true)
+
+Restore the inputs of the latest run into user_inputs; with `overwrite=false` existing files are kept.
 """
-function seed_next_run_from_latest!(; workspace::Union{Nothing,AbstractString}=nothing)
+function seed_next_run_from_latest!(; workspace::Union{Nothing,AbstractString}=nothing, overwrite::Bool=true)
 
     global config_1 = get_configuration(; workspace=workspace, create=false)
     
     return restore_latest_inputs_snapshot_config(; workspace=config_1.WORKING_SPACE,
-        user_inputs_dir = config_1.user_inputs_dir
+        user_inputs_dir = config_1.user_inputs_dir,
+        overwrite = overwrite
         )
 end
 
@@ -148,7 +164,12 @@ Run the full simulation and optimization process.
 - `create_workspace`: if true, create missing folders inside the workspace.
 """
 
-function run(; workspace::Union{Nothing,AbstractString}=nothing, create_workspace::Bool=true)
+function run(; kwargs...)
+    load_stage_backends!(:run)
+    return Base.invokelatest(_run; kwargs...)
+end
+
+function _run(; workspace::Union{Nothing,AbstractString}=nothing, create_workspace::Bool=true)
 
     global config = get_configuration(; workspace=workspace, create=create_workspace)
 
@@ -197,7 +218,7 @@ function run(; workspace::Union{Nothing,AbstractString}=nothing, create_workspac
         global delta_correction = 0.0
 
         df, filtered_df = run_linear_simulations_sweep(device_parameters_space, filter_df=true)
-        save_dataset(df, output_path)
+        dataset_h5 = save_dataset(df, output_path)
         @info "Saving uniform dataset from the linear simulation run."
 
         if single_point_mode
@@ -217,7 +238,7 @@ function run(; workspace::Union{Nothing,AbstractString}=nothing, create_workspac
 
             # Generate correlation + 1D plots highlighting the chosen optimum
             try
-                create_corr_figure(df)
+                create_corr_figure(dataset_h5)
             catch e
                 @warn "Could not generate correlation/1D plot: $e"
             end
@@ -225,11 +246,11 @@ function run(; workspace::Union{Nothing,AbstractString}=nothing, create_workspac
             # --- Optimization ---
             write_status(output_path; status="running", stage="BO")
             @info "Running optimization process on the dataset."
-            optimal_params, optimal_metric = run_optimization(df)
+            optimal_params, optimal_metric = run_optimization(df; output_path=output_path)
             
             # Re-generate correlation + 1D plots highlighting the chosen optimum
             try
-                create_corr_figure(df; optimal_params=optimal_params)
+                create_corr_figure(dataset_h5; optimal_params=optimal_params)
             catch e
                 @warn "Could not generate highlighted correlation/1D plot: $e"
             end
@@ -257,7 +278,7 @@ function run(; workspace::Union{Nothing,AbstractString}=nothing, create_workspac
         best_amplitudes = nothing
 
         if results !== nothing && !isempty(results)
-            best_idx = findmax(r -> r.performance, results)[2]
+            best_idx = best_result_index(results)
             best_performance = results[best_idx].performance
             best_amplitudes = results[best_idx].amps
         end
@@ -312,7 +333,7 @@ function run(; workspace::Union{Nothing,AbstractString}=nothing, create_workspac
 
                 device_parameters_space = load_params(device_params_file; optimal=optimal_params)
                 df, filtered_df = run_linear_simulations_sweep(device_parameters_space, filter_df=true)
-                optimal_params, optimal_metric = run_optimization(df)
+                optimal_params, optimal_metric = run_optimization(df; output_path=output_path)
 
                 results = run_nonlinear_simulations_sweep(optimal_params)
                 
@@ -325,7 +346,7 @@ function run(; workspace::Union{Nothing,AbstractString}=nothing, create_workspac
 
                 cycle_best_performance = NaN
                 if results !== nothing && !isempty(results)
-                    cycle_best_idx = findmax(r -> r.performance, results)[2]
+                    cycle_best_idx = best_result_index(results)
                     cycle_best_performance = results[cycle_best_idx].performance
                     cycle_best_amplitudes = results[best_idx].amps
                 end
@@ -410,6 +431,10 @@ function run(; workspace::Union{Nothing,AbstractString}=nothing, create_workspac
             rethrow()
         end
     finally
+        flush_plot_renderer()
+        shutdown_watchdog!()
+        close_evaluations_log!()
+
         # --- Reproducibility bookkeeping (best-effort) ---
         metric_history = (isdefined(@__MODULE__, :cost_history) ? cost_history : Dict())
         try
@@ -421,7 +446,8 @@ function run(; workspace::Union{Nothing,AbstractString}=nothing, create_workspac
                 best_metric=optimal_metric,
                 metric_history=metric_history,
                 sim_settings=sim_vars,
-                optimizer_settings=optimizer_config
+                optimizer_settings=optimizer_config,
+                entry_point="run"
             )
         catch err
             @warn "Bookkeeping step failed (run still OK): $err"
@@ -442,9 +468,14 @@ Run only the sweep stage (linear simulations + dataset + correlation figure).
 This is meant for quickly inspecting simulator behaviour without running the optimizer
 or nonlinear (HB) simulations.
 """
-function run_sweep_only(; workspace::Union{Nothing,AbstractString}=nothing,
-                        create_workspace::Bool=true,
-                        filter_df::Bool=true)
+function run_sweep_only(; kwargs...)
+    load_stage_backends!(:run_sweep_only)
+    return Base.invokelatest(_run_sweep_only; kwargs...)
+end
+
+function _run_sweep_only(; workspace::Union{Nothing,AbstractString}=nothing,
+                         create_workspace::Bool=true,
+                         filter_df::Bool=true)
 
     global config = get_configuration(; workspace=workspace, create=create_workspace)
     clear_stopfile!(config.WORKING_SPACE)
@@ -460,6 +491,7 @@ function run_sweep_only(; workspace::Union{Nothing,AbstractString}=nothing,
     timestamp = Dates.format(now(), "yyyy-mm-dd_HH-MM-SS")
     output_path = joinpath(base_output_path, "output_" * timestamp)
     mkpath(output_path)
+    CURRENT_OUTPUT_PATH[] = output_path
 
     @info "Results will be saved in: $output_path"
 
@@ -480,11 +512,11 @@ function run_sweep_only(; workspace::Union{Nothing,AbstractString}=nothing,
         stop_if_requested!(config.WORKING_SPACE)
 
         df, _ = run_linear_simulations_sweep(device_parameters_space, filter_df=filter_df)
-        save_dataset(df, output_path)
+        dataset_h5 = save_dataset(df, output_path)
                 
         # Generate correlation + 1D plots highlighting the chosen optimum
         try
-            create_corr_figure(df)
+            create_corr_figure(dataset_h5)
         catch e
             @info "Could not generate correlation/1D plot: $e"
         end
@@ -502,6 +534,9 @@ function run_sweep_only(; workspace::Union{Nothing,AbstractString}=nothing,
             rethrow()
         end
     finally
+        flush_plot_renderer()
+        shutdown_watchdog!()
+        close_evaluations_log!()
         metric_history = (isdefined(@__MODULE__, :cost_history) ? cost_history : Dict())
         try
             ps = (device_parameters_space === nothing) ? Dict{Symbol,Any}() : device_parameters_space
@@ -512,7 +547,8 @@ function run_sweep_only(; workspace::Union{Nothing,AbstractString}=nothing,
                 best_metric=nothing,
                 metric_history=metric_history,
                 sim_settings=sim_vars,
-                optimizer_settings=optimizer_config
+                optimizer_settings=optimizer_config,
+                entry_point="run_sweep_only"
             )
         catch err
             @warn "Bookkeeping step failed (run still OK): $err"
@@ -534,7 +570,12 @@ the most recent run folder and read `df_uniform_analysis.h5` from it.
 
 You may pass either a run-folder path or the `.h5` file path.
 """
-function run_from_latest_dataset_only(; workspace::Union{Nothing,AbstractString}=nothing,
+function run_from_latest_dataset_only(; kwargs...)
+    load_stage_backends!(:run_from_latest_dataset_only)
+    return Base.invokelatest(_run_from_latest_dataset_only; kwargs...)
+end
+
+function _run_from_latest_dataset_only(; workspace::Union{Nothing,AbstractString}=nothing,
                                      create_workspace::Bool=true,
                                      dataset_path::Union{Nothing,AbstractString}=nothing)
 
@@ -556,6 +597,7 @@ function run_from_latest_dataset_only(; workspace::Union{Nothing,AbstractString}
     timestamp = Dates.format(now(), "yyyy-mm-dd_HH-MM-SS")
     output_path = joinpath(base_output_path, "output_" * timestamp)
     mkpath(output_path)
+    CURRENT_OUTPUT_PATH[] = output_path
 
     @info "Results will be saved in: $output_path"
 
@@ -599,11 +641,11 @@ function run_from_latest_dataset_only(; workspace::Union{Nothing,AbstractString}
 
         write_status(output_path; status="running", stage="BO")
         @info "Running optimization from saved dataset."
-        optimal_params, optimal_metric = run_optimization(df)
+        optimal_params, optimal_metric = run_optimization(df; output_path=output_path)
 
         # Re-generate correlation + 1D plots highlighting the chosen optimum
         try
-            create_corr_figure(df; optimal_params=optimal_params)
+            create_corr_figure(String(dataset_file); optimal_params=optimal_params)
         catch e
             @warn "Could not generate highlighted correlation/1D plot: $e"
         end
@@ -650,6 +692,9 @@ function run_from_latest_dataset_only(; workspace::Union{Nothing,AbstractString}
             rethrow()
         end
     finally
+        flush_plot_renderer()
+        shutdown_watchdog!()
+        close_evaluations_log!()
         metric_history = (isdefined(@__MODULE__, :cost_history) ? cost_history : Dict())
         try
             write_run_bookkeeping(output_path;
@@ -659,7 +704,8 @@ function run_from_latest_dataset_only(; workspace::Union{Nothing,AbstractString}
                 best_metric=optimal_metric,
                 metric_history=metric_history,
                 sim_settings=sim_vars,
-                optimizer_settings=optimizer_config
+                optimizer_settings=optimizer_config,
+                entry_point="run_from_latest_dataset_only"
             )
         catch err
             @warn "Bookkeeping step failed (run still OK): $err"
@@ -682,7 +728,12 @@ run the nonlinear (HB) simulations.
 If `dataset_path` is `nothing`, JCO will use `outputs/LATEST.txt` in the workspace to locate
 the most recent run folder and read `df_uniform_analysis.h5` from it.
 """
-function run_optimization_only(; workspace::Union{Nothing,AbstractString}=nothing,
+function run_optimization_only(; kwargs...)
+    load_stage_backends!(:run_optimization_only)
+    return Base.invokelatest(_run_optimization_only; kwargs...)
+end
+
+function _run_optimization_only(; workspace::Union{Nothing,AbstractString}=nothing,
                               create_workspace::Bool=true,
                               dataset_path::Union{Nothing,AbstractString}=nothing)
 
@@ -706,6 +757,7 @@ function run_optimization_only(; workspace::Union{Nothing,AbstractString}=nothin
     timestamp = Dates.format(now(), "yyyy-mm-dd_HH-MM-SS")
     output_path = joinpath(base_output_path, "output_" * timestamp)
     mkpath(output_path)
+    CURRENT_OUTPUT_PATH[] = output_path
 
     @info "Results will be saved in: $output_path"
 
@@ -747,11 +799,11 @@ function run_optimization_only(; workspace::Union{Nothing,AbstractString}=nothin
 
         write_status(output_path; status="running", stage="BO")
         @info "Running optimization from saved dataset (BO only)."
-        optimal_params, optimal_metric = run_optimization(df)
+        optimal_params, optimal_metric = run_optimization(df; output_path=output_path)
 
         # Optional: correlation + 1D plot with optimum highlighted
         try
-            create_corr_figure(df; optimal_params=optimal_params)
+            create_corr_figure(String(dataset_file); optimal_params=optimal_params)
         catch e
             @warn "Could not generate highlighted correlation/1D plot: $e"
         end
@@ -777,6 +829,9 @@ function run_optimization_only(; workspace::Union{Nothing,AbstractString}=nothin
             rethrow()
         end
     finally
+        flush_plot_renderer()
+        shutdown_watchdog!()
+        close_evaluations_log!()
         metric_history = (isdefined(@__MODULE__, :cost_history) ? cost_history : Dict())
         try
             write_run_bookkeeping(output_path;
@@ -786,7 +841,8 @@ function run_optimization_only(; workspace::Union{Nothing,AbstractString}=nothin
                 best_metric=optimal_metric,
                 metric_history=metric_history,
                 sim_settings=sim_vars,
-                optimizer_settings=optimizer_config
+                optimizer_settings=optimizer_config,
+                entry_point="run_optimization_only"
             )
         catch err
             @warn "Bookkeeping step failed (run still OK): $err"
@@ -808,7 +864,12 @@ the most recent run folder and read `optimal_device_parameters.json` from it.
 
 You may pass either a run-folder path or the `.json` file path.
 """
-function run_nonlinear_only(; workspace::Union{Nothing,AbstractString}=nothing,
+function run_nonlinear_only(; kwargs...)
+    load_stage_backends!(:run_nonlinear_only)
+    return Base.invokelatest(_run_nonlinear_only; kwargs...)
+end
+
+function _run_nonlinear_only(; workspace::Union{Nothing,AbstractString}=nothing,
                         create_workspace::Bool=true,
                         optimal_params_path::Union{Nothing,AbstractString}=nothing,
                         dataset_path::Union{Nothing,AbstractString}=nothing)
@@ -829,6 +890,7 @@ function run_nonlinear_only(; workspace::Union{Nothing,AbstractString}=nothing,
     timestamp = Dates.format(now(), "yyyy-mm-dd_HH-MM-SS")
     output_path = joinpath(base_output_path, "output_" * timestamp)
     mkpath(output_path)
+    CURRENT_OUTPUT_PATH[] = output_path
 
     @info "Results will be saved in: $output_path"
 
@@ -912,7 +974,7 @@ function run_nonlinear_only(; workspace::Union{Nothing,AbstractString}=nothing,
 
         # Save best physical quantities (same logic as in run)
         try
-            best_idx = findmax(r -> r.performance, results)[2]
+            best_idx = best_result_index(results)
             best_amplitudes = results[best_idx].amps
             optimal_physical_quantities = update_physical_quantities(best_amplitudes)
             save_output_file(Dict("description"=>"Optimal physical quantities (HB only)"),
@@ -937,6 +999,148 @@ function run_nonlinear_only(; workspace::Union{Nothing,AbstractString}=nothing,
             rethrow()
         end
     finally
+        flush_plot_renderer()
+        shutdown_watchdog!()
+        close_evaluations_log!()
+        metric_history = (isdefined(@__MODULE__, :cost_history) ? cost_history : Dict())
+        try
+            write_run_bookkeeping(output_path;
+                config=config,
+                parameter_space=Dict{Symbol,Any}(),
+                best_device_parameters=optimal_params,
+                best_metric=optimal_metric,
+                metric_history=metric_history,
+                sim_settings=sim_vars,
+                optimizer_settings=optimizer_config,
+                entry_point="run_nonlinear_only"
+            )
+        catch err
+            @warn "Bookkeeping step failed (run still OK): $err"
+        end
+        GC.gc()
+    end
+
+    return nothing
+end
+
+
+"""
+    run_yield_analysis(; workspace=nothing, create_workspace=true, optimal_params_path=nothing,
+                       n_realizations=nothing)
+
+Monte Carlo fabrication-yield study of an optimal design.
+
+Loads `optimal_device_parameters.json` (from `optimal_params_path`, a run folder, or the run in
+`outputs/LATEST.txt`), evaluates `n_realizations` fabrication realizations in parallel batches
+(settings in the optional `user_inputs/yield_config.json`, see `yield.jl`) and writes
+`yield_analysis.h5` and `yield_summary.json` into a new run folder.
+"""
+function run_yield_analysis(; kwargs...)
+    load_stage_backends!(:run_yield_analysis)
+    return Base.invokelatest(_run_yield_analysis; kwargs...)
+end
+
+function _run_yield_analysis(; workspace::Union{Nothing,AbstractString}=nothing,
+                             create_workspace::Bool=true,
+                             optimal_params_path::Union{Nothing,AbstractString}=nothing,
+                             n_realizations::Union{Nothing,Integer}=nothing)
+
+    global config = get_configuration(; workspace=workspace, create=create_workspace)
+    clear_stopfile!(config.WORKING_SPACE)
+
+    modules_setup(config)
+    initialize_workspace(config)
+
+    base_output_path = config.outputs_dir
+    global plot_path = config.plot_dir
+    global corr_path = config.corr_dir
+
+    global delta_correction = 0.0
+
+    # Resolve optimal params path (before creating the new run folder)
+    opt_file = optimal_params_path
+    if opt_file === nothing
+        latest_ptr = joinpath(config.outputs_dir, "LATEST.txt")
+        if !isfile(latest_ptr)
+            error("No LATEST.txt found in outputs. Run an optimization (or full run) first.")
+        end
+        latest_run = strip(read(latest_ptr, String))
+        if isempty(latest_run)
+            error("LATEST.txt is empty. Run an optimization (or full run) first.")
+        end
+        opt_file = joinpath(latest_run, "optimal_device_parameters.json")
+    end
+    if isdir(String(opt_file))
+        opt_file = joinpath(String(opt_file), "optimal_device_parameters.json")
+    end
+    source_run = dirname(String(opt_file))
+
+    timestamp = Dates.format(now(), "yyyy-mm-dd_HH-MM-SS")
+    output_path = joinpath(base_output_path, "output_" * timestamp)
+    mkpath(output_path)
+    CURRENT_OUTPUT_PATH[] = output_path
+
+    @info "Results will be saved in: $output_path"
+
+    optimal_params = nothing
+    optimal_metric = NaN
+
+    write_status(output_path; status="running", stage="INIT")
+
+    try
+        siminfo_dir = joinpath(output_path, "simulation_info")
+        mkpath(siminfo_dir)
+        open(joinpath(siminfo_dir, "SOURCE_OPTIMAL_PARAMS.txt"), "w") do io
+            println(io, String(opt_file))
+        end
+    catch
+    end
+    try
+        cp(String(opt_file), joinpath(output_path, "optimal_device_parameters.json"); force=true)
+    catch
+    end
+
+    try
+        write_status(output_path; status="running", stage="LOAD_OPT")
+        @info "Loading optimal parameters from: $(opt_file)"
+        raw = JSON.parse(read(opt_file, String))
+        optimal_params = Dict(Symbol(k)=>v for (k,v) in raw["data"])
+        optimal_metric = get(raw["header"], "optimal_metric", NaN)
+
+        ycfg = load_yield_config(joinpath(config.user_inputs_dir, "yield_config.json"))
+        if n_realizations !== nothing
+            ycfg = merge(ycfg, (n_realizations=Int(n_realizations),))
+        end
+
+        stop_if_requested!(config.WORKING_SPACE)
+
+        write_status(output_path; status="running", stage="YIELD")
+        @info "Running yield analysis: $(ycfg.n_realizations) realizations, batches of $(ycfg.batch_size), parallel=$(ycfg.parallel)"
+        summary = yield_analysis(optimal_params, output_path; ycfg=ycfg, run_folder=source_run)
+
+        m = summary["metric"]
+        @info "Yield analysis: metric median $(get(m, "median", NaN)), p05 $(get(m, "p05", NaN)), p95 $(get(m, "p95", NaN))"
+        summary["metric_yield"] === nothing || @info "Metric yield: $(round(100 * summary["metric_yield"], digits=1)) %"
+        if ycfg.nonlinear && summary["performance_yield"] !== nothing
+            @info "Performance yield: $(round(100 * summary["performance_yield"], digits=1)) %"
+        end
+
+        write_status(output_path; status="completed", stage="DONE")
+        @info "Yield analysis completed."
+
+    catch e
+        if e isa StopRequested
+            write_status(output_path; status="stopped", stage="STOPPED", message="Stop requested by user.")
+            @warn "Stop requested by user. Exiting yield analysis cleanly."
+            return nothing
+        else
+            write_status(output_path; status="error", stage="ERROR", message=string(e))
+            rethrow()
+        end
+    finally
+        flush_plot_renderer()
+        shutdown_watchdog!()
+        close_evaluations_log!()
         metric_history = (isdefined(@__MODULE__, :cost_history) ? cost_history : Dict())
         try
             write_run_bookkeeping(output_path;
@@ -946,7 +1150,8 @@ function run_nonlinear_only(; workspace::Union{Nothing,AbstractString}=nothing,
                 best_metric=optimal_metric,
                 metric_history=metric_history,
                 sim_settings=sim_vars,
-                optimizer_settings=optimizer_config
+                optimizer_settings=optimizer_config,
+                entry_point="run_yield_analysis"
             )
         catch err
             @warn "Bookkeeping step failed (run still OK): $err"
@@ -957,4 +1162,123 @@ function run_nonlinear_only(; workspace::Union{Nothing,AbstractString}=nothing,
     return nothing
 end
 
+"""\
+    plan_run(; workspace=nothing, entry_point="run", calibrate=true, budget_hours=nothing, memory_budget_mb=nothing)
+
+Dry run: estimate the points, wall time and peak memory of `entry_point` for the current inputs
+without running it (see src/planner.jl). The plan is printed, saved in `outputs/run_plan.json`
+and returned as a Dict; a warning is logged if it exceeds the time or memory budget
+(`plan_budget_hours` / `plan_memory_budget_mb` in simulation_config.json unless given here).
+"""
+function plan_run(; kwargs...)
+    load_stage_backends!(:plan_run)
+    return Base.invokelatest(_plan_run; kwargs...)
+end
+
+function _plan_run(; workspace::Union{Nothing,AbstractString}=nothing,
+                   create_workspace::Bool=true,
+                   entry_point::AbstractString="run",
+                   calibrate::Bool=true,
+                   budget_hours::Union{Nothing,Real}=nothing,
+                   memory_budget_mb::Union{Nothing,Real}=nothing)
+
+    global config = get_configuration(; workspace=workspace, create=create_workspace)
+
+    modules_setup(config)
+    initialize_workspace(config)
+
+    global plot_path = config.plot_dir
+    global corr_path = config.corr_dir
+    global delta_correction = 0.0
+
+    device_params_file = joinpath(config.user_inputs_dir, "device_parameters_space.json")
+    global device_parameters_space = load_params(device_params_file)
+
+    budget_hours = something(budget_hours, Float64(get(sim_vars, :plan_budget_hours, 24.0)))
+    memory_budget_mb = something(memory_budget_mb, Float64(get(sim_vars, :plan_memory_budget_mb, 0.0)))
+    memory_budget_mb > 0 || (memory_budget_mb = 0.8 * Sys.total_memory() / 2^20)
+
+    plan = try
+        build_run_plan(entry_point, device_parameters_space; calibrate=calibrate)
+    finally
+        flush_plot_renderer()
+        shutdown_watchdog!()
+    end
+    plan["created_at"] = Dates.format(now(), "yyyy-mm-dd HH:MM:SS")
+    plan["workspace"] = config.WORKING_SPACE
+    plan["finish_estimate"] = plan["wall_time_s"] === nothing ? nothing :
+        Dates.format(now() + Dates.Second(round(Int, plan["wall_time_s"])), "yyyy-mm-dd HH:MM")
+    check_run_plan_budget!(plan; budget_hours=budget_hours, memory_budget_mb=memory_budget_mb)
+
+    print_run_plan(stdout, plan)
+    foreach(w -> @warn(w), filter(w -> !startswith(w, "Predicted"), plan["warnings"]))
+
+    plan_file = joinpath(config.outputs_dir, RUN_PLAN_FILE)
+    try
+        atomic_write_json(plan_file, plan)
+        @info "Run plan saved in: $plan_file"
+    catch err
+        @warn "Could not save the run plan: $err"
+    end
+    return plan
+end
+
+"""\
+    calibrate_execution_profile(; workspace=nothing, rounds=2)
+
+Measure the throughput of the linear evaluation of a sample point (middle of the parameter
+space) for every threads-per-task / BLAS-threads combination available with the current Julia
+threads, and save the fastest one in `<workspace>/execution_profile.json` (see src/execution.jl).
+Launch it with all the cores of the host as Julia threads (`jco calibrate` does).
+"""
+function calibrate_execution_profile(; kwargs...)
+    load_stage_backends!(:calibrate_execution_profile)
+    return Base.invokelatest(_calibrate_execution_profile; kwargs...)
+end
+
+function _calibrate_execution_profile(; workspace::Union{Nothing,AbstractString}=nothing,
+                                      create_workspace::Bool=true,
+                                      rounds::Integer=2)
+
+    global config = get_configuration(; workspace=workspace, create=create_workspace)
+    clear_stopfile!(config.WORKING_SPACE)
+
+    modules_setup(config)
+    initialize_workspace(config)
+
+    global delta_correction = 0.0
+    global device_parameters_space = load_params(joinpath(config.user_inputs_dir, "device_parameters_space.json"))
+    params = plan_middle_params(device_parameters_space)
+
+    profile = nothing
+    scratch = mktempdir()
+    try
+        global plot_path = scratch
+        global corr_path = scratch
+        global number_initial_points = 1
+        global point_exluded = 0
+
+        @info "Calibrating the execution profile on $(Threads.nthreads()) threads ($(Sys.CPU_THREADS) on the host)..."
+        evaluate_linear_point(params, delta_correction)    # warm-up (compilation)
+        results = benchmark_execution(() -> evaluate_linear_point(params, delta_correction); rounds=rounds)
+
+        profile = save_execution_profile(config.WORKING_SPACE, results)
+        @info "Execution profile saved in $(execution_profile_path(config.WORKING_SPACE)): " *
+              "$(profile["threads_per_task"]) thread(s) per evaluation, $(profile["blas_threads"]) BLAS thread(s)"
+    catch e
+        if e isa StopRequested
+            @warn "Stop requested by user. Calibration interrupted, profile not changed."
+            return nothing
+        end
+        rethrow()
+    finally
+        flush_plot_renderer()
+        shutdown_watchdog!()
+        rm(scratch; force=true, recursive=true)
+        global plot_path = config.plot_dir
+        global corr_path = config.corr_dir
+    end
+    return profile
+end
+
 end  # End of module
@@ -1,6 +1,10 @@
 module Progress
 
 using Dates
+using ..Events
+
+# With an event channel (`JCO_EVENTS`, see Events.jl) progress is emitted as "stage" /
+# "progress" / "stage_done" events instead of the STAGE/PROGRESS stdout lines.
 
 # ----------------------------
 # Internal state (per stage)
@@ -37,7 +41,11 @@ Emit a stage-only message (no progress, no ETA).
 GUI should switch to indeterminate mode.
 """
 function emit_stage(stage::String)
-    println("STAGE name=$stage")
+    if events_enabled()
+        emit_event("stage"; stage=stage)
+    else
+        println("STAGE name=$stage")
+    end
 end
 
 """
@@ -57,11 +65,15 @@ function tick_progress!(i::Int, N::Int; stage::String)
     end
     st.n_samples += 1
 
-    if N < MIN_SAMPLES_FOR_ETA || st.n_samples < MIN_SAMPLES_FOR_ETA
+    eta = (N < MIN_SAMPLES_FOR_ETA || st.n_samples < MIN_SAMPLES_FOR_ETA) ? nothing :
+          round(max(st.ema_dt * (N - i), 0.0), digits=1)
+
+    if events_enabled()
+        emit_event("progress"; stage=stage, i=i, N=N, eta_s=eta)
+    elseif eta === nothing
         println("PROGRESS i=$i N=$N stage=$stage")
     else
-        eta = max(st.ema_dt * (N - i), 0.0)
-        println("PROGRESS i=$i N=$N ETA=$(round(eta, digits=1))s stage=$stage")
+        println("PROGRESS i=$i N=$N ETA=$(eta)s stage=$stage")
     end
 end
 
@@ -69,7 +81,11 @@ end
 Signal end of a stage.
 """
 function emit_done(stage::String)
-    println("PROGRESS_DONE stage=$stage")
+    if events_enabled()
+        emit_event("stage_done"; stage=stage)
+    else
+        println("PROGRESS_DONE stage=$stage")
+    end
 end
 
 
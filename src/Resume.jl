@@ -3,6 +3,7 @@ module Resume
 export restore_latest_inputs_snapshot_config
 
 using Dates
+using JSON
 
 # small helpers (Windows-safe)
 _cleanpath(s::AbstractString) = normpath(strip(String(s)))
@@ -15,9 +16,37 @@ function latest_run_folder(workspace::AbstractString)
 end
 
 """
-Restore the latest run's inputs_snapshot into the active user_inputs directory.
+Source files of a run's input snapshot, as `filename => path`.
 
-- Copies files from: <LATEST_RUN>/inputs_snapshot/*
+Reads `simulation_info/inputs_manifest.json` (files stored in the content-addressed
+`outputs/snapshot_store/`), falling back to the legacy `inputs_snapshot/` folder of older runs.
+"""
+function snapshot_sources(run_folder::AbstractString)
+    manifest_path = joinpath(run_folder, "simulation_info", "inputs_manifest.json")
+
+    if isfile(manifest_path)
+        manifest = JSON.parsefile(manifest_path)
+        store = normpath(joinpath(run_folder, get(manifest, "store", joinpath("..", "snapshot_store"))))
+        sources = Dict{String,String}()
+        for (f, meta) in get(manifest, "files", Dict())
+            meta isa AbstractDict || continue    # "copy_failed"
+            h = meta["sha256"]
+            blob = joinpath(store, "blobs", h[1:2], h)
+            isfile(blob) || error("Snapshot blob for $f not found at: $blob")
+            sources[f] = blob
+        end
+        return sources
+    end
+
+    snap = joinpath(run_folder, "inputs_snapshot")
+    isdir(snap) || error("No inputs_manifest.json or inputs_snapshot folder found in: $run_folder")
+    return Dict(f => joinpath(snap, f) for f in readdir(snap) if isfile(joinpath(snap, f)))
+end
+
+"""
+Restore the latest run's input snapshot into the active user_inputs directory.
+
+- Reads: <LATEST_RUN>/simulation_info/inputs_manifest.json (or legacy <LATEST_RUN>/inputs_snapshot/*)
 - Into: <workspace>/user_inputs/*   (or whatever user_inputs_dir points to)
 
 Returns a NamedTuple with run_folder and files_copied.
@@ -30,19 +59,16 @@ function restore_latest_inputs_snapshot_config(; workspace::AbstractString,
     user_inputs_dir = _cleanpath(user_inputs_dir)
 
     run_folder = latest_run_folder(workspace)
-    snap = joinpath(run_folder, "inputs_snapshot")
-    isdir(snap) || error("inputs_snapshot folder not found at: $snap")
+    sources = snapshot_sources(run_folder)
+    isempty(sources) && error("Input snapshot is empty for run: $run_folder")
 
     mkpath(user_inputs_dir)
 
-    files = readdir(snap)
-    isempty(files) && error("inputs_snapshot is empty at: $snap")
-
     copied = String[]
     skipped = String[]
 
-    for f in files
-        src = joinpath(snap, f)
+    for f in sort!(collect(keys(sources)))
+        src = sources[f]
         dst = joinpath(user_inputs_dir, f)
 
         if isfile(dst) && !overwrite
@@ -0,0 +1,163 @@
+#-------------------------------------BACKENDS-------------------------------------------
+
+# The plotting (Plots, Makie + GLMakie/CairoMakie) and surrogate (Surrogates, GaussianProcesses)
+# stacks dominate `using JosephsonCircuitsOptimizer` time, and not every entry point needs them:
+# `run_nonlinear_only` never touches the surrogate stack, and a headless cluster sweep has no use
+# for an OpenGL backend. They are therefore loaded on demand, per entry point, by `load_backends!`.
+# They stay dependencies of the package (installed and precompiled with it): only loading them is
+# deferred. `benchmark/import_time.jl` measures the import time of the package and of the backends
+# of each entry point against loading every stack eagerly.
+#
+# Entry points load what their stages need and then call their implementation through
+# `Base.invokelatest`, so that the freshly loaded methods are visible to the whole run.
+#
+# Headless mode (`JCO_HEADLESS=1`, or auto-detected on Linux without a display) renders the
+# correlation figures with CairoMakie instead of GLMakie. CairoMakie is not a dependency of the
+# package: it must be available in the active environment (e.g. `] add CairoMakie`), otherwise
+# correlation figures are skipped with a warning.
+
+const BACKEND_PACKAGES = Dict{Symbol,Vector{Base.PkgId}}(
+    :plots => [
+        Base.PkgId(Base.UUID("91a5bcdd-55d7-5caf-9e0b-520d859cae80"), "Plots"),
+        Base.PkgId(Base.UUID("5ab0869b-81aa-558d-bb23-cbf5423bbe9b"), "KernelDensity"),
+    ],
+    :makie => [
+        Base.PkgId(Base.UUID("ee78f7c6-11fb-53f2-987a-cfe4a2b5a57a"), "Makie"),
+    ],
+    :surrogates => [
+        Base.PkgId(Base.UUID("6fc51010-71bc-11e9-0e15-a3fcc6593c49"), "Surrogates"),
+        Base.PkgId(Base.UUID("891a1506-143c-57d2-908e-e1f8e92e6de9"), "GaussianProcesses"),
+    ],
+)
+
+const GLMAKIE_PKG = Base.PkgId(Base.UUID("e9467ef8-e4e7-5192-8a1a-b1aee30e663a"), "GLMakie")
+
+# Backends needed by each entry point (user hooks call `plot`, so every simulation needs Plots)
+const STAGE_BACKENDS = Dict{Symbol,Tuple}(
+    :run                          => (:plots, :makie, :surrogates),
+    :run_sweep_only               => (:plots, :makie),
+    :run_from_latest_dataset_only => (:plots, :makie, :surrogates),
+    :run_optimization_only        => (:plots, :makie, :surrogates),
+    :run_nonlinear_only           => (:plots,),
+    :run_yield_analysis           => (:plots,),
+    :plan_run                     => (:plots,),
+    :calibrate_execution_profile  => (:plots,),
+)
+
+# Loaded backend => load time in seconds
+const LOADED_BACKENDS = Dict{Symbol,Float64}()
+
+"""
+    LazyBackend(name)
+
+Constant stand-in for the module of a backend: `P` (Plots; `P.plot!`, `P.vline!`, ... are also
+used by the user hooks) and `M` (Makie render backend, GLMakie or CairoMakie). The module is set
+by `load_backends!`; a property access before that loads the backend first.
+"""
+struct LazyBackend
+    name::Symbol
+    mod::Base.RefValue{Union{Module,Nothing}}
+end
+
+LazyBackend(name::Symbol) = LazyBackend(name, Ref{Union{Module,Nothing}}(nothing))
+
+const P = LazyBackend(:plots)
+const M = LazyBackend(:makie)
+
+"The module of backend `b`, or `nothing` if it is not loaded (or not available)."
+loaded_module(b::LazyBackend) = getfield(b, :mod)[]
+
+"The module of backend `b`, loaded if needed."
+function backend_module(b::LazyBackend)
+    m = loaded_module(b)
+    m === nothing || return m
+    load_backends!(getfield(b, :name))
+    m = loaded_module(b)
+    m === nothing && error("No $(getfield(b, :name)) backend available (headless mode without CairoMakie).")
+    return m
+end
+
+function Base.getproperty(b::LazyBackend, name::Symbol)
+    loaded_module(b) !== nothing && return getproperty(loaded_module(b), name)
+    # Loaded by this access: the caller is older than the backend methods
+    x = getproperty(backend_module(b), name)
+    return x isa Function ? (args...; kwargs...) -> Base.invokelatest(x, args...; kwargs...) : x
+end
+
+Base.propertynames(b::LazyBackend, private::Bool=false) = propertynames(backend_module(b), private)
+Base.show(io::IO, b::LazyBackend) =
+    print(io, "LazyBackend(:", getfield(b, :name), loaded_module(b) === nothing ? ", not loaded)" : ", $(loaded_module(b)))")
+
+"""
+    headless_mode()
+
+`true` if figures must be rendered without a display: `JCO_HEADLESS=1/true` forces it,
+`JCO_HEADLESS=0/false` disables it, otherwise it is auto-detected (Linux without X11/Wayland).
+"""
+function headless_mode()
+    v = lowercase(strip(get(ENV, "JCO_HEADLESS", "")))
+    v in ("1", "true", "yes") && return true
+    v in ("0", "false", "no") && return false
+    return Sys.islinux() && !haskey(ENV, "DISPLAY") && !haskey(ENV, "WAYLAND_DISPLAY")
+end
+
+"`true` once a Makie render backend (GLMakie or CairoMakie) has been loaded."
+makie_available() = loaded_module(M) !== nothing
+
+function _load_makie_backend()
+    if headless_mode()
+        pkg = Base.identify_package("CairoMakie")
+        if pkg === nothing
+            @warn "Headless mode: CairoMakie is not available in the active environment, correlation figures are disabled."
+            return false
+        end
+        m = Base.require(pkg)
+        Base.invokelatest(getproperty(m, :activate!))
+        getfield(M, :mod)[] = m
+        @info "Headless mode: rendering correlation figures with CairoMakie."
+    else
+        getfield(M, :mod)[] = Base.require(GLMAKIE_PKG)
+    end
+
+    foreach(Base.require, BACKEND_PACKAGES[:makie])
+    Core.eval(@__MODULE__, :(using Makie))
+    return true
+end
+
+"""
+    load_backends!(names::Symbol...)
+
+Load the given backends (`:plots`, `:makie`, `:surrogates`) if not already loaded and bring
+their exported names into the package namespace. Call the code that uses them through
+`Base.invokelatest` (entry points do this automatically).
+"""
+function load_backends!(names::Symbol...)
+    for name in names
+        haskey(LOADED_BACKENDS, name) && continue
+        haskey(BACKEND_PACKAGES, name) || error("Unknown backend: $name")
+
+        t0 = time()
+        if name === :plots
+            foreach(Base.require, BACKEND_PACKAGES[:plots])
+            getfield(P, :mod)[] = Base.require(first(BACKEND_PACKAGES[:plots]))
+            Core.eval(@__MODULE__, :(using KernelDensity))
+        elseif name === :makie
+            _load_makie_backend()
+        elseif name === :surrogates
+            foreach(Base.require, BACKEND_PACKAGES[:surrogates])
+            Core.eval(@__MODULE__, :(using Surrogates, GaussianProcesses))
+        end
+
+        LOADED_BACKENDS[name] = time() - t0
+        @info "Loaded $name backend in $(round(LOADED_BACKENDS[name], digits=2)) s"
+    end
+    return nothing
+end
+
+"Load the backends needed by `entry_point` (see `STAGE_BACKENDS`)."
+load_stage_backends!(entry_point::Symbol) = load_backends!(STAGE_BACKENDS[entry_point]...)
+
+# Exported plotting shortcuts (used by the user hooks). They load their backend on first use.
+plot(args...; kwargs...) = Base.invokelatest(backend_module(P).plot, args...; kwargs...)
+
+mplot(args...; kwargs...) = Base.invokelatest(backend_module(M).plot, args...; kwargs...)
@@ -0,0 +1,162 @@
+#-------------------------------------EXECUTION PROFILE-------------------------------------------
+
+# How a run uses the cores of the host, read from `<workspace>/execution_profile.json` (host
+# specific, so it is not part of the user inputs snapshot). All keys are optional:
+#   julia_threads     (null; JULIA_NUM_THREADS set by the launcher, gui/jco.py, instead of threads.txt)
+#   threads_per_task  (1; Julia threads per concurrent evaluation: the batch optimizer, the local
+#                      refinement and the yield analysis run at most nthreads ÷ threads_per_task
+#                      evaluations at once)
+#   blas_threads      (null = unchanged; BLAS threads of every process)
+#   workers           (null; watchdog worker processes, overrides "watchdog_workers")
+#   cpu_affinity      (null; list of CPU ids the launcher pins the Julia process to, Linux only)
+#
+# Parallel evaluations that each start their own BLAS threads oversubscribe the cores and can be
+# slower than serial ones; `calibrate_execution_profile` measures the throughput of a sample
+# point for every threads_per_task / blas_threads combination and saves the fastest one.
+
+const EXECUTION_PROFILE_FILE = "execution_profile.json"
+
+Base.@kwdef struct ExecutionProfile
+    julia_threads::Union{Nothing,Int} = nothing
+    threads_per_task::Int = 1
+    blas_threads::Union{Nothing,Int} = nothing
+    workers::Union{Nothing,Int} = nothing
+    cpu_affinity::Union{Nothing,Vector{Int}} = nothing
+end
+
+const EXECUTION_PROFILE = Ref(ExecutionProfile())
+
+execution_profile_path(workspace::AbstractString) = joinpath(workspace, EXECUTION_PROFILE_FILE)
+
+_positive_or_nothing(x) = (x === nothing || Int(x) < 1) ? nothing : Int(x)
+
+"Read the execution profile of `workspace` (defaults if there is none)."
+function load_execution_profile(workspace::AbstractString)
+    path = execution_profile_path(workspace)
+    isfile(path) || return ExecutionProfile()
+    d = JSON.parsefile(path)
+    affinity = get(d, "cpu_affinity", nothing)
+    return ExecutionProfile(
+        julia_threads    = _positive_or_nothing(get(d, "julia_threads", nothing)),
+        threads_per_task = max(Int(something(get(d, "threads_per_task", 1), 1)), 1),
+        blas_threads     = _positive_or_nothing(get(d, "blas_threads", nothing)),
+        workers          = _positive_or_nothing(get(d, "workers", nothing)),
+        cpu_affinity     = (affinity === nothing || isempty(affinity)) ? nothing : Int.(affinity),
+    )
+end
+
+"""
+    apply_execution_profile!(workspace, settings::AbstractDict)
+
+Load the execution profile of `workspace`, set the BLAS threads and the number of watchdog
+workers (`settings[:watchdog_workers]`, normally `sim_vars`) and log the resulting topology.
+"""
+function apply_execution_profile!(workspace::AbstractString, settings::AbstractDict)
+    p = try
+        load_execution_profile(workspace)
+    catch err
+        @warn "Could not read $(EXECUTION_PROFILE_FILE), using the defaults: $err"
+        ExecutionProfile()
+    end
+    EXECUTION_PROFILE[] = p
+
+    p.blas_threads === nothing || BLAS.set_num_threads(p.blas_threads)
+    p.workers === nothing || (settings[:watchdog_workers] = p.workers)
+
+    if p.julia_threads !== nothing && p.julia_threads != Threads.nthreads()
+        @info "Execution profile asks for $(p.julia_threads) Julia threads, running with $(Threads.nthreads()) " *
+              "(set JULIA_NUM_THREADS or launch through the GUI / jco)."
+    end
+    @info "Execution: $(Threads.nthreads()) Julia threads, $(max_parallel_tasks()) parallel evaluations, " *
+          "$(BLAS.get_num_threads()) BLAS threads" *
+          (p.cpu_affinity === nothing ? "" : ", CPUs $(p.cpu_affinity)")
+    return p
+end
+
+"Number of evaluations run at the same time by the parallel stages."
+max_parallel_tasks() = max(Threads.nthreads() ÷ EXECUTION_PROFILE[].threads_per_task, 1)
+
+"""
+    parallel_map(f, items; ntasks=max_parallel_tasks())
+
+`map(f, items)` on threads, with at most `ntasks` calls running at once. The first error of a
+call is rethrown as is (e.g. `StopRequested`), not wrapped in a `TaskFailedException`.
+"""
+function parallel_map(f, items; ntasks::Integer=max_parallel_tasks())
+    (ntasks <= 1 || length(items) <= 1) && return [f(x) for x in items]
+
+    sem = Base.Semaphore(ntasks)
+    tasks = [Threads.@spawn Base.acquire(() -> f(x), sem) for x in items]
+    for t in tasks
+        try
+            wait(t)
+        catch
+        end
+    end
+    for t in tasks
+        istaskfailed(t) && throw(t.result)
+    end
+    return fetch.(tasks)
+end
+
+#---- calibration ----
+
+"Candidate `(threads_per_task, blas_threads)` pairs for `n` Julia threads."
+function execution_candidates(n::Integer)
+    per_task = [t for t in (1, 2, 4, 8, 16, 32, 64) if t < n] ∪ [n]
+    return unique!([(t, b) for t in per_task for b in unique!([1, t])])
+end
+
+"""
+    benchmark_execution(evaluate; rounds=2) -> Vector{Dict}
+
+Throughput of `evaluate()` for every candidate of `execution_candidates`: `nthreads ÷ t`
+evaluations at once (`rounds` each) with `b` BLAS threads. The BLAS threads are left at the
+value they had before.
+"""
+function benchmark_execution(evaluate; rounds::Integer=2)
+    n = Threads.nthreads()
+    blas_before = BLAS.get_num_threads()
+    results = Dict{String,Any}[]
+    try
+        for (t, b) in execution_candidates(n)
+            check_stop()
+            BLAS.set_num_threads(b)
+            ntasks = max(n ÷ t, 1)
+            elapsed = @elapsed parallel_map(_ -> evaluate(), 1:ntasks * rounds; ntasks=ntasks)
+            throughput = 60 * ntasks * rounds / elapsed
+            @info "Calibration: $ntasks parallel evaluations × $t thread(s), $b BLAS thread(s): " *
+                  "$(round(throughput, sigdigits=3)) evaluations/min"
+            push!(results, Dict{String,Any}("threads_per_task" => t, "blas_threads" => b,
+                                            "parallel_tasks" => ntasks, "evaluations_per_min" => throughput))
+        end
+    finally
+        BLAS.set_num_threads(blas_before)
+    end
+    return results
+end
+
+"""
+    save_execution_profile(workspace, results)
+
+Write the fastest combination of `results` (see `benchmark_execution`) to the execution profile
+of `workspace`, keeping `workers` and `cpu_affinity` of an existing profile. Returns the profile.
+"""
+function save_execution_profile(workspace::AbstractString, results::AbstractVector)
+    path = execution_profile_path(workspace)
+    profile = isfile(path) ? JSON.parsefile(path) : Dict{String,Any}()
+    best = results[argmax([r["evaluations_per_min"] for r in results])]
+
+    profile["julia_threads"] = Threads.nthreads()
+    profile["threads_per_task"] = best["threads_per_task"]
+    profile["blas_threads"] = best["blas_threads"]
+    get!(profile, "workers", nothing)
+    get!(profile, "cpu_affinity", nothing)
+    profile["calibration"] = Dict{String,Any}(
+        "calibrated_at" => Dates.format(now(), "yyyy-mm-dd HH:MM:SS"),
+        "host_cpu_threads" => Sys.CPU_THREADS,
+        "results" => results,
+    )
+    atomic_write_json(path, profile)
+    return profile
+end
@@ -0,0 +1,173 @@
+#-------------------------------------I/O SERVICE-------------------------------------------
+
+# Output files (datasets, user data, status.json, plots and their sidecar JSON) are written by a
+# single background task, so the simulations do not wait on the disk (slow on network file
+# systems). Writes are executed in submission order. A write submitted with a `key` (e.g. the
+# status.json path) replaces a pending write with the same key instead of being queued again, so
+# repeated status updates are coalesced into one. Files are written to a temporary name and
+# renamed, so readers never see a partial file.
+#
+# `flush_io_service!()` is a barrier: it returns once everything submitted before it is on disk.
+# `write_status` calls it at every stage change and before the final status (completed, stopped
+# after `StopRequested`, error), and the entry points call it (through `flush_plot_renderer`)
+# before the bookkeeping.
+#
+# Optional keys of `simulation_config.json`:
+#   io_async       (true with more than one Julia thread; false = write in the calling task)
+#   io_queue_size  (64; pending writes before `submit_io!` waits for the writer)
+
+mutable struct IOService
+    queue::Union{Nothing,Channel{Any}}
+    worker::Union{Nothing,Task}
+    lock::ReentrantLock
+    async::Bool
+    queue_size::Int
+    pending::Dict{String,Any}    # coalescing key => latest write not started yet
+    n_written::Int
+    n_coalesced::Int
+    n_failed::Int
+end
+
+IOService() = IOService(nothing, nothing, ReentrantLock(), Threads.nthreads() > 1, 64,
+                        Dict{String,Any}(), 0, 0, 0)
+
+const IO_SERVICE = IOService()
+
+"""
+    setup_io_service(settings::AbstractDict)
+
+(Re)configure the background writer from `settings` (normally `sim_vars`). Pending writes of a
+previous run are flushed first.
+"""
+function setup_io_service(settings::AbstractDict)
+    s = IO_SERVICE
+    flush_io_service!(; stop=true)
+
+    lock(s.lock) do
+        s.async      = Bool(get(settings, :io_async, Threads.nthreads() > 1))
+        s.queue_size = max(Int(get(settings, :io_queue_size, 64)), 1)
+        s.n_written = s.n_coalesced = s.n_failed = 0
+    end
+    return nothing
+end
+
+function _ensure_io_worker!(s::IOService)
+    lock(s.lock) do
+        if s.queue === nothing || !isopen(s.queue)
+            q = Channel{Any}(s.queue_size)
+            s.queue = q
+            s.worker = Threads.@spawn _io_worker(s, q)
+        end
+        return s.queue
+    end
+end
+
+function _io_worker(s::IOService, q::Channel)
+    for job in q
+        f = job.key === nothing ? job.f : lock(() -> pop!(s.pending, job.key, nothing), s.lock)
+        f === nothing || _run_io_job(s, f, job.label)
+    end
+    return nothing
+end
+
+function _run_io_job(s::IOService, f, label)
+    try
+        f()
+        lock(() -> (s.n_written += 1), s.lock)
+    catch err
+        lock(() -> (s.n_failed += 1), s.lock)
+        @warn "Background write failed ($label): $err"
+    end
+    return nothing
+end
+
+"""
+    submit_io!(f; key=nothing, label="")
+
+Run the write `f()` on the background writer (in the calling task if the service is not
+asynchronous). With a `key`, a write with the same key still waiting in the queue is replaced
+by `f`. Errors are logged, never thrown to the caller.
+"""
+function submit_io!(f; key::Union{Nothing,AbstractString}=nothing, label::AbstractString="", s::IOService=IO_SERVICE)
+    if !s.async
+        _run_io_job(s, f, label)
+        return nothing
+    end
+
+    q = _ensure_io_worker!(s)
+    if key !== nothing
+        coalesced = lock(s.lock) do
+            already = haskey(s.pending, key)
+            s.pending[key] = f
+            already && (s.n_coalesced += 1)
+            already
+        end
+        coalesced && return nothing
+    end
+    put!(q, (key=key === nothing ? nothing : String(key), f=(key === nothing ? f : nothing), label=label))
+    return nothing
+end
+
+"""
+    flush_io_service!(; stop=false)
+
+Wait until every write submitted so far is on disk. With `stop=true` the writer task is also
+stopped (a new one is started by the next `submit_io!`).
+"""
+function flush_io_service!(; stop::Bool=false, s::IOService=IO_SERVICE)
+    if stop
+        q, worker = lock(s.lock) do
+            q, worker = s.queue, s.worker
+            s.queue, s.worker = nothing, nothing
+            q, worker
+        end
+        q === nothing || close(q)
+        if worker !== nothing
+            try
+                wait(worker)
+            catch err
+                @warn "Background writer stopped with an error: $err"
+            end
+        end
+        return nothing
+    end
+
+    q = lock(() -> s.queue, s.lock)
+    (q === nothing || !isopen(q)) && return nothing
+    done = Base.Event()
+    try
+        put!(q, (key=nothing, f=() -> notify(done), label="barrier"))
+    catch err
+        err isa InvalidStateException || rethrow()    # closed meanwhile: already flushed
+        return nothing
+    end
+    wait(done)
+    return nothing
+end
+
+"Write `path` atomically: `write_fn(tmp_path)` then rename (same folder, so the rename is atomic)."
+function atomic_write(write_fn, path::AbstractString; suffix::AbstractString=".part")
+    tmp = path * suffix
+    try
+        write_fn(tmp)
+        mv(tmp, path; force=true)
+    catch
+        rm(tmp; force=true)
+        rethrow()
+    end
+    return path
+end
+
+"""
+    write_json_async(path, obj; indent=4, coalesce=false)
+
+Serialize `obj` now (later changes to it are not written) and write it atomically in the
+background. With `coalesce=true` only the latest pending content of `path` is written.
+"""
+function write_json_async(path::AbstractString, obj; indent::Int=4, coalesce::Bool=false)
+    text = JSON.json(obj, indent)
+    submit_io!(; key=(coalesce ? path : nothing), label=path) do
+        atomic_write(tmp -> write(tmp, text), path; suffix=".tmp")
+    end
+    return path
+end
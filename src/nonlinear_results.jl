@@ -0,0 +1,178 @@
+#-------------------------------------NONLINEAR RESULTS-------------------------------------------
+
+# Results of the nonlinear (HB) sweep, stored by column in one Float64 matrix (rows = sweep
+# points): source_i_frequency, source_i_amplitude, performance, converged (0/1), delta_quantity,
+# then one column per performance metric, added the first time the metric is seen (NaN for the
+# earlier rows). The matrix is preallocated for the whole sweep; when it would exceed
+# `max_memory_mb` it is allocated in a memory-mapped temporary file instead, so the operating
+# system can page it out. Columns are read as views (`result_column`, `result_amplitudes`),
+# without copies.
+#
+# Indexing a store (`results[i]`) still returns the named tuple of a point
+# (freqs, amps, performance, performance_metrics, delta_quantity, converged, message).
+#
+# Optional keys of `simulation_config.json`:
+#   nonlinear_results_max_memory_mb  (256; above it the results are memory-mapped)
+#   nonlinear_results_spill_dir      (system temporary folder; folder of the memory-mapped file)
+
+const NONLINEAR_SPARE_COLUMNS = 8    # metric columns reserved at allocation
+
+mutable struct NonlinearResults
+    n::Int                          # filled rows
+    n_sources::Int
+    n_fixed::Int                    # columns before the performance metrics
+    data::Matrix{Float64}           # capacity × column capacity
+    columns::Vector{Symbol}
+    index::Dict{Symbol,Int}
+    messages::Vector{String}
+    delta_other::Dict{Int,Any}      # row => non-real delta_quantity (NaN in the column)
+    max_memory_bytes::Int
+    spill_dir::String
+    spilled::Bool
+end
+
+"""
+    NonlinearResults(n_sources; capacity=16, max_memory_mb=256, spill_dir=tempdir())
+
+Empty result store for `n_sources` sources with room for `capacity` points (grown by doubling
+if more are pushed).
+"""
+function NonlinearResults(n_sources::Integer; capacity::Integer=16, max_memory_mb::Real=256,
+                          spill_dir::AbstractString=tempdir())
+    columns = vcat([Symbol("source_$(i)_frequency") for i in 1:n_sources],
+                   [Symbol("source_$(i)_amplitude") for i in 1:n_sources],
+                   [:performance, :converged, :delta_quantity])
+    r = NonlinearResults(0, n_sources, length(columns), Matrix{Float64}(undef, 0, 0), columns,
+                         Dict(c => j for (j, c) in enumerate(columns)), String[], Dict{Int,Any}(),
+                         round(Int, max_memory_mb * 2^20), String(spill_dir), false)
+    r.data = _allocate_results(r, max(Int(capacity), 1), length(columns) + NONLINEAR_SPARE_COLUMNS)
+    sizehint!(r.messages, max(Int(capacity), 1))
+    return r
+end
+
+function _allocate_results(r::NonlinearResults, rows::Int, cols::Int)
+    rows * cols * sizeof(Float64) <= r.max_memory_bytes && return Matrix{Float64}(undef, rows, cols)
+
+    mkpath(r.spill_dir)
+    path, io = mktemp(r.spill_dir)    # removed at exit if it cannot be removed now (Windows)
+    data = try
+        Mmap.mmap(io, Matrix{Float64}, (rows, cols))
+    finally
+        close(io)
+    end
+    try
+        rm(path; force=true)          # the mapping keeps the data
+    catch
+    end
+    if !r.spilled
+        @info "Nonlinear results above $(round(Int, r.max_memory_bytes / 2^20)) MB, " *
+              "stored in a memory-mapped file in $(r.spill_dir)"
+        r.spilled = true
+    end
+    return data
+end
+
+function _grow_results!(r::NonlinearResults, rows::Int, cols::Int)
+    data = _allocate_results(r, rows, cols)
+    used = length(r.columns)
+    copyto!(view(data, 1:r.n, 1:used), view(r.data, 1:r.n, 1:used))
+    r.data = data
+    return r
+end
+
+function _add_result_column!(r::NonlinearResults, name::Symbol)
+    j = length(r.columns) + 1
+    j > size(r.data, 2) && _grow_results!(r, size(r.data, 1), 2 * size(r.data, 2))
+    push!(r.columns, name)
+    r.index[name] = j
+    fill!(view(r.data, 1:r.n, j), NaN)
+    return j
+end
+
+"""
+    push_result!(r::NonlinearResults, freqs, amps, performance, metrics, delta_quantity, converged, message)
+
+Append one sweep point. `metrics` (name => value, e.g. `last_performance_metrics`) is copied into
+its columns; a metric not seen before gets a new column.
+"""
+function push_result!(r::NonlinearResults, freqs, amps, performance::Real, metrics::AbstractDict,
+                      delta_quantity, converged::Bool, message)
+    i = r.n + 1
+    i > size(r.data, 1) && _grow_results!(r, 2 * size(r.data, 1), size(r.data, 2))
+    for name in keys(metrics)
+        haskey(r.index, Symbol(name)) || _add_result_column!(r, Symbol(name))
+    end
+
+    d = r.data
+    ns = r.n_sources
+    for s in 1:ns
+        d[i, s] = freqs[s]
+        d[i, ns + s] = amps[s]
+    end
+    d[i, 2ns + 1] = performance
+    d[i, 2ns + 2] = converged ? 1.0 : 0.0
+    if delta_quantity isa Real
+        d[i, 2ns + 3] = delta_quantity
+    else
+        d[i, 2ns + 3] = NaN
+        r.delta_other[i] = delta_quantity
+    end
+    for j in r.n_fixed+1:length(r.columns)
+        d[i, j] = NaN
+    end
+    for (name, value) in metrics
+        j = r.index[Symbol(name)]
+        j > r.n_fixed && (d[i, j] = value)
+    end
+
+    push!(r.messages, string(message))
+    r.n = i
+    return r
+end
+
+Base.length(r::NonlinearResults) = r.n
+Base.isempty(r::NonlinearResults) = r.n == 0
+Base.keys(r::NonlinearResults) = 1:r.n
+Base.firstindex(::NonlinearResults) = 1
+Base.lastindex(r::NonlinearResults) = r.n
+Base.eltype(::Type{NonlinearResults}) = NamedTuple
+Base.iterate(r::NonlinearResults, i::Int=1) = i > r.n ? nothing : (r[i], i + 1)
+
+function Base.getindex(r::NonlinearResults, i::Integer)
+    1 <= i <= r.n || throw(BoundsError(r, i))
+    d, ns = r.data, r.n_sources
+    metrics = Dict{Symbol,Float64}(r.columns[j] => d[i, j] for j in r.n_fixed+1:length(r.columns) if !isnan(d[i, j]))
+    return (freqs = d[i, 1:ns],
+            amps = d[i, ns+1:2ns],
+            performance = d[i, 2ns + 1],
+            performance_metrics = metrics,
+            delta_quantity = get(r.delta_other, i, d[i, 2ns + 3]),
+            converged = d[i, 2ns + 2] != 0,
+            message = r.messages[i])
+end
+
+function Base.show(io::IO, r::NonlinearResults)
+    print(io, "NonlinearResults($(r.n) points, $(length(r.columns) - r.n_fixed) metrics",
+          r.spilled ? ", memory-mapped)" : ")")
+end
+
+"Column `name` of the stored points (a view)."
+result_column(r::NonlinearResults, name::Symbol) = view(r.data, 1:r.n, r.index[name])
+
+"Source frequencies of the stored points (points × sources view)."
+result_frequencies(r::NonlinearResults) = view(r.data, 1:r.n, 1:r.n_sources)
+
+"Source amplitudes of the stored points (points × sources view)."
+result_amplitudes(r::NonlinearResults) = view(r.data, 1:r.n, r.n_sources+1:2r.n_sources)
+
+"True if delta_quantity is a real number for every stored point."
+delta_is_numeric(r::NonlinearResults) = isempty(r.delta_other)
+
+"delta_quantity of the stored points (a view if all of them are real numbers)."
+function result_deltas(r::NonlinearResults)
+    delta_is_numeric(r) && return result_column(r, :delta_quantity)
+    return Any[get(r.delta_other, i, r.data[i, r.n_fixed]) for i in 1:r.n]
+end
+
+"Index of the point with the highest performance."
+best_result_index(r::NonlinearResults) = argmax(result_column(r, :performance))
@@ -5,6 +5,7 @@
 function setup_optimizer()
     global optimizer_config = nothing
     optimizer_config = load_params(joinpath(config.user_inputs_dir, "optimizer_config.json"))
+    LAST_SURROGATE_HYPERPARAMS[] = nothing
 end
 
 
@@ -38,10 +39,15 @@ function _make_sampling_strategy(name::AbstractString)
     end
 end
 
-"Map config string -> surrogate model constructor."
-function _make_surrogate_model(name::AbstractString, initial_points, initial_values, lb, ub)
+"""
+Map config string -> surrogate model constructor.
+`hyperparams` (`(p=..., theta=...)`, Kriging only) reuses the hyperparameters of a previous fit.
+"""
+function _make_surrogate_model(name::AbstractString, initial_points, initial_values, lb, ub; hyperparams=nothing)
     name_l = lowercase(strip(name))
-    if name_l == "kriging"
+    if name_l == "kriging" && hyperparams !== nothing
+        return Kriging(initial_points, initial_values, lb, ub; p=hyperparams.p, theta=hyperparams.theta)
+    elseif name_l == "kriging"
         return Kriging(initial_points, initial_values, lb, ub)
     elseif name_l == "radialbasis" || name_l == "rbf"
         return RadialBasis(initial_points, initial_values, lb, ub)
@@ -54,8 +60,410 @@ function _make_surrogate_model(name::AbstractString, initial_points, initial_val
 end
 
 
+#-------------------------------------BATCH OPTIMIZATION-------------------------------------
+
+# With `batch_size > 1` in optimizer_config.json, each iteration proposes `batch_size` points,
+# evaluates them concurrently (`parallel_evaluations`, default: true when Julia has more than one
+# thread; at most `max_parallel_tasks()` at once, see execution.jl; the user hooks are serialized,
+# see `call_user_hook`) and refits the surrogate once with the whole batch.
+#
+# Points are chosen from a candidate pool with the SRBF merit function (scaled surrogate
+# prediction vs. distance to evaluated points), cycling through the SRBF weights. Each selected
+# point is added to the distance term before selecting the next one (local penalization), so the
+# batch does not collapse onto the same minimum.
+
+const BATCH_MERIT_WEIGHTS = (0.3, 0.5, 0.8, 0.95)
+
+"Select `q` diverse candidates (local penalization of the SRBF merit). Returns indices into `candidates`."
+function _select_batch(surrogate, candidates, evaluated, q::Int, lb, ub)
+    scale = ub .- lb
+    scale[scale .== 0] .= 1.0
+    unit(x) = (collect(Float64, x) .- lb) ./ scale
+
+    C = [unit(c) for c in candidates]
+    E = [unit(x) for x in evaluated]
+
+    preds = [surrogate(c) for c in candidates]
+    pmin, pmax = extrema(preds)
+    s = (preds .- pmin) ./ max(pmax - pmin, eps())
+
+    dmin = [isempty(E) ? Inf : minimum(norm(c .- e) for e in E) for c in C]
+
+    chosen = Int[]
+    for k in 1:min(q, length(candidates))
+        free = [i for i in eachindex(C) if !(i in chosen) && dmin[i] > 1e-8]
+        isempty(free) && break
+
+        dlo, dhi = extrema(dmin[free])
+        w = BATCH_MERIT_WEIGHTS[mod1(k, length(BATCH_MERIT_WEIGHTS))]
+        merit(i) = w * s[i] + (1 - w) * (1 - (dmin[i] - dlo) / max(dhi - dlo, eps()))
+
+        j = argmin(merit, free)
+        push!(chosen, j)
+        for i in eachindex(C)
+            dmin[i] = min(dmin[i], norm(C[i] .- C[j]))
+        end
+    end
+    return chosen
+end
+
+"""
+Evaluate `points` with `cost_with_metrics`, concurrently if `parallel` (see `parallel_map`).
+`point_map` completes an optimizer point into the full device parameter vector (see
+`_full_point_map`). Returns `(values, eval_times_s)`.
+"""
+function _evaluate_batch(points; parallel::Bool, point_map=identity)
+    evaluate(p) = (t0 = time(); (first(cost_with_metrics(point_map(p))), time() - t0))
+    results = parallel_map(evaluate, points; ntasks=parallel ? max_parallel_tasks() : 1)
+    return first.(results), last.(results)
+end
+
+"Batch surrogate optimization loop. Returns `(best_point, best_value)` like `surrogate_optimize!`."
+function _batch_surrogate_optimize!(surrogate, lb, ub, sampler;
+                                    maxiters::Int, batch_size::Int, pool_size::Int, parallel::Bool,
+                                    point_map=identity)
+    total_wall = 0.0
+    total_eval = 0.0
+    n_evals = 0
+
+    for iter in 1:maxiters
+        candidates = Surrogates.sample(pool_size, lb, ub, sampler)
+        idx = _select_batch(surrogate, candidates, surrogate.x, batch_size, lb, ub)
+        isempty(idx) && break
+        batch = candidates[idx]
+
+        t0 = time()
+        values, eval_times = _evaluate_batch(batch; parallel=parallel, point_map=point_map)
+        wall = time() - t0
+
+        # refit once per batch
+        t_fit = @elapsed Surrogates.update!(surrogate, batch, values)
+        @info "Surrogate refit ($(length(surrogate.y)) points): $(round(t_fit, digits=3)) s"
+
+        total_wall += wall
+        total_eval += sum(eval_times)
+        n_evals += length(batch)
+        @info "BO batch $iter/$maxiters: $(length(batch)) points in $(round(wall, digits=2)) s " *
+              "(serial: $(round(sum(eval_times), digits=2)) s), best so far = $(minimum(surrogate.y))"
+    end
+
+    if n_evals > 0
+        speedup = total_eval / max(total_wall, eps())
+        @info "Batch BO: $n_evals evaluations in $(round(total_wall, digits=2)) s wall-clock, " *
+              "$(round(total_eval, digits=2)) s serial-equivalent (speed-up x$(round(speedup, digits=2)))"
+    end
+
+    i_best = argmin(surrogate.y)
+    return surrogate.x[i_best], surrogate.y[i_best]
+end
+
+
+#-------------------------------------LOCAL REFINEMENT-------------------------------------
+
+# Optional derivative-free refinement of the BO optimum (`"local_refinement": true`).
+# Parallel compass search inside the `lb/ub` box: each step evaluates the 2d probes x ± step·e_k
+# concurrently (`parallel_evaluations`), moves to the best improving probe or halves the steps.
+# Stops after `refinement_budget` evaluations or when all steps are below `refinement_min_step`
+# (both steps relative to the parameter ranges). Evaluations are recorded with stage "REFINE".
+
+"""
+    local_refinement(x0, f0, lb, ub; budget, initial_step=0.1, min_step=1e-3, parallel, point_map=identity)
+
+Returns `(x_best, f_best, X_probes, y_probes)`.
+"""
+function local_refinement(x0, f0::Real, lb::Vector{Float64}, ub::Vector{Float64};
+                          budget::Int, initial_step::Real=0.1, min_step::Real=1e-3, parallel::Bool,
+                          point_map=identity)
+    x_best = collect(Float64, x0)
+    f_best = Float64(f0)
+    span = ub .- lb
+    free = findall(>(0), span)
+    step = initial_step .* span
+
+    X_probes = Vector{Vector{Float64}}()
+    y_probes = Float64[]
+
+    isempty(free) && return x_best, f_best, X_probes, y_probes
+
+    ctx = Progress.start!(; N=budget, stage="REFINE")
+    global cost_stage = "REFINE"
+    global cost_progress_ctx = nothing
+    try
+        while length(y_probes) < budget && any(step[free] .>= min_step .* span[free])
+            probes = Vector{Vector{Float64}}()
+            for k in free, sgn in (-1.0, 1.0)
+                x = copy(x_best)
+                x[k] = clamp(x[k] + sgn * step[k], lb[k], ub[k])
+                x != x_best && !(x in X_probes) && push!(probes, x)
+            end
+            probes = probes[1:min(length(probes), budget - length(y_probes))]
+
+            if isempty(probes)
+                step ./= 2
+                continue
+            end
+
+            values, _ = _evaluate_batch(probes; parallel=parallel, point_map=point_map)
+            append!(X_probes, probes)
+            append!(y_probes, values)
+            Progress.tick!(ctx; i=length(y_probes))
+
+            i = argmin(values)
+            if values[i] < f_best
+                x_best, f_best = probes[i], values[i]
+                @info "Refinement: improved metric to $f_best"
+            else
+                step ./= 2
+            end
+        end
+    finally
+        global cost_stage = nothing
+        Progress.finish!(ctx)
+    end
+
+    @info "Refinement: $(length(y_probes)) evaluations, metric $(f0) -> $(f_best)"
+    return x_best, f_best, X_probes, y_probes
+end
+
+
+#-------------------------------------SURROGATE TRAINING SET-------------------------------------
+
+# Kriging costs O(n^3) to fit, so large sweeps are not fed to the surrogate as a whole.
+# Penalty rows (metric >= SURROGATE_PENALTY_THRESHOLD, set by `mask`) and non-finite metrics are
+# always excluded; the rest is capped at `max_surrogate_points` rows according to
+# `surrogate_subset`:
+# - "topk":         the best rows
+# - "trust_region": rows inside a box around the best point (half-width = `trust_region_fraction`
+#                   of the parameter ranges); the optimization is restricted to that box
+# - "random":       a random subset (always including the best row)
+
+const SURROGATE_PENALTY_THRESHOLD = 9e7
+
 """
-    run_optimization(df::DataFrame)
+    _surrogate_training_set(X, y, lb, ub; max_points, mode, trust_region_fraction)
+
+Select the rows of `X`/`y` used to fit the surrogate. Returns `(rows, lb, ub)`.
+"""
+function _surrogate_training_set(X::AbstractMatrix, y::AbstractVector, lb, ub;
+                                 max_points::Int, mode::AbstractString, trust_region_fraction::Real)
+    rows = findall(v -> isfinite(v) && v < SURROGATE_PENALTY_THRESHOLD, y)
+    isempty(rows) && error("All $(length(y)) points of the dataset are penalty or non-finite values: nothing to fit the surrogate on.")
+
+    n_penalty = length(y) - length(rows)
+    n_penalty > 0 && @info "Surrogate: excluded $n_penalty penalty/non-finite points"
+
+    mode = lowercase(strip(mode))
+    best = rows[argmin(y[rows])]
+
+    if mode == "trust_region"
+        half = trust_region_fraction .* (ub .- lb)
+        lb = max.(lb, X[best, :] .- half)
+        ub = min.(ub, X[best, :] .+ half)
+        rows = filter(i -> all(lb .<= X[i, :] .<= ub), rows)
+        @info "Surrogate: trust region around the best point, bounds $lb .. $ub ($(length(rows)) points inside)"
+    elseif !(mode in ("topk", "random"))
+        @warn "Unknown surrogate_subset='$mode'. Falling back to \"topk\"."
+        mode = "topk"
+    end
+
+    if max_points > 0 && length(rows) > max_points
+        if mode == "random"
+            others = shuffle(MersenneTwister(0), setdiff(rows, best))
+            rows = vcat(best, others[1:max_points-1])
+        else
+            rows = rows[partialsortperm(y[rows], 1:max_points)]
+        end
+        @info "Surrogate: capped to $max_points of the dataset points ($mode)"
+    end
+    return rows, lb, ub
+end
+
+
+#-------------------------------------SURROGATE STATE / WARM START-------------------------------------
+
+# At the end of `run_optimization` the surrogate data (all non-penalty dataset rows + BO
+# evaluations) and its hyperparameters are saved to `simulation_info/surrogate_state.h5`,
+# together with the parameter names, `delta_correction` and the hashes of the inputs that define
+# the cost function (SURROGATE_INPUT_FILES).
+#
+# With `"warm_start"` in optimizer_config.json (`true` = all previous runs of the workspace, or a
+# list of run folders), the data of compatible previous runs (same parameter names, input hashes
+# and `delta_correction`) is merged into the dataset before fitting. Only points not already in the
+# dataset (or in a newer run) are merged: compatible runs share the same parameter grid, and
+# duplicate rows make the Kriging correlation matrix singular. Each run saves only its own
+# evaluations, so the points of a run are not stored again by the runs warm-started from it.
+#
+# Within a run, Kriging hyperparameters are reused across nonlinear-correction cycles.
+
+const SURROGATE_STATE_FILE = "surrogate_state.h5"
+const SURROGATE_INPUT_FILES = ("user_circuit.jl", "user_cost_and_performance.jl", "user_parametric_sources.jl",
+                               "drive_physical_quantities.json", "simulation_config.json")
+
+# Hyperparameters of the last fit in this session: (model, param_names, p, theta)
+const LAST_SURROGATE_HYPERPARAMS = Ref{Any}(nothing)
+
+"sha256 of the user inputs that define the cost function (missing files are skipped)."
+function _surrogate_input_hashes(user_inputs_dir::AbstractString)
+    hashes = Dict{String,String}()
+    for f in SURROGATE_INPUT_FILES
+        path = joinpath(user_inputs_dir, f)
+        isfile(path) && (hashes[f] = bytes2hex(open(sha256, path)))
+    end
+    return hashes
+end
+
+"Kriging hyperparameters of `surrogate`, or `nothing` for other models."
+_surrogate_hyperparams(surrogate) =
+    hasproperty(surrogate, :theta) && hasproperty(surrogate, :p) ?
+        (p=collect(Float64, surrogate.p), theta=collect(Float64, surrogate.theta)) : nothing
+
+"Write `simulation_info/surrogate_state.h5` inside `output_path`."
+function save_surrogate_state(output_path::AbstractString, X::AbstractMatrix, y::AbstractVector, param_names;
+                              surrogate, model_name::AbstractString, n_training::Int)
+    siminfo_dir = (basename(normpath(output_path)) == "simulation_info") ? output_path : joinpath(output_path, "simulation_info")
+    mkpath(siminfo_dir)
+
+    path = joinpath(siminfo_dir, SURROGATE_STATE_FILE)
+    tmp = path * ".part"
+    h5open(tmp, "w") do file
+        write(file, "X", Matrix{Float64}(X))
+        write(file, "y", Vector{Float64}(y))
+        write(file, "param_names", String.(param_names))
+
+        attrs = attributes(file)
+        attrs["surrogate_model"] = String(model_name)
+        attrs["n_training"] = n_training
+        attrs["delta_correction"] = Float64(delta_correction)
+        attrs["input_hashes"] = JSON.json(_surrogate_input_hashes(config.user_inputs_dir))
+
+        hp = _surrogate_hyperparams(surrogate)
+        if hp !== nothing
+            write(file, "kriging_p", hp.p)
+            write(file, "kriging_theta", hp.theta)
+        end
+    end
+    mv(tmp, path; force=true)
+    @info "Saved surrogate state ($(length(y)) points) to $path"
+    return path
+end
+
+# Rows closer than this (relative, per coordinate) are the same point
+const WARM_START_SIGDIGITS = 10
+
+_row_key(row) = Tuple(round(Float64(v); sigdigits=WARM_START_SIGDIGITS) for v in row)
+
+"""
+    _new_rows(X, Xw) -> Vector{Int}
+
+Indices of the rows of `Xw` that are not rows of `X` (to `WARM_START_SIGDIGITS` significant
+digits) and not repeated earlier in `Xw`.
+"""
+function _new_rows(X::AbstractMatrix, Xw::AbstractMatrix)
+    seen = Set(_row_key(r) for r in eachrow(X))
+    keep = Int[]
+    for (i, r) in enumerate(eachrow(Xw))
+        k = _row_key(r)
+        k in seen && continue
+        push!(seen, k)
+        push!(keep, i)
+    end
+    return keep
+end
+
+"Run folders to warm-start from, according to the `warm_start` setting (newest first)."
+function _warm_start_runs(setting, current_output)
+    outputs_dir = config.outputs_dir
+    current = isnothing(current_output) ? "" : normpath(current_output)
+
+    runs = if setting === true
+        [joinpath(outputs_dir, f) for f in sort(readdir(outputs_dir); rev=true) if startswith(f, "output_")]
+    elseif setting isa AbstractVector
+        [isabspath(String(r)) ? String(r) : joinpath(outputs_dir, String(r)) for r in setting]
+    else
+        String[]
+    end
+
+    max_runs = Int(get(optimizer_config, :warm_start_max_runs, 10))
+    runs = [r for r in runs if normpath(r) != current && isfile(joinpath(r, "simulation_info", SURROGATE_STATE_FILE))]
+    return runs[1:min(length(runs), max_runs)]
+end
+
+"""
+Load the surrogate data of compatible previous runs, with columns ordered as `param_names`.
+Returns `(X, y, hyperparams)` (hyperparameters of the most recent compatible Kriging run, or `nothing`).
+"""
+function load_warm_start_data(param_names; setting, output_path=nothing)
+    d = length(param_names)
+    X = Matrix{Float64}(undef, 0, d)
+    y = Float64[]
+    hyperparams = nothing
+
+    hashes = _surrogate_input_hashes(config.user_inputs_dir)
+
+    for run in _warm_start_runs(setting, output_path)
+        path = joinpath(run, "simulation_info", SURROGATE_STATE_FILE)
+        try
+            h5open(path, "r") do file
+                names_run = String.(read(file, "param_names"))
+                attrs = attributes(file)
+                hashes_run = JSON.parse(read(attrs["input_hashes"]))
+                delta_run = read(attrs["delta_correction"])
+
+                if Set(names_run) != Set(String.(param_names)) || hashes_run != hashes || delta_run != delta_correction
+                    @info "Warm start: skipping incompatible run $(basename(run))"
+                    return
+                end
+
+                cols = [findfirst(==(String(n)), names_run) for n in param_names]
+                Xr, yr = read(file, "X")[:, cols], read(file, "y")
+                keep = _new_rows(X, Xr)    # runs are newest first: older copies are dropped
+                X = vcat(X, Xr[keep, :])
+                append!(y, yr[keep])
+
+                if hyperparams === nothing && haskey(file, "kriging_theta") && cols == 1:d
+                    hyperparams = (p=read(file, "kriging_p"), theta=read(file, "kriging_theta"))
+                end
+                @info "Warm start: loaded $(length(keep)) points from $(basename(run))" *
+                      (length(keep) < length(yr) ? " ($(length(yr) - length(keep)) duplicates dropped)" : "")
+            end
+        catch err
+            @warn "Warm start: could not read $path: $err"
+        end
+    end
+    return X, y, hyperparams
+end
+
+
+#-------------------------------------DERIVED PARAMETERS-------------------------------------
+
+# Derived (expression) parameters are not optimization variables: the surrogate, its bounds and the
+# warm-start data use the free parameter columns only, and every proposed point is completed with
+# the derived values before it is evaluated, so the evaluation history and the optimum hold the
+# values that were actually simulated.
+
+"Parameter columns varied by the optimizer: `cols` without the derived parameters of `space`."
+optimizer_param_columns(cols, space::AbstractDict) =
+    [c for c in cols if !(get(space, Symbol(c), nothing) isa DerivedParameter)]
+
+"""
+    _full_point_map(param_cols, space) -> function
+
+Map from a point over `param_cols` to the device parameter vector of `space` (order of
+`keys(space)`, derived parameters computed). `identity` if `space` has no derived parameters.
+"""
+function _full_point_map(param_cols, space::AbstractDict)
+    isempty(derived_parameters(space)) && return identity
+    syms = Symbol.(param_cols)
+    names = collect(keys(space))
+    return function (x)
+        params = Dict{Symbol,Any}(syms[j] => Float64(x[j]) for j in eachindex(syms))
+        evaluate_derived_parameters!(params, space)
+        return [Float64(params[k]) for k in names]
+    end
+end
+
+"""
+    run_optimization(df::DataFrame; output_path=nothing)
 
 This function performs optimization of the cost function using surrogate-based optimization. 
 It uses Kriging as the surrogate model and performs the optimization by selecting new points 
@@ -63,7 +471,10 @@ based on previous results and iterating to improve the solution.
 
 # Arguments:
 - `df::DataFrame`: A DataFrame containing the input parameter space and the corresponding metric values. 
-  The last column should contain the metric (objective function value).
+  The parameter columns come first, followed by the `metric` column (objective function value) and
+  optional extra metric columns. Penalty rows (metric >= 9e7) are ignored. Derived parameters
+  are not optimized; they are computed for every point.
+- `output_path`: run folder where `simulation_info/surrogate_state.h5` is written (optional).
 
 # Returns:
 - `optimal_params`: The optimized parameters as a dictionary.
@@ -71,16 +482,21 @@ based on previous results and iterating to improve the solution.
 
 """
 
-function run_optimization(df::DataFrame)
+function run_optimization(df::DataFrame; output_path::Union{Nothing,AbstractString}=nothing)
 
     # Ensure the input DataFrame is not empty
     if isempty(df)
         error("The input DataFrame in the optimizer is empty. Please provide a non-empty DataFrame.")
     end   
     
-    # Determine the number of parameters (dimensions) from the DataFrame
-    param_cols = names(df)[1:end-1]
+    # Parameters are the columns before `metric` (extra user metrics may follow it)
+    metric_col = findfirst(==("metric"), names(df))
+    isnothing(metric_col) && (metric_col = ncol(df))
+    space = isdefined(@__MODULE__, :device_parameters_space) && device_parameters_space isa AbstractDict ?
+            device_parameters_space : Dict{Symbol,Any}()
+    param_cols = optimizer_param_columns(names(df)[1:metric_col-1], space)
     d = length(param_cols)
+    point_map = _full_point_map(param_cols, space)
 
     if d < 2
         error("""
@@ -97,7 +513,7 @@ function run_optimization(df::DataFrame)
     end
 
     # Determine the bounds for the optimization variables from the DataFrame
-    bounds = [(minimum(df[:, col]), maximum(df[:, col])) for col in names(df)[1:end-1]]
+    bounds = [(minimum(df[:, col]), maximum(df[:, col])) for col in param_cols]
 
     println("Bounds: ", bounds)
 
@@ -109,49 +525,97 @@ function run_optimization(df::DataFrame)
     lb = Float64.(lb)  # Ensure bounds are of type Float64
     ub = Float64.(ub)
 
-    # Extract initial points from the DataFrame (all columns except the last one)
-    initial_points = [Tuple(row[1:end-1]) for row in eachrow(df)]
-    
-    global number_initial_points = length(initial_points)
+    X = Matrix{Float64}(df[:, param_cols])
+    y = Float64.(df[:, metric_col])
+
+    global number_initial_points = nrow(df)
     global plot_index = number_initial_points
+    n_own = size(X, 1)    # rows of this run (warm-start rows are appended after them)
+
+    # Warm start: merge the data of compatible previous runs (inside the current bounds)
+    hyperparams = nothing
+    warm_setting = get(optimizer_config, :warm_start, false)
+    if warm_setting !== false
+        Xw, yw, hyperparams = load_warm_start_data(param_cols; setting=warm_setting, output_path=output_path)
+        inside = [all(lb .<= Xw[i, :] .<= ub) for i in eachindex(yw)]
+        new = filter(i -> inside[i], _new_rows(X, Xw))
+        X = vcat(X, Xw[new, :])
+        y = vcat(y, yw[new])
+        @info "Warm start: $(length(new)) previous points merged ($(length(yw) - count(inside)) outside the current bounds, " *
+              "$(count(inside) - length(new)) already in the dataset)"
+    end
 
-    # Extract initial values (the last column of the DataFrame)
-    initial_values = df[:, end]
+    # Reuse the hyperparameters of the previous fit in this session (nonlinear-correction cycles)
+    last_hp = LAST_SURROGATE_HYPERPARAMS[]
+    if hyperparams === nothing && last_hp !== nothing && last_hp.param_names == param_cols
+        hyperparams = (p=last_hp.p, theta=last_hp.theta)
+    end
 
-    #println("initial_points: ", initial_points)
-    #println("initial_values: ", initial_values)
+    # Training set: no penalty rows, capped size (see `_surrogate_training_set`)
+    rows, lb, ub = _surrogate_training_set(X, y, lb, ub;
+        max_points = Int(get(optimizer_config, :max_surrogate_points, 2000)),
+        mode = string(get(optimizer_config, :surrogate_subset, "topk")),
+        trust_region_fraction = Float64(get(optimizer_config, :trust_region_fraction, 0.25))
+    )
 
-    # Initialize a Kriging model (surrogate model) using the initial points and values
-    # my_k_SRBFN = Kriging(initial_points, initial_values, lb, ub)
+    # Initial points/values for the surrogate (tuples, as expected by Surrogates)
+    initial_points = [Tuple(X[i, :]) for i in rows]
+    initial_values = y[rows]
 
     # Retrieve optimization parameters such as the maximum number of iterations and the number of new samples per iteration
     n_maxiters = optimizer_config[:max_optimizer_iterations]
     n_num_new_samples = optimizer_config[:new_samples_per_optimizer_iteration]    
 
     sur_name  = string(get(optimizer_config, :surrogate_model, "Kriging"))
-    surrogate = _make_surrogate_model(sur_name, initial_points, initial_values, lb, ub)
+    t_fit = @elapsed surrogate = _make_surrogate_model(sur_name, initial_points, initial_values, lb, ub;
+                                                       hyperparams=hyperparams)
+    @info "Surrogate ($sur_name) fitted on $(length(rows)) of $(nrow(df)) points in $(round(t_fit, digits=3)) s"
     opt_name  = string(get(optimizer_config, :optimizer_strategy, "SRBF"))
     strategy  = _make_optimizer_strategy(opt_name)
     samp_name = string(get(optimizer_config, :sampling_strategy, "RandomSample"))
     sampler   = _make_sampling_strategy(samp_name)
 
-    # Used by `cost(vec)` to distinguish between the initial dataset and BO evaluations
-    global number_initial_points = length(initial_points)
-
-    # Progress lines for the GUI: BO evaluations only
-    global cost_progress_ctx = Progress.start!(; N=n_maxiters*n_num_new_samples, stage="BO")
-
-    # Perform surrogate optimization using the surrogate optimizer function
-    result = surrogate_optimize!(
-        cost,              # The cost function to optimize
-        strategy,            # The surrogate model type (SRBF)
-        lb,                # Lower bounds
-        ub,                # Upper bounds
-        surrogate,        # The surrogate model instance
-        sampler,        # Sampling strategy (random sampling)
-        maxiters = n_maxiters,                  # Maximum number of iterations
-        num_new_samples = n_num_new_samples     # Number of new points to generate for each iteration
-    )
+    # Batch mode: `batch_size` points per iteration, evaluated concurrently
+    batch_size = max(Int(get(optimizer_config, :batch_size, 1)), 1)
+    parallel   = Bool(get(optimizer_config, :parallel_evaluations, Threads.nthreads() > 1))
+
+    if batch_size > 1
+        @info "Batch optimization: batch_size=$batch_size, parallel_evaluations=$parallel, threads=$(Threads.nthreads())"
+        global cost_progress_ctx = Progress.start!(; N=n_maxiters*batch_size, stage="BO")
+
+        result = _batch_surrogate_optimize!(surrogate, lb, ub, sampler;
+            maxiters = n_maxiters,
+            batch_size = batch_size,
+            pool_size = max(n_num_new_samples, 100) * batch_size,
+            parallel = parallel,
+            point_map = point_map
+        )
+    else
+        # Progress lines for the GUI: BO evaluations only
+        global cost_progress_ctx = Progress.start!(; N=n_maxiters*n_num_new_samples, stage="BO")
+
+        # Time spent by surrogate_optimize! between two evaluations (surrogate update + acquisition)
+        last_eval_end = Ref{Float64}(NaN)
+        function timed_cost(x)
+            isnan(last_eval_end[]) ||
+                @info "Surrogate update + acquisition: $(round(time() - last_eval_end[], digits=3)) s"
+            val = cost(point_map(x))
+            last_eval_end[] = time()
+            return val
+        end
+
+        # Perform surrogate optimization using the surrogate optimizer function
+        result = surrogate_optimize!(
+            timed_cost,        # The cost function to optimize
+            strategy,            # The surrogate model type (SRBF)
+            lb,                # Lower bounds
+            ub,                # Upper bounds
+            surrogate,        # The surrogate model instance
+            sampler,        # Sampling strategy (random sampling)
+            maxiters = n_maxiters,                  # Maximum number of iterations
+            num_new_samples = n_num_new_samples     # Number of new points to generate for each iteration
+        )
+    end
 
     # Close progress context (best-effort)
     try
@@ -159,16 +623,47 @@ function run_optimization(df::DataFrame)
     catch
     end
 
+    # Optional local refinement of the BO optimum (same lb/ub box)
+    X_ref, y_ref = Vector{Vector{Float64}}(), Float64[]
+    if Bool(get(optimizer_config, :local_refinement, false))
+        x_ref, f_ref, X_ref, y_ref = local_refinement(result[1], result[2], lb, ub;
+            budget = Int(get(optimizer_config, :refinement_budget, 10 * d)),
+            initial_step = Float64(get(optimizer_config, :refinement_initial_step, 0.1)),
+            min_step = Float64(get(optimizer_config, :refinement_min_step, 1e-3)),
+            parallel = parallel,
+            point_map = point_map
+        )
+        result = (Tuple(x_ref), f_ref)
+    end
+
+    # Persist the surrogate data of this run (non-penalty dataset points + BO/refinement evaluations,
+    # not the warm-start rows, which stay in their own runs) and the hyperparameters
+    hp = _surrogate_hyperparams(surrogate)
+    hp === nothing || (LAST_SURROGATE_HYPERPARAMS[] = (param_names=param_cols, p=hp.p, theta=hp.theta))
+    if output_path !== nothing
+        try
+            new_points = surrogate.x[length(initial_points)+1:end]
+            X_all = vcat(X[1:n_own, :], [p[j] for p in new_points, j in 1:d], [p[j] for p in X_ref, j in 1:d])
+            y_all = vcat(y[1:n_own], surrogate.y[length(initial_points)+1:end], y_ref)
+            pool = findall(v -> isfinite(v) && v < SURROGATE_PENALTY_THRESHOLD, y_all)
+            X_all, y_all = X_all[pool, :], y_all[pool]
+            save_surrogate_state(output_path, X_all, y_all, param_cols;
+                                 surrogate=surrogate, model_name=sur_name, n_training=length(initial_points))
+        catch err
+            @warn "Could not save surrogate state: $err"
+        end
+    end
+
     # Extract the optimized vector and its corresponding metric
     optimal_vec = result[1]                # Optimized vector
     optimal_metric = result[2]             # Optimal metric value
 
-    # Extract column names (excluding the last column) and convert them to symbols
-    column_names = names(df)[1:end-1]  
-    column_symbols = Symbol.(column_names)  # Convert to Vector{Symbol}
+    # Parameter column names as symbols
+    column_symbols = Symbol.(param_cols)  # Convert to Vector{Symbol}
     
-    # Convert the optimized vector to a dictionary of parameters
+    # Convert the optimized vector to a dictionary of parameters (derived ones computed from it)
     optimal_params = vector_to_param(optimal_vec, column_symbols)
+    evaluate_derived_parameters!(optimal_params, space)
 
     #!! To add the value for the dynamical correction of the metric !! (e.g., if you have a dynamic correction here)
 
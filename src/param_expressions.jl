@@ -0,0 +1,207 @@
+#-------------------------------------PARAMETER EXPRESSIONS-------------------------------------------
+
+# A parameter of a JSON input file can be defined from the other parameters of the same file:
+#   "Cc": {"expr": "Lj / 1e4"}
+#   "source_2_frequency": {"expr": "2 * source_1_frequency - 1e9", "tag": true}
+# An expression may use numbers, the names of the other parameters of the file, the constants
+# of PARAM_EXPR_CONSTANTS and the functions of PARAM_EXPR_FUNCTIONS, nothing else: it is compiled
+# once into a tree of closures (no `eval`, nothing is defined in the package module). Calls are
+# broadcast, so an expression can be evaluated over whole columns of points at once.
+# Expressions may reference other expressions; they are evaluated in dependency order. A tagged
+# expression is not replaced by an optimal value in the correction cycles: it is recomputed from
+# the optimal values of its inputs.
+#
+# An expression over swept parameters is not a sweep of its own: in a parameter space it is a
+# `DerivedParameter`, which lists the values it takes over the grid of those parameters, and
+# `generate_all_initial_points` builds the grid over the free parameters only, then fills the
+# derived columns point by point (`evaluate_derived_parameters!`).
+
+const PARAM_EXPR_FUNCTIONS = Dict{Symbol,Function}(
+    :+ => +, :- => -, :* => *, :/ => /, :^ => ^,
+    :abs => abs, :sqrt => sqrt, :cbrt => cbrt, :exp => exp,
+    :log => log, :log10 => log10, :log2 => log2,
+    :sin => sin, :cos => cos, :tan => tan, :asin => asin, :acos => acos, :atan => atan,
+    :sinh => sinh, :cosh => cosh, :tanh => tanh, :hypot => hypot,
+    :min => min, :max => max, :round => round, :floor => floor, :ceil => ceil,
+    :mod => mod, :rem => rem,
+)
+
+const PARAM_EXPR_CONSTANTS = Dict{Symbol,Float64}(:pi => π, :π => π, :Inf => Inf)
+
+struct ParamExpression
+    source::String
+    deps::Vector{Symbol}    # parameters referenced by the expression
+    f::Function             # params::AbstractDict{Symbol} -> value
+end
+
+"""
+    compile_param_expression(source, declared) -> ParamExpression
+
+Compile the expression `source`, which may reference the parameter names in `declared`.
+Throws an error for unknown names, functions outside `PARAM_EXPR_FUNCTIONS` and any other syntax.
+"""
+function compile_param_expression(source::AbstractString, declared)
+    ex = try
+        Meta.parse(source)
+    catch err
+        error("Invalid expression \"$source\": $(sprint(showerror, err))")
+    end
+    deps = Symbol[]
+    f = _compile_param_ast(ex, declared, deps, source)
+    return ParamExpression(String(source), unique!(deps), f)
+end
+
+function _compile_param_ast(ex, declared, deps::Vector{Symbol}, source::AbstractString)
+    if ex isa Real
+        return _ -> ex
+    elseif ex isa Symbol
+        if ex in declared
+            push!(deps, ex)
+            return params -> params[ex]
+        elseif haskey(PARAM_EXPR_CONSTANTS, ex)
+            x = PARAM_EXPR_CONSTANTS[ex]
+            return _ -> x
+        end
+        error("Unknown name '$ex' in expression \"$source\" (allowed: the parameters of the file, " *
+              "$(join(sort!(String.(collect(keys(PARAM_EXPR_CONSTANTS)))), ", ")))")
+    end
+
+    if ex isa Expr && ex.head === :call && ex.args[1] isa Symbol
+        fname, args = ex.args[1], ex.args[2:end]
+    elseif ex isa Expr && ex.head === :. && length(ex.args) == 2 && ex.args[1] isa Symbol &&
+           ex.args[2] isa Expr && ex.args[2].head === :tuple
+        fname, args = ex.args[1], ex.args[2].args      # f.(x)
+    else
+        error("Unsupported syntax in expression \"$source\": $ex")
+    end
+
+    fn = get(PARAM_EXPR_FUNCTIONS, Symbol(lstrip(String(fname), '.')), nothing)    # .+ as +
+    fn === nothing && error("Function '$fname' is not allowed in expression \"$source\"")
+    compiled = [_compile_param_ast(a, declared, deps, source) for a in args]
+    return params -> broadcast(fn, (c(params) for c in compiled)...)
+end
+
+"Order the expression parameters so that each one comes after the expressions it references."
+function param_expression_order(exprs::AbstractDict{Symbol,ParamExpression})
+    order = Symbol[]
+    state = Dict{Symbol,Symbol}()    # :visiting / :done
+    path = Symbol[]
+
+    function visit(k)
+        s = get(state, k, nothing)
+        s === :done && return
+        if s === :visiting
+            cycle = [path[findfirst(==(k), path):end]; k]
+            error("Circular definition between parameter expressions: $(join(cycle, " -> "))")
+        end
+        state[k] = :visiting
+        push!(path, k)
+        for d in exprs[k].deps
+            haskey(exprs, d) && visit(d)
+        end
+        pop!(path)
+        state[k] = :done
+        push!(order, k)
+    end
+
+    foreach(visit, sort!(collect(keys(exprs))))
+    return order
+end
+
+"""
+    evaluate_param_expressions!(params, exprs, order; skip=())
+
+Evaluate the expressions `exprs` in `order` (see `param_expression_order`) over the values of
+`params` and store the results in `params`. The parameters in `skip` keep their value.
+"""
+function evaluate_param_expressions!(params::AbstractDict{Symbol}, exprs::AbstractDict{Symbol,ParamExpression},
+                                     order::AbstractVector{Symbol}; skip=())
+    for k in order
+        k in skip && continue
+        e = exprs[k]
+        value = try
+            e.f(params)
+        catch err
+            error("Could not evaluate parameter '$k' = \"$(e.source)\": $(sprint(showerror, err))")
+        end
+        params[k] = value isa AbstractArray ? vec(collect(value)) : value
+    end
+    return params
+end
+
+"""
+    DerivedParameter(expr, values)
+
+Expression parameter of a parameter space whose value depends on swept parameters. It behaves as
+the vector of the distinct `values` it takes over their grid (bounds, middle value, JSON), but it
+is not a dimension of the grid: its value is computed for each point.
+"""
+struct DerivedParameter <: AbstractVector{Float64}
+    expr::ParamExpression
+    values::Vector{Float64}
+end
+
+Base.size(d::DerivedParameter) = size(d.values)
+Base.getindex(d::DerivedParameter, i::Int) = d.values[i]
+
+_is_swept(v) = (v isa AbstractVector || v isa Tuple) && length(v) > 1
+
+# Parameters referenced by expression `k`, directly or through the other expressions of `exprs`.
+function _expression_dependencies(k::Symbol, exprs::AbstractDict{Symbol,ParamExpression})
+    seen = Set{Symbol}()
+    stack = copy(exprs[k].deps)
+    while !isempty(stack)
+        d = pop!(stack)
+        d in seen && continue
+        push!(seen, d)
+        haskey(exprs, d) && append!(stack, exprs[d].deps)
+    end
+    return seen
+end
+
+"""
+    evaluate_param_space_expressions!(params, exprs, order; skip=())
+
+Evaluate the expressions of a parameter space. An expression that depends only on single-valued
+parameters gets its value; one that depends on swept parameters is evaluated over the grid of
+those parameters and stored as a `DerivedParameter`. The parameters in `skip` keep their value.
+"""
+function evaluate_param_space_expressions!(params::AbstractDict{Symbol}, exprs::AbstractDict{Symbol,ParamExpression},
+                                           order::AbstractVector{Symbol}; skip=())
+    active = Dict{Symbol,ParamExpression}(k => e for (k, e) in exprs if !(k in skip))
+    for k in order
+        haskey(active, k) || continue
+        deps = _expression_dependencies(k, active)
+        free = [d for d in deps if !haskey(active, d)]
+        swept = sort!([d for d in free if _is_swept(params[d])])
+        if isempty(swept)
+            evaluate_param_expressions!(params, active, [k])
+            continue
+        end
+
+        grid = Dict{Symbol,Any}(d => params[d] for d in free)
+        combos = vec(collect(Iterators.product((params[d] for d in swept)...)))
+        for (j, d) in enumerate(swept)
+            grid[d] = [c[j] for c in combos]
+        end
+        evaluate_param_expressions!(grid, active, [o for o in order if o == k || (o in deps && haskey(active, o))])
+        params[k] = DerivedParameter(active[k], unique(Float64.(grid[k])))
+    end
+    return params
+end
+
+"The expressions of the `DerivedParameter`s of `space`."
+derived_parameters(space::AbstractDict) =
+    Dict{Symbol,ParamExpression}(k => v.expr for (k, v) in space if v isa DerivedParameter)
+
+"""
+    evaluate_derived_parameters!(params, space)
+
+Compute the `DerivedParameter`s of `space` from the other values of `params`: one point (scalar
+values) or, in bulk, columns of points of the same length.
+"""
+function evaluate_derived_parameters!(params::AbstractDict{Symbol}, space::AbstractDict)
+    exprs = derived_parameters(space)
+    isempty(exprs) && return params
+    return evaluate_param_expressions!(params, exprs, param_expression_order(exprs))
+end
@@ -0,0 +1,359 @@
+#-------------------------------------RUN PLANNER-------------------------------------------
+
+# Pre-flight estimate of a run (`plan_run`): how many points each stage will evaluate, how long
+# one evaluation takes (one calibration evaluation per stage, timed after a warm-up so that the
+# JIT compilation is excluded), the predicted wall time for the available threads / watchdog
+# workers and the peak memory. Nothing is written to the run folders; the plan is saved in
+# `outputs/run_plan.json`.
+#
+# Optional keys of `simulation_config.json`:
+#   plan_budget_hours      (24; a warning is logged if the predicted wall time exceeds it)
+#   plan_memory_budget_mb  (0 = 80 % of the physical memory)
+#
+# The point counts follow the entry points exactly (deduplicated parameter grid, optimizer
+# iterations, HB frequency x amplitude sweep, nonlinear correction cycles, yield realizations).
+# Timings are those of a middle point of the parameter space at the largest HB amplitudes, so
+# they are indicative: adaptive harmonics, non-converging points and the surrogate fits of the
+# optimizer are not included.
+
+const RUN_PLAN_FILE = "run_plan.json"
+const PLAN_STAGES = Dict(
+    "run"                          => ("LIN", "BO", "HB"),
+    "run_sweep_only"               => ("LIN",),
+    "run_from_latest_dataset_only" => ("BO", "HB"),
+    "run_optimization_only"        => ("BO",),
+    "run_nonlinear_only"           => ("HB",),
+    "run_yield_analysis"           => ("YIELD",),
+)
+
+_n_distinct(v) = (v isa AbstractVector || v isa Tuple) ? length(unique(v)) : 1
+
+"Number of points of the linear sweep (`generate_all_initial_points` removes duplicates)."
+plan_linear_points(device_parameters_space::Dict) =
+    prod(_n_distinct(v) for v in values(device_parameters_space) if !(v isa DerivedParameter); init=1)
+
+"Middle value of every parameter of the space (calibration point)."
+function plan_middle_params(device_parameters_space::Dict)
+    params = Dict{Symbol,Any}()
+    for (k, v) in device_parameters_space
+        if v isa DerivedParameter
+            continue    # computed from the other middle values below
+        elseif v isa AbstractVector || v isa Tuple
+            vals = unique(v)
+            vals = all(x -> x isa Real, vals) ? sort(vals) : vals
+            params[k] = vals[cld(length(vals), 2)]
+        else
+            params[k] = v
+        end
+    end
+    return evaluate_derived_parameters!(params, device_parameters_space)
+end
+
+"Number of cost evaluations of `run_optimization` (batch or serial loop, optional refinement)."
+function plan_optimizer_points(n_params::Integer)
+    n_maxiters = Int(optimizer_config[:max_optimizer_iterations])
+    n_num_new_samples = Int(optimizer_config[:new_samples_per_optimizer_iteration])
+    batch_size = max(Int(get(optimizer_config, :batch_size, 1)), 1)
+
+    n = n_maxiters * (batch_size > 1 ? batch_size : n_num_new_samples)
+    if Bool(get(optimizer_config, :local_refinement, false))
+        n += Int(get(optimizer_config, :refinement_budget, 10 * n_params))
+    end
+    return n
+end
+
+"Source amplitude sweep keys and number of values per source (as `run_nonlinear_simulations_sweep`)."
+function _plan_amplitude_sweep()
+    n_sources = _num_sources_from_keys(sim_vars)
+    amp_keys = [Symbol("source_$(i)_non_linear_amplitude") for i in 1:n_sources]
+    amp_values = [isa(sim_vars[key], String) ? nothing : normalize_sweep_values(sim_vars[key]; name=String(key))
+                  for key in amp_keys]
+    return n_sources, amp_keys, amp_values
+end
+
+"Number of points of the nonlinear (HB) sweep: source frequencies x source amplitudes."
+function plan_nonlinear_points()
+    n_sources, _, amp_values = _plan_amplitude_sweep()
+    n_freq = prod(length(sim_vars[:source_frequency_specs][i]) for i in 1:n_sources; init=1)
+    n_amp = prod((v === nothing ? 1 : length(v)) for v in amp_values; init=1)
+    return n_freq * n_amp
+end
+
+"Number of evaluations that can run at the same time with `batch_size` and `parallel`."
+function plan_concurrency(batch_size::Integer, parallel::Bool)
+    (parallel && batch_size > 1) || return 1
+    c = min(batch_size, max_parallel_tasks())
+    watchdog_enabled() && (c = min(c, WATCHDOG_SETTINGS[].n_workers))
+    return max(c, 1)
+end
+
+#---- calibration ----
+
+"""
+    plan_calibrate(params) -> Dict
+
+Time one linear evaluation (`evaluate_linear_point`) and one HB point (`nonlinear_simulation` at
+the largest amplitudes + linear simulation + `user_performance`) of `params`. Each evaluation is
+run once before being timed (warm JIT; the HB warm-up uses a single harmonic). Failures are
+reported in the returned Dict instead of being thrown.
+"""
+function plan_calibrate(params::Dict; nonlinear::Bool=true)
+    out = Dict{String,Any}()
+
+    global number_initial_points = 1
+    global point_exluded = 0
+    global plot_index = 0
+
+    circuit = nothing
+    try
+        evaluate_linear_point(params, delta_correction)
+        out["LIN"] = @elapsed evaluate_linear_point(params, delta_correction)
+        circuit = create_circuit(params)
+    catch e
+        e isa InterruptException && rethrow()
+        out["LIN_error"] = sprint(showerror, e)
+        return out
+    end
+
+    nonlinear || return out
+    try
+        n_sources, amp_keys, amp_values = _plan_amplitude_sweep()
+        resolved_functions = Dict{Int,Function}(
+            i => eval(Symbol(sim_vars[amp_keys[i]])) for i in 1:n_sources if isa(sim_vars[amp_keys[i]], String))
+        amp_idx = ntuple(i -> amp_values[i] === nothing ? 1 : argmax(abs.(amp_values[i])), n_sources)
+        amps = create_nonlinear_amplitudes(n_sources, amp_keys, amp_idx, params, resolved_functions)
+        freqs = Float64[sim_vars[:source_frequency_specs][i][1] for i in 1:n_sources]
+        local_sim_vars = sim_vars_with_frequencies(sim_vars, freqs)
+
+        n_pumps = length(local_sim_vars[:wp])
+        nonlinear_simulation(circuit, amps, _with_harmonics(local_sim_vars, (ntuple(_ -> 1, n_pumps), ntuple(_ -> 1, n_pumps))))
+
+        t_hb = @elapsed begin
+            nl = nonlinear_simulation(circuit, amps, local_sim_vars)
+            nl.sol === nothing || performance(nl.sol, params, amps, freqs)
+        end
+        out["HB_converged"] = nl.converged
+        out["HB"] = t_hb + @elapsed linear_simulation(params, circuit, local_sim_vars)
+    catch e
+        e isa InterruptException && rethrow()
+        out["HB_error"] = sprint(showerror, e)
+    end
+    return out
+end
+
+#---- memory ----
+
+"Number of circuit nodes (ground excluded) and elements of `circuit`."
+function _plan_circuit_size(circuit)
+    nodes = Set{String}()
+    for el in circuit.CircuitStruct
+        push!(nodes, string(el[2]), string(el[3]))
+    end
+    delete!(nodes, "0")
+    return length(nodes), length(circuit.CircuitStruct)
+end
+
+_plan_modes(harmonics) = prod(2 .* collect(harmonics) .+ 1; init=1)
+
+"""
+    plan_solve_memory_mb(circuit; nonlinear) -> Float64
+
+Order-of-magnitude memory of one `hbsolve` of `circuit`: the returned S-parameter, noise and
+quantum-efficiency matrices (frequency points x (ports x signal modes)^2) plus the sparse
+linearized and pump systems (elements x modes^2, with fill-in). It grows with the square of the
+modulation harmonics and of the port count.
+"""
+function plan_solve_memory_mb(circuit; nonlinear::Bool)
+    n_nodes, n_elements = _plan_circuit_size(circuit)
+    n_w = length(sim_vars[:w_range])
+    modulation = sim_vars[nonlinear ? :nonlinear_modulation_harmonics : :linear_modulation_harmonics]
+    strong = sim_vars[nonlinear ? :nonlinear_strong_tone_harmonics : :linear_strong_tone_harmonics]
+    modes = _plan_modes(modulation)
+    pump_modes = _plan_modes(strong)
+
+    fill_in = 5
+    results = 64.0 * n_w * (circuit.PortNumber * modes)^2
+    linearized = 16.0 * fill_in * (n_elements + n_nodes) * modes^2 * max(Threads.nthreads(), 1)
+    pump = 16.0 * fill_in * (n_elements + n_nodes) * pump_modes^2
+    return (results + linearized + pump) / 2^20
+end
+
+#---- plan ----
+
+function _plan_stage(stage, points, seconds_per_point, concurrency; cycle=0)
+    wall = seconds_per_point === nothing ? nothing : points * seconds_per_point / concurrency
+    return Dict{String,Any}(
+        "stage" => stage,
+        "cycle" => cycle,
+        "points" => points,
+        "seconds_per_point" => seconds_per_point,
+        "concurrency" => concurrency,
+        "wall_time_s" => wall,
+    )
+end
+
+"""
+    build_run_plan(entry_point, device_parameters_space; calibrate=true) -> Dict
+
+Stages, point counts, calibrated timings and memory estimate of `entry_point` for the current
+configuration (see the header of this file).
+"""
+function build_run_plan(entry_point::AbstractString, device_parameters_space::Dict; calibrate::Bool=true)
+    haskey(PLAN_STAGES, entry_point) || error("Unknown entry point '$entry_point' (expected one of $(join(sort!(collect(keys(PLAN_STAGES))), ", ")))")
+    stages = PLAN_STAGES[entry_point]
+    warnings = String[]
+
+    params = plan_middle_params(device_parameters_space)
+    n_params = length(device_parameters_space)
+    single_point = entry_point == "run" && is_single_point_parameter_space(device_parameters_space)
+
+    ycfg = "YIELD" in stages ? load_yield_config(joinpath(config.user_inputs_dir, "yield_config.json")) : nothing
+    needs_hb = "HB" in stages || (ycfg !== nothing && ycfg.nonlinear)
+
+    # Calibration (in a scratch folder: user hooks may save plots)
+    calibration = Dict{String,Any}()
+    if calibrate
+        saved_paths = (plot_path, corr_path)
+        scratch = mktempdir()
+        try
+            global plot_path = scratch
+            global corr_path = scratch
+            @info "Calibrating: one linear$(needs_hb ? " and one HB" : "") evaluation at the middle of the parameter space..."
+            calibration = plan_calibrate(params; nonlinear=needs_hb)
+        finally
+            flush_plot_renderer()
+            global plot_path = saved_paths[1]
+            global corr_path = saved_paths[2]
+            rm(scratch; force=true, recursive=true)
+        end
+        for key in ("LIN_error", "HB_error")
+            haskey(calibration, key) && push!(warnings, "Calibration failed ($(first(split(key, '_')))): $(calibration[key])")
+        end
+        get(calibration, "HB_converged", true) || push!(warnings, "The calibration HB point did not converge; its time may not be representative.")
+    end
+    t_lin = get(calibration, "LIN", nothing)
+    t_hb = get(calibration, "HB", nothing)
+    sim_vars[:adaptive_harmonics] && needs_hb &&
+        push!(warnings, "adaptive_harmonics is enabled: the HB time is that of the configured (maximum) harmonics.")
+    watchdog_enabled() && push!(warnings, "The watchdog is enabled: worker start-up and transfer times are not included.")
+
+    batch_size = max(Int(get(optimizer_config, :batch_size, 1)), 1)
+    bo_parallel = Bool(get(optimizer_config, :parallel_evaluations, Threads.nthreads() > 1))
+    bo_concurrency = plan_concurrency(batch_size, bo_parallel)
+
+    plan_stages = Dict{String,Any}[]
+    if single_point
+        push!(plan_stages, _plan_stage("LIN", 1, t_lin, 1))
+        push!(plan_stages, _plan_stage("HB", plan_nonlinear_points(), t_hb, 1))
+    else
+        n_lin = plan_linear_points(device_parameters_space)
+        for stage in stages
+            if stage == "LIN"
+                push!(plan_stages, _plan_stage("LIN", n_lin, t_lin, 1))
+            elseif stage == "BO"
+                push!(plan_stages, _plan_stage("BO", plan_optimizer_points(n_params), t_lin, bo_concurrency))
+            elseif stage == "HB"
+                push!(plan_stages, _plan_stage("HB", plan_nonlinear_points(), t_hb, 1))
+            elseif stage == "YIELD"
+                push!(plan_stages, _plan_stage("YIELD", ycfg.n_realizations, ycfg.nonlinear ? t_hb : t_lin,
+                                               plan_concurrency(ycfg.batch_size, ycfg.parallel)))
+            end
+        end
+
+        # Nonlinear correction cycles of the full run: correction point + LIN (tagged parameters
+        # fixed) + BO + HB per cycle
+        n_cycles = entry_point == "run" ? Int(sim_vars[:n_iterations_nonlinear_correction]) : 0
+        if n_cycles > 0
+            cycle_space = load_params(joinpath(config.user_inputs_dir, "device_parameters_space.json"); optimal=params)
+            for i in 1:n_cycles
+                push!(plan_stages, _plan_stage("NL_CORRECTION", 1, t_hb, 1; cycle=i))
+                push!(plan_stages, _plan_stage("LIN", plan_linear_points(cycle_space), t_lin, 1; cycle=i))
+                push!(plan_stages, _plan_stage("BO", plan_optimizer_points(n_params), t_lin, bo_concurrency; cycle=i))
+                push!(plan_stages, _plan_stage("HB", plan_nonlinear_points(), t_hb, 1; cycle=i))
+            end
+        end
+    end
+
+    total_points = sum(s["points"] for s in plan_stages; init=0)
+    timed = [s["wall_time_s"] for s in plan_stages if s["wall_time_s"] !== nothing]
+    wall_time_s = length(timed) == length(plan_stages) ? sum(timed; init=0.0) : nothing
+
+    # Memory: resident memory after the calibration + one extra solve per concurrent evaluation
+    circuit = create_circuit(params)
+    solve_lin_mb = plan_solve_memory_mb(circuit; nonlinear=false)
+    solve_hb_mb = needs_hb ? plan_solve_memory_mb(circuit; nonlinear=true) : 0.0
+    base_rss_mb = Sys.maxrss() / 2^20
+    max_concurrency = maximum(s["concurrency"] for s in plan_stages; init=1)
+    peak_mb = base_rss_mb + (max_concurrency - 1) * max(solve_lin_mb, solve_hb_mb)
+    watchdog_enabled() && (peak_mb += WATCHDOG_SETTINGS[].n_workers * (base_rss_mb + max(solve_lin_mb, solve_hb_mb)))
+
+    n_ports = circuit.PortNumber
+    n_nodes, _ = _plan_circuit_size(circuit)
+
+    return Dict{String,Any}(
+        "entry_point" => entry_point,
+        "single_point" => single_point,
+        "stages" => plan_stages,
+        "total_points" => total_points,
+        "wall_time_s" => wall_time_s,
+        "wall_time" => wall_time_s === nothing ? nothing : format_duration(wall_time_s),
+        "calibration" => calibration,
+        "threads" => Threads.nthreads(),
+        "watchdog_workers" => watchdog_enabled() ? WATCHDOG_SETTINGS[].n_workers : 0,
+        "circuit" => Dict("ports" => n_ports, "nodes" => n_nodes,
+                          "frequency_points" => length(sim_vars[:w_range])),
+        "memory_mb" => Dict(
+            "base_rss" => base_rss_mb,
+            "per_solve_linear" => solve_lin_mb,
+            "per_solve_nonlinear" => solve_hb_mb,
+            "peak" => peak_mb,
+        ),
+        "warnings" => warnings,
+    )
+end
+
+"""
+    check_run_plan_budget!(plan; budget_hours, memory_budget_mb)
+
+Compare `plan` with the time and memory budgets, store the result in it and log a warning for
+each exceeded budget.
+"""
+function check_run_plan_budget!(plan::Dict; budget_hours::Real, memory_budget_mb::Real)
+    wall = plan["wall_time_s"]
+    peak = plan["memory_mb"]["peak"]
+    plan["budget"] = Dict("hours" => budget_hours, "memory_mb" => memory_budget_mb)
+    plan["over_time_budget"] = wall !== nothing && wall > 3600 * budget_hours
+    plan["over_memory_budget"] = peak > memory_budget_mb
+
+    if plan["over_time_budget"]
+        msg = "Predicted wall time $(plan["wall_time"]) exceeds the budget of $(budget_hours) h."
+        push!(plan["warnings"], msg)
+        @warn msg
+    end
+    if plan["over_memory_budget"]
+        msg = "Predicted peak memory $(round(Int, peak)) MB exceeds the budget of $(round(Int, memory_budget_mb)) MB."
+        push!(plan["warnings"], msg)
+        @warn msg
+    end
+    return plan
+end
+
+"Print the plan as a table."
+function print_run_plan(io::IO, plan::Dict)
+    fmt(x) = x === nothing ? "?" : (x isa AbstractFloat ? string(round(x, sigdigits=3)) : string(x))
+    println(io, "-----------------------------------------------------")
+    println(io, "Run plan: ", plan["entry_point"], plan["single_point"] ? " (single point)" : "",
+            " | threads: ", plan["threads"], " | watchdog workers: ", plan["watchdog_workers"])
+    println(io, rpad("stage", 16), lpad("points", 10), lpad("s/point", 12), lpad("parallel", 10), lpad("wall time", 18))
+    for s in plan["stages"]
+        name = s["cycle"] == 0 ? s["stage"] : "$(s["stage"]) #$(s["cycle"])"
+        wall = s["wall_time_s"] === nothing ? "?" : format_duration(s["wall_time_s"])
+        println(io, rpad(name, 16), lpad(string(s["points"]), 10), lpad(fmt(s["seconds_per_point"]), 12),
+                lpad(string(s["concurrency"]), 10), lpad(wall, 18))
+    end
+    println(io, "Total: ", plan["total_points"], " points, ", something(plan["wall_time"], "unknown (no calibration)"))
+    m = plan["memory_mb"]
+    println(io, "Memory: peak ≈ ", round(Int, m["peak"]), " MB (resident ", round(Int, m["base_rss"]),
+            " MB, per solve ≈ ", fmt(max(m["per_solve_linear"], m["per_solve_nonlinear"])), " MB)")
+    println(io, "-----------------------------------------------------")
+end
@@ -0,0 +1,243 @@
+#-------------------------------------PLOT RENDERER-------------------------------------------
+
+# `plot_update` and `correlation_update` are called from inside the user hooks on every
+# evaluation. The figure is rendered to PNG bytes in the calling task (GR is not thread-safe and
+# GLMakie must render on the thread owning its GL context); writing the file and its sidecar
+# JSON, which can be slow on network file systems, is handed to the background writer
+# (io_service.jl), at most `plot_render_queue_size` plots at a time.
+#
+# A small admission policy decides which plots are rendered at all:
+# - `plot_render_every_n`: render only every Nth plot (1 = all)
+# - `plot_render_max_per_minute`: at most K rendered plots per minute (0 = unlimited)
+# - `plot_render_only_improved`: render only plots whose metric improves the best seen so far
+#   (per `plot_type`), with `plot_render_improved_direction` = "min" or "max"
+#
+# Plots that are skipped by the policy or dropped because the queue is full are counted,
+# and the counters are written into every sidecar JSON (`"render"` entry).
+#
+# All keys are optional and read from `simulation_config.json`.
+
+mutable struct PlotRenderer
+    lock::ReentrantLock
+    slot_free::Threads.Condition     # on `lock`, notified when a pending plot is written
+    async::Bool
+    queue_size::Int
+    every_n::Int
+    max_per_minute::Int
+    only_improved::Bool
+    improved_direction::Symbol
+    n_pending::Int
+    n_calls::Int
+    n_queued::Int
+    n_rendered::Int
+    n_skipped::Int
+    n_dropped::Int
+    n_failed::Int
+    recent::Vector{Float64}
+    best_metric::Dict{String,Float64}
+end
+
+function PlotRenderer()
+    l = ReentrantLock()
+    return PlotRenderer(l, Threads.Condition(l), Threads.nthreads() > 1, 16,
+                        1, 0, false, :min, 0, 0, 0, 0, 0, 0, 0, Float64[], Dict{String,Float64}())
+end
+
+const PLOT_RENDERER = PlotRenderer()
+
+
+"""
+    setup_plot_renderer(settings::AbstractDict)
+
+(Re)configure the background plot renderer from `settings` (normally `sim_vars`).
+Pending plots from a previous run are flushed first and all counters are reset.
+"""
+function setup_plot_renderer(settings::AbstractDict)
+    r = PLOT_RENDERER
+    flush_plot_renderer(; quiet=true)
+
+    direction = lowercase(string(get(settings, :plot_render_improved_direction, "min")))
+    direction in ("min", "max") || error("plot_render_improved_direction must be \"min\" or \"max\", got \"$direction\"")
+
+    lock(r.lock) do
+        r.async              = Bool(get(settings, :plot_render_async, Threads.nthreads() > 1))
+        r.queue_size         = max(Int(get(settings, :plot_render_queue_size, 16)), 1)
+        r.every_n            = max(Int(get(settings, :plot_render_every_n, 1)), 1)
+        r.max_per_minute     = max(Int(get(settings, :plot_render_max_per_minute, 0)), 0)
+        r.only_improved      = Bool(get(settings, :plot_render_only_improved, false))
+        r.improved_direction = Symbol(direction)
+
+        r.n_pending = r.n_calls = r.n_queued = r.n_rendered = r.n_skipped = r.n_dropped = r.n_failed = 0
+        empty!(r.recent)
+        empty!(r.best_metric)
+    end
+
+    @info "Plot rendering: async=$(r.async), every_n=$(r.every_n), max_per_minute=$(r.max_per_minute), only_improved=$(r.only_improved)"
+    return nothing
+end
+
+"Snapshot of the renderer counters (written into the sidecar JSON of each plot)."
+function plot_render_stats(r::PlotRenderer=PLOT_RENDERER)
+    lock(r.lock) do
+        Dict{String,Any}(
+            "calls" => r.n_calls,
+            "queued" => r.n_queued,
+            "rendered" => r.n_rendered,
+            "skipped" => r.n_skipped,
+            "dropped" => r.n_dropped,
+            "failed" => r.n_failed,
+        )
+    end
+end
+
+"Decide whether a plot should be rendered. Returns `(accepted, reason)`."
+function _plot_render_admit!(r::PlotRenderer, plot_type::AbstractString, metric)
+    lock(r.lock) do
+        r.n_calls += 1
+
+        if (r.n_calls - 1) % r.every_n != 0
+            r.n_skipped += 1
+            return false, "every_n"
+        end
+
+        if r.only_improved && metric isa Real && isfinite(metric)
+            best = get(r.best_metric, plot_type, NaN)
+            improved = isnan(best) ||
+                       (r.improved_direction == :min ? metric < best : metric > best)
+            if !improved
+                r.n_skipped += 1
+                return false, "not_improved"
+            end
+            r.best_metric[plot_type] = Float64(metric)
+        end
+
+        if r.max_per_minute > 0
+            t = time()
+            filter!(ts -> t - ts < 60.0, r.recent)
+            if length(r.recent) >= r.max_per_minute
+                r.n_skipped += 1
+                return false, "rate_limit"
+            end
+            push!(r.recent, t)
+        end
+
+        return true, ""
+    end
+end
+
+"Render the figure of `job` to PNG bytes (in the calling task)."
+function _render_png(job)
+    io = IOBuffer()
+    show(io, MIME("image/png"), job.fig)
+    return take!(io)
+end
+
+function _count_failed_plot!(r::PlotRenderer, job, err)
+    lock(r.lock) do
+        r.n_failed += 1
+    end
+    @warn "Plot rendering failed for $(job.filepath): $err"
+    return nothing
+end
+
+"Write the rendered `png` of `job` and its sidecar JSON (background writer)."
+function _write_plot_job(r::PlotRenderer, job, png::Vector{UInt8})
+    try
+        atomic_write(tmp -> write(tmp, png), job.filepath; suffix=".part.png")
+
+        _write_sidecar_json(job.filepath; params=job.params, metric=job.metric, plot_type=job.plot_type,
+                            run_id=job.run_id, extra=job.extra, render=plot_render_stats(r))
+
+        lock(r.lock) do
+            r.n_rendered += 1
+        end
+        emit_event("file"; kind=(job.kind === :makie ? "correlation" : "plot"), path=job.filepath,
+                   plot_type=job.plot_type)
+        @info "Saved plot to $(job.filepath)"
+    catch err
+        _count_failed_plot!(r, job, err)
+    end
+    return nothing
+end
+
+function _release_plot_slot!(r::PlotRenderer)
+    lock(r.lock) do
+        r.n_pending -= 1
+        notify(r.slot_free)
+    end
+    return nothing
+end
+
+"""
+    submit_plot_render!(job; block=false)
+
+Render the figure of `job` now and queue the file write on the background writer. If
+`queue_size` plots are already waiting, the job is dropped (and counted) before rendering with
+`block=false`, so the caller never waits on disk; with `block=true` the caller waits until one
+of them is written. Returns `true` if the plot was rendered.
+"""
+function submit_plot_render!(job; block::Bool=false, r::PlotRenderer=PLOT_RENDERER)
+    if !r.async
+        png = try
+            _render_png(job)
+        catch err
+            _count_failed_plot!(r, job, err)
+            return false
+        end
+        _write_plot_job(r, job, png)
+        return true
+    end
+
+    accepted = lock(r.lock) do
+        if !block && r.n_pending >= r.queue_size
+            r.n_dropped += 1
+            return false
+        end
+        while r.n_pending >= r.queue_size
+            wait(r.slot_free)
+        end
+        r.n_queued += 1
+        r.n_pending += 1
+        return true
+    end
+
+    if !accepted
+        @debug "Plot queue full: dropped $(job.filepath)"
+        return false
+    end
+
+    png = try
+        _render_png(job)
+    catch err
+        _release_plot_slot!(r)
+        _count_failed_plot!(r, job, err)
+        return false
+    end
+
+    submit_io!(; label=job.filepath) do
+        try
+            _write_plot_job(r, job, png)
+        finally
+            _release_plot_slot!(r)
+        end
+    end
+    return true
+end
+
+"""
+    flush_plot_renderer(; quiet=false)
+
+Wait until every queued plot (and every other pending background write) is on disk, then stop
+the background writer. A new one is started lazily by the next write.
+"""
+function flush_plot_renderer(; quiet::Bool=false, r::PlotRenderer=PLOT_RENDERER)
+    flush_io_service!(; stop=true)
+
+    if !quiet
+        s = plot_render_stats(r)
+        if s["calls"] > 0
+            @info "Plots: $(s["rendered"]) rendered, $(s["skipped"]) skipped, $(s["dropped"]) dropped, $(s["failed"]) failed (of $(s["calls"]) requested)"
+        end
+    end
+    return nothing
+end
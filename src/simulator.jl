@@ -68,6 +68,13 @@ function setup_simulator()
     sim_vars[:max_simulator_iterations] = get(sim_vars, :max_simulator_iterations, 1000)
     sim_vars[:skip_higher_pump_on_nonconvergence] = get(sim_vars, :skip_higher_pump_on_nonconvergence, false)
 
+    # Adaptive harmonic truncation for the HB sweep (see `nonlinear_simulation_adaptive`)
+    sim_vars[:adaptive_harmonics] = get(sim_vars, :adaptive_harmonics, false)
+    sim_vars[:adaptive_harmonics_tolerance] = get(sim_vars, :adaptive_harmonics_tolerance, 1e-3)
+    sim_vars[:adaptive_harmonics_levels] = get(sim_vars, :adaptive_harmonics_levels, 4)
+    sim_vars[:adaptive_harmonics_criterion] = get(sim_vars, :adaptive_harmonics_criterion, "S")
+    sim_vars[:adaptive_harmonics_bins_per_decade] = get(sim_vars, :adaptive_harmonics_bins_per_decade, 4)
+
     n_pumps = length(sim_vars[:wp])
 
     sim_vars[:linear_strong_tone_harmonics] =
@@ -482,6 +489,152 @@ function nonlinear_simulation(circuit, amps::Vector, local_sim_vars::AbstractDic
 end
 
 
+#-------------------------------------ADAPTIVE HARMONICS-------------------------------------
+
+# With `adaptive_harmonics: true` in simulation_config.json, the configured
+# `nonlinear_strong_tone_harmonics` / `nonlinear_modulation_harmonics` are treated as upper bounds.
+# For each new frequency/amplitude region the HB solve is repeated on a ladder of truncations
+# (configured counts divided by 2^k, `adaptive_harmonics_levels` levels) until the response changes
+# by less than `adaptive_harmonics_tolerance` (relative) between two consecutive levels:
+# - "S":           linearized S-parameters (default)
+# - "performance": value returned by `user_performance`, called at every level as a probe (no
+#                  saved plots, last_performance_metrics unchanged; see `as_performance_probe`)
+# The smaller of the two levels is cached for the region (frequency point + amplitude bin,
+# `adaptive_harmonics_bins_per_decade` bins per decade) and used directly for the rest of the sweep.
+
+const HARMONICS_CACHE = Dict{Any,Int}()
+
+"Truncation ladder `[(strong, modulation), ...]`, from the smallest to the configured counts."
+function harmonics_ladder(local_sim_vars::AbstractDict)
+    strong = local_sim_vars[:nonlinear_strong_tone_harmonics]
+    modulation = local_sim_vars[:nonlinear_modulation_harmonics]
+    n_levels = max(Int(local_sim_vars[:adaptive_harmonics_levels]), 1)
+
+    ladder = Tuple{Tuple,Tuple}[]
+    for k in n_levels-1:-1:0
+        level = (map(h -> max(cld(h, 2^k), 1), strong), map(h -> max(cld(h, 2^k), 1), modulation))
+        level in ladder || push!(ladder, level)
+    end
+    return ladder
+end
+
+function _harmonics_region_key(freqs, amps; bins_per_decade::Integer)
+    amp_bins = Tuple(round(Int, bins_per_decade * log10(max(abs(a), 1e-30))) for a in amps)
+    return (Tuple(Float64.(freqs)), amp_bins)
+end
+
+"Relative change between two responses (S-parameter Dicts or scalars)."
+_response_change(new::Real, old::Real) = abs(new - old) / max(abs(old), eps())
+
+function _response_change(new::AbstractDict, old::AbstractDict)
+    num = sum(sum(abs2, new[k] .- old[k]) for k in keys(old))
+    den = sum(sum(abs2, old[k]) for k in keys(old))
+    return sqrt(num / max(den, eps()))
+end
+
+_with_harmonics(local_sim_vars, level) =
+    merge(local_sim_vars, Dict{Symbol,Any}(:nonlinear_strong_tone_harmonics => level[1],
+                                           :nonlinear_modulation_harmonics => level[2]))
+
+"""
+    nonlinear_simulation_adaptive(circuit, amps, local_sim_vars; freqs, performance_fn=nothing, cache=HARMONICS_CACHE)
+
+`nonlinear_simulation` with adaptive harmonic truncation (when `adaptive_harmonics` is enabled,
+otherwise identical to `nonlinear_simulation`). `performance_fn(sol)` is needed for the
+"performance" criterion. The chosen truncation of each region is stored in `cache`.
+"""
+function nonlinear_simulation_adaptive(circuit, amps::Vector, local_sim_vars::AbstractDict;
+                                       freqs, performance_fn=nothing, cache::AbstractDict=HARMONICS_CACHE)
+    local_sim_vars[:adaptive_harmonics] || return nonlinear_simulation(circuit, amps, local_sim_vars)
+
+    tol = Float64(local_sim_vars[:adaptive_harmonics_tolerance])
+    ladder = harmonics_ladder(local_sim_vars)
+    key = _harmonics_region_key(freqs, amps; bins_per_decade=local_sim_vars[:adaptive_harmonics_bins_per_decade])
+
+    if haskey(cache, key)
+        return nonlinear_simulation(circuit, amps, _with_harmonics(local_sim_vars, ladder[cache[key]]))
+    end
+
+    use_performance = lowercase(string(local_sim_vars[:adaptive_harmonics_criterion])) == "performance"
+    use_performance && performance_fn === nothing && error("adaptive_harmonics_criterion = \"performance\" needs a performance function")
+    response(sol) = use_performance ? Float64(as_performance_probe(() -> performance_fn(sol))) :
+                                      extract_S_parameters(sol, circuit.PortNumber)
+
+    nl = nothing
+    prev = nothing
+    for (level, h) in enumerate(ladder)
+        nl = nonlinear_simulation(circuit, amps, _with_harmonics(local_sim_vars, h))
+        if !nl.converged
+            prev = nothing
+            continue
+        end
+
+        r = response(nl.sol)
+        if prev !== nothing
+            change = _response_change(r, prev)
+            if change < tol
+                cache[key] = level - 1
+                @info "Adaptive harmonics: strong tone $(ladder[level-1][1]), modulation $(ladder[level-1][2]) " *
+                      "for frequencies $(key[1]), amplitudes $amps (relative change $(round(change, sigdigits=3)) < $tol)"
+                return nl
+            end
+            @debug "Adaptive harmonics: $(h) -> relative change $change"
+        end
+        prev = r
+    end
+
+    cache[key] = length(ladder)
+    @info "Adaptive harmonics: no convergence below $tol for frequencies $(key[1]), amplitudes $amps; " *
+          "using the configured harmonics $(last(ladder))"
+    return nl
+end
+
+
+#-------------------------------------NONLINEAR SWEEP POINT-------------------------------------
+
+"Result of a sweep point without usable solution (see `evaluate_nonlinear_point`)."
+nonlinear_point_failure(message; converged::Bool=false, has_solution::Bool=false, harmonics_cache=nothing) =
+    (converged=converged, has_solution=has_solution, message=string(message), performance=NaN,
+     metrics=Dict{Symbol,Float64}(), delta_quantity=nothing, harmonics_cache=harmonics_cache)
+
+"""
+    evaluate_nonlinear_point(optimal_params, amps, freqs, local_sim_vars; circuit=nothing, harmonics_cache=HARMONICS_CACHE)
+
+One point of the nonlinear sweep: HB solve (adaptive harmonics), linear simulation,
+`user_performance` and `user_nonlinear_correction`. Only small values are returned, not the HB
+solution, so that the point can run on a watchdog worker:
+`(converged, has_solution, message, performance, metrics, delta_quantity, harmonics_cache)`
+(`harmonics_cache` is the updated cache with adaptive harmonics, `nothing` otherwise).
+A non-converged point is returned without calling the hooks if
+`skip_higher_pump_on_nonconvergence` is set.
+"""
+function evaluate_nonlinear_point(optimal_params::Dict, amps::Vector, freqs::Vector, local_sim_vars::AbstractDict;
+                                  circuit=nothing, harmonics_cache::AbstractDict=HARMONICS_CACHE)
+    circuit === nothing && (circuit = create_circuit(optimal_params))
+
+    perf_fn = sol -> performance(sol, optimal_params, amps, freqs)
+    nl = nonlinear_simulation_adaptive(circuit, amps, local_sim_vars;
+                                       freqs=freqs, performance_fn=perf_fn, cache=harmonics_cache)
+    cache_out = local_sim_vars[:adaptive_harmonics] ? harmonics_cache : nothing
+
+    if nl.sol === nothing || (!nl.converged && local_sim_vars[:skip_higher_pump_on_nonconvergence])
+        return nonlinear_point_failure(nl.message; converged=nl.converged, has_solution=nl.sol !== nothing,
+                                       harmonics_cache=cache_out)
+    end
+
+    S_lin = linear_simulation(optimal_params, circuit, local_sim_vars)
+    perf = performance(nl.sol, optimal_params, amps, freqs)
+    delta = Base.invokelatest(user_nonlinear_correction, S_lin, nl.sol, optimal_params)
+
+    return (converged=nl.converged, has_solution=true, message=string(nl.message), performance=perf,
+            metrics=copy(last_performance_metrics), delta_quantity=delta, harmonics_cache=cache_out)
+end
+
+# Positional form for `watchdog_call` (the worker gets a copy of the harmonics cache)
+_evaluate_nonlinear_point_remote(optimal_params, amps, freqs, local_sim_vars, harmonics_cache) =
+    evaluate_nonlinear_point(optimal_params, amps, freqs, local_sim_vars; harmonics_cache=harmonics_cache)
+
+
 function create_nonlinear_amplitudes(
     n_sources::Int,
     amp_keys::Vector{Symbol},
@@ -543,8 +696,11 @@ function run_nonlinear_simulations_sweep(optimal_params::Dict)
 
     ctx = Progress.start!(; N=number_initial_points_nl, stage="HB")
 
-    results = []
+    results = NonlinearResults(n_sources; capacity=number_initial_points_nl,
+                               max_memory_mb=get(sim_vars, :nonlinear_results_max_memory_mb, 256),
+                               spill_dir=get(sim_vars, :nonlinear_results_spill_dir, tempdir()))
     skip_on_nonconvergence = sim_vars[:skip_higher_pump_on_nonconvergence]
+    empty!(HARMONICS_CACHE)    # regions are specific to this circuit
 
     for freq_idx in freq_indices
         check_stop()
@@ -587,9 +743,10 @@ function run_nonlinear_simulations_sweep(optimal_params::Dict)
             println("Source frequencies used: ", current_source_freqs)
             println("Source amplitudes used: ", amps)
 
-            nl = nonlinear_simulation(circuit, amps, local_sim_vars)
+            point = guarded_nonlinear_point(optimal_params, amps, current_source_freqs, local_sim_vars;
+                                            circuit=circuit)
 
-            if skip_on_nonconvergence && !nl.converged
+            if skip_on_nonconvergence && !point.converged
                 @info "Nonlinear solver did not converge" amp_idx=amp_idx amps=amps freq_idx=freq_idx freqs=current_source_freqs
 
                 if n_sources >= 2 && !haskey(failed_idx_by_source2, source2_idx)
@@ -599,22 +756,14 @@ function run_nonlinear_simulations_sweep(optimal_params::Dict)
                 continue
             end
 
-            S_lin = linear_simulation(optimal_params, circuit, local_sim_vars)
-
-            perf = performance(nl.sol, optimal_params, amps, current_source_freqs)
-            nonlin_correction_term = Base.invokelatest(
-                user_nonlinear_correction, S_lin, nl.sol, optimal_params
-            )
+            if !point.has_solution
+                @warn "No HB solution at this point, skipped: $(point.message)"
+                continue
+            end
 
-            push!(results, (
-                freqs = current_source_freqs,
-                amps = amps,
-                performance = perf,
-                performance_metrics = copy(last_performance_metrics),
-                delta_quantity = nonlin_correction_term,
-                converged = nl.converged,
-                message = nl.message
-            ))
+            global last_performance_metrics = point.metrics
+            push_result!(results, current_source_freqs, amps, point.performance, point.metrics,
+                         point.delta_quantity, point.converged, point.message)
         end
     end
 
@@ -659,15 +808,28 @@ end
     generate_all_initial_points(device_parameters_space::Dict)
 
 Generates all possible parameter combinations from the given parameter space dictionary.
+Derived (expression) parameters are not grid dimensions: the combinations are built over the
+free parameters, then the derived columns are computed for all of them at once.
 """
 function generate_all_initial_points(device_parameters_space::Dict)
-    value_lists = values(device_parameters_space)
+    names = collect(keys(device_parameters_space))
+    free = [k for k in names if !(device_parameters_space[k] isa DerivedParameter)]
     points_set = Set{Tuple{Float64, Vararg{Float64}}}()
-    
-    for values in Iterators.product(value_lists...)
-        push!(points_set, tuple(map(float, values)...))
+
+    if length(free) == length(names)
+        for values in Iterators.product(values(device_parameters_space)...)
+            push!(points_set, tuple(map(float, values)...))
+        end
+        return collect(points_set)
     end
 
+    combos = vec(collect(Iterators.product((device_parameters_space[k] for k in free)...)))
+    columns = Dict{Symbol,Any}(k => [float(c[j]) for c in combos] for (j, k) in enumerate(free))
+    evaluate_derived_parameters!(columns, device_parameters_space)
+
+    for i in eachindex(combos)
+        push!(points_set, tuple((float(columns[k][i]) for k in names)...))
+    end
     return collect(points_set)
 end
 
@@ -684,16 +846,39 @@ function save_dataset(df::DataFrame, output_path)
 
     output_path = joinpath(output_path, "df_uniform_analysis.h5")
 
-    h5open(output_path, "w") do file
-        mat = Matrix(df)
-        filtered_mat = Matrix(filtered_df)
-
-        write(file, "df_matrix", mat)
-        if !isempty(filtered_df)
-            write(file, "df_filtered_matrix", filtered_mat)
+    # Matrices are built now (the DataFrame is used afterwards), written in the background
+    mat = Matrix(df)
+    filtered_mat = Matrix(filtered_df)
+    column_names = names(df)
+
+    submit_io!(; label=output_path) do
+        atomic_write(output_path) do tmp
+            h5open(tmp, "w") do file
+                _write_column_chunked(file, "df_matrix", mat)
+                if !isempty(filtered_mat)
+                    _write_column_chunked(file, "df_filtered_matrix", filtered_mat)
+                end
+                write(file, "df_column_names", column_names)
+            end
         end
-        write(file, "df_column_names", names(df))
+        emit_event("file"; kind="dataset", path=output_path)
     end
+    return output_path
+end
+
+# Write a (rows × columns) matrix in chunks of `chunk_rows` rows of one column: reading a column
+# (GUI dataset explorer) reads only its own chunks, and `dataset_stats` still streams row blocks
+# without loading the whole dataset.
+function _write_column_chunked(file, name::AbstractString, mat::AbstractMatrix; chunk_rows::Int=DEFAULT_STATS_CHUNK_ROWS)
+    nrows, ncols = size(mat)
+    if nrows == 0 || ncols == 0
+        write(file, name, mat)
+        return nothing
+    end
+    dset = create_dataset(file, name, datatype(Float64), dataspace(size(mat));
+                          chunk=(min(nrows, chunk_rows), 1))
+    write(dset, Matrix{Float64}(mat))
+    return nothing
 end
 
 
@@ -736,12 +921,14 @@ end
 """
     nonlinear_results_to_dataframe(results)
 
-Convert nonlinear sweep results into a numeric DataFrame.
+Convert nonlinear sweep results (a `NonlinearResults` store) into a numeric DataFrame whose
+columns are views of the store.
 
 Included columns:
 - source_i_frequency
 - source_i_amplitude
 - performance
+- one column per performance metric (NaN where a metric was not computed)
 - converged   (saved as 0/1)
 
 Optional column:
@@ -752,55 +939,10 @@ function nonlinear_results_to_dataframe(results)
         return DataFrame()
     end
 
-    n_sources = length(results[1].amps)
-
-    cols = Dict{Symbol, Vector{Float64}}()
-
-    for i in 1:n_sources
-        cols[Symbol("source_$(i)_frequency")] = Float64[]
-        cols[Symbol("source_$(i)_amplitude")] = Float64[]
-    end
-
-    cols[:performance] = Float64[]
-    cols[:converged] = Float64[]
-    extra_perf_names = Symbol[]
-
-    for r in results
-        if hasproperty(r, :performance_metrics)
-            for name in keys(r.performance_metrics)
-                if name != :performance && !(name in extra_perf_names)
-                    push!(extra_perf_names, name)
-                    cols[name] = Float64[]
-                end
-            end
-        end
-    end
-
-    # Include delta_quantity only if it is numeric for all rows
-    save_delta_quantity = all(r -> r.delta_quantity isa Number, results)
-    if save_delta_quantity
-        cols[:delta_quantity] = Float64[]
-    end
-
-    for r in results
-        for i in 1:n_sources
-            push!(cols[Symbol("source_$(i)_frequency")], float(r.freqs[i]))
-            push!(cols[Symbol("source_$(i)_amplitude")], float(r.amps[i]))
-        end
-
-        push!(cols[:performance], float(r.performance))
-        for name in extra_perf_names
-            value = get(r.performance_metrics, name, NaN)
-            push!(cols[name], Float64(value))
-        end
-        push!(cols[:converged], r.converged ? 1.0 : 0.0)
-
-        if save_delta_quantity
-            push!(cols[:delta_quantity], float(r.delta_quantity))
-        end
-    end
-
-    return DataFrame(cols)
+    # Columns are views of the result store (no copies), in alphabetical order as before
+    cols = filter(c -> c != :delta_quantity || delta_is_numeric(results), results.columns)
+    sort!(cols)
+    return DataFrame([c => result_column(results, c) for c in cols]; copycols=false)
 end
 
 """
@@ -816,19 +958,25 @@ Saved datasets:
 function save_nonlinear_dataset(df::DataFrame, output_path; filename="df_nonlinear_analysis.h5")
     output_file = joinpath(output_path, filename)
 
-    # keep only converged rows in filtered_df
-    filtered_df = filter(row -> row.converged == 1.0, df)
+    # keep only converged rows in the filtered matrix
+    mat = Matrix{Float64}(df)
+    conv = columnindex(df, :converged)
+    filtered_mat = conv == 0 ? mat : mat[view(mat, :, conv) .== 1.0, :]
+    column_names = names(df)
 
-    h5open(output_file, "w") do file
-        mat = Matrix(df)
-        filtered_mat = Matrix(filtered_df)
+    submit_io!(; label=output_file) do
+        atomic_write(output_file) do tmp
+            h5open(tmp, "w") do file
+                write(file, "df_nonlinear_matrix", mat)
 
-        write(file, "df_nonlinear_matrix", mat)
+                if !isempty(filtered_mat)
+                    write(file, "df_nonlinear_conveging_results_matrix", filtered_mat)
+                end
 
-        if !isempty(filtered_df)
-            write(file, "df_nonlinear_conveging_results_matrix", filtered_mat)
+                write(file, "df_nonlinear_column_names", column_names)
+            end
         end
-
-        write(file, "df_nonlinear_column_names", names(df))
+        emit_event("file"; kind="dataset", path=output_file)
     end
+    return output_file
 end
\ No newline at end of file
@@ -117,24 +117,28 @@ function simulation_time_estimation(n_initial_points, n_maxiters, n_num_new_samp
     total_points = n_initial_points + n_maxiters * n_num_new_samples
     time_estimated = total_points * time_per_point  # in seconds
     
-    # Breakdown time into days, hours, minutes, and seconds
-    total_seconds = round(Int, time_estimated)
-    days = div(total_seconds, 86400)
-    hours = div(total_seconds % 86400, 3600)
-    minutes = div(total_seconds % 3600, 60)
-    seconds = total_seconds % 60
-    
     # Calculate the finishing time
+    total_seconds = round(Int, time_estimated)
     current_time = Dates.now()  # Current date and time
     finish_time = current_time + Dates.Second(total_seconds)
     
     # Create formatted time strings
-    formatted_estimation = "$(days)d $(hours)h $(minutes)m $(seconds)s"
+    formatted_estimation = format_duration(total_seconds)
     formatted_finish_time = string(finish_time) 
     
     return formatted_estimation, formatted_finish_time
 end
 
+"Format a number of seconds as `\"<d>d <h>h <m>m <s>s\"`."
+function format_duration(total_seconds::Real)
+    total_seconds = round(Int, total_seconds)
+    days = div(total_seconds, 86400)
+    hours = div(total_seconds % 86400, 3600)
+    minutes = div(total_seconds % 3600, 60)
+    seconds = total_seconds % 60
+    return "$(days)d $(hours)h $(minutes)m $(seconds)s"
+end
+
 """
     simulation_time(start_time)
 
@@ -160,85 +164,90 @@ function simulation_time(start_time)
     return formatted_time
 end
 
-"""
-    parse_value(value)
-
-This function parses a value, which could be a dictionary (defining a range), a string (to be evaluated), 
-or a simple non-string value.
-
-# Arguments:
-- `value`: The value to parse.
-
-# Returns:
-- A parsed value, which could be a range, an evaluated expression, or the original value.
-"""
-
-function parse_value(value)
-    if isa(value, Dict) && all(k -> k in keys(value), ["start", "step", "stop"])
-        # Handle range dictionaries
-        start = value["start"]
-        step  = value["step"]
-        stop  = value["stop"]
-        return collect(start:step:stop)
-    elseif isa(value, String)
-        # Handle strings as expressions or numbers
-        @debug "Parsing string value: $value"
-        try
-            # Attempt to parse as a number or expression
-            parsed_value = Meta.parse(value)
-            if isa(parsed_value, Symbol)
-                # If the parsed value is a Symbol, return the original string
-                @debug "Parsed value is a Symbol, returning original string: $value"
-                return value
-            else
-                # Otherwise, return the parsed value
-                @debug "Parsed value: $parsed_value"
-                return parsed_value
+# Parsed input files by content hash: each distinct file is parsed, and its expressions compiled,
+# once per session (load_params is called again at every nonlinear correction cycle).
+const PARAMS_FILE_CACHE = Dict{String,Any}()
+
+# Values of one JSON entry: (values, tagged, expression source or nothing).
+function _parse_param_entry(k, v)
+    v isa Dict || return v, false, nothing
+
+    # Supported JSON formats for each parameter:
+    #   1) {"start":..., "step":..., "stop":...}
+    #   2) {"values":[...]}
+    #   3) {"segments":[{"start":...,"step":...,"stop":...}, ...]}
+    #   4) {"expr":"..."}   (computed from the other parameters, see param_expressions.jl)
+    # The "segments" form is useful for non-uniform frequency grids.
+    has_tag = haskey(v, "tag")
+    if haskey(v, "expr")
+        v["expr"] isa AbstractString || error("'expr' for key '$k' must be a string")
+        return nothing, has_tag, v["expr"]
+    elseif haskey(v, "segments")
+        segs = v["segments"]
+        if !(segs isa AbstractVector)
+            error("'segments' for key '$k' must be an array of {start,step,stop} dicts")
+        end
+        acc = Float64[]
+        for (si, seg) in enumerate(segs)
+            if !(seg isa Dict) || !all(haskey(seg, fld) for fld in ("start","step","stop"))
+                error("Segment #$si for key '$k' must be a dict with start/step/stop")
             end
-        catch
-            # If parsing fails, return the string as-is
-            @debug "Failed to parse string value: $value"
-            return value
+            append!(acc, collect(seg["start"]:seg["step"]:seg["stop"]))
         end
-    else
-        # Return non-dictionary and non-string values as-is
-        @debug "Returning non-string value: $value"
-        return value
+        sort!(acc)
+        unique!(acc)
+        return acc, has_tag, nothing
+    elseif all(haskey(v, fld) for fld in ("start","step","stop"))
+        return collect(v["start"]:v["step"]:v["stop"]), has_tag, nothing
+    elseif haskey(v, "values")
+        return v["values"], has_tag, nothing
     end
+    error("Unsupported dictionary format for key: $k")
 end
 
+function _parse_params_file(raw_str::String, filename)
+    # --- Robust JSON loading ---
+    if startswith(raw_str, '\ufeff')
+        raw_str = String(chop(raw_str; head=1, tail=0))
+    end
+    keep(c) = isprint(c) || c in ('\n', '\r', '\t')
+    all(keep, raw_str) || (raw_str = filter(keep, raw_str))
+    raw_params = JSON.parse(raw_str)
+    @debug "Raw parameters from JSON file: $raw_params"
 
-"""
-    evaluate_expr(value, params::Dict{Symbol,Any})
-
-This function evaluates an expression using the provided parameter values from `params`.
-
-# Arguments:
-- `value`: The expression to evaluate.
-- `params::Dict{Symbol,Any}`: A dictionary of parameter values to be used in the evaluation.
+    param_names = Symbol[]
+    values = Dict{Symbol,Any}()
+    tagged = Set{Symbol}()
+    sources = Dict{Symbol,String}()
+    for (k, v) in raw_params
+        key = Symbol(k)
+        push!(param_names, key)
+        vals, has_tag, source = _parse_param_entry(k, v)
+        has_tag && push!(tagged, key)
+        source === nothing ? (values[key] = vals) : (sources[key] = source)
+    end
 
-# Returns:
-- The evaluated result of the expression.
-"""
-function evaluate_expr(value, params::Dict{Symbol, Any})
-    if isa(value, Expr)
-        @debug "Evaluating expression: $value"
-        assignments = [:(const $(k) = $(params[k])) for k in keys(params)]
-        block = Expr(:block, assignments..., value)
-        evaluated_value = eval(block)
-        @info "Evaluated value: $evaluated_value"
-        return evaluated_value
-    else
-        # Do not evaluate strings here; they will be handled in linear_simulation
-        @debug "Returning non-expression value: $value"
-        return value
+    exprs = Dict{Symbol,ParamExpression}()
+    for (key, source) in sources
+        exprs[key] = try
+            compile_param_expression(source, param_names)
+        catch err
+            error("Parameter '$key' of $(basename(filename)): $(sprint(showerror, err))")
+        end
     end
+    return (names=param_names, values=values, tagged=tagged, exprs=exprs, order=param_expression_order(exprs))
 end
 
 """
-    load_params(filename)
+    load_params(filename; optimal=nothing)
 
-This function loads parameters from a JSON file, parses them, and evaluates any expressions in the parameter values.
+This function loads parameters from a JSON file, expands the ranges and evaluates the expression
+parameters (`{"expr": "..."}`); an expression over swept parameters is a `DerivedParameter`,
+computed per point of the grid. With `optimal`, tagged parameters present in it are replaced by
+their optimal value (expressions referencing them use that value; tagged expressions are
+recomputed, not replaced).
+
+The file is parsed once per content (cached by its hash); every call returns a new dictionary.
 
 # Arguments:
 - `filename`: The path to the JSON file containing the parameters.
@@ -246,74 +255,28 @@ This function loads parameters from a JSON file, parses them, and evaluates any
 # Returns:
 - A dictionary containing the parsed and evaluated parameters.
 """
-
 function load_params(filename; optimal::Union{Dict,Nothing}=nothing)
-    # --- Robust JSON loading ---
-    raw_str = read(filename, String)
-    if startswith(raw_str, '\ufeff')
-        raw_str = raw_str[2:end]
-    end
-    clean_str = filter(c -> isprint(c) || c in ['\n','\r','\t'], raw_str)
-    raw_params = JSON.parse(clean_str)
-    @debug "Raw parameters from JSON file: $raw_params"
+    raw = read(filename)
+    hash_key = bytes2hex(sha256(raw))
+    parsed = get!(() -> _parse_params_file(String(raw), filename), PARAMS_FILE_CACHE, hash_key)
 
     params = Dict{Symbol,Any}()
-
-    for (k, v) in raw_params
-        key = Symbol(k)
-        values = nothing
-        has_tag = false
-
-        if isa(v, Dict)
-            # Determine values
-            # Supported JSON formats for each parameter:
-            #   1) {"start":..., "step":..., "stop":...}
-            #   2) {"values":[...]}
-            #   3) {"segments":[{"start":...,"step":...,"stop":...}, ...]}
-            # The "segments" form is useful for non-uniform frequency grids.
-            if haskey(v, "segments")
-                segs = v["segments"]
-                if !(segs isa AbstractVector)
-                    error("'segments' for key '$k' must be an array of {start,step,stop} dicts")
-                end
-                acc = Float64[]
-                for (si, seg) in enumerate(segs)
-                    if !(seg isa Dict) || !all(haskey(seg, fld) for fld in ("start","step","stop"))
-                        error("Segment #$si for key '$k' must be a dict with start/step/stop")
-                    end
-                    append!(acc, collect(seg["start"]:seg["step"]:seg["stop"]))
-                end
-                sort!(acc)
-                unique!(acc)
-                values = acc
-            elseif all(haskey(v, fld) for fld in ("start","step","stop"))
-                values = collect(v["start"]:v["step"]:v["stop"])
-            elseif haskey(v, "values")
-                values = v["values"]
-            else
-                error("Unsupported dictionary format for key: $k")
-            end
-
-            # Just check if "tag" exists
-            if haskey(v, "tag")
-                has_tag = true
-            end
-        else
-            values = v
-        end
-
+    overridden = Symbol[]
+    for key in parsed.names
         # Override if optimal dict is given AND this param is tagged AND present in optimal
-        if optimal !== nothing && has_tag && haskey(optimal, key)
+        # (expressions are always recomputed, from the optimal values of the parameters they use)
+        if optimal !== nothing && key in parsed.tagged && haskey(optimal, key) && !haskey(parsed.exprs, key)
             @debug "Overriding $key with optimal value $(optimal[key])"
             params[key] = [optimal[key]]
+            push!(overridden, key)
         else
-            params[key] = values
+            params[key] = deepcopy(get(parsed.values, key, nothing))    # expressions: set below
         end
     end
+    evaluate_param_space_expressions!(params, parsed.exprs, parsed.order; skip=overridden)
 
     @debug "Final parsed parameters: $params"
     return params
-    
 end
 
 
@@ -428,7 +391,7 @@ end
 
 
 function _write_sidecar_json(png_path::AbstractString; params=nothing, metric=nothing,
-    plot_type::AbstractString="plot", run_id=nothing, extra=Dict())
+    plot_type::AbstractString="plot", run_id=nothing, extra=Dict(), render=nothing)
     meta = Dict{String,Any}(
     "png" => basename(png_path),
     "timestamp" => string(Dates.now()),
@@ -436,6 +399,7 @@ function _write_sidecar_json(png_path::AbstractString; params=nothing, metric=no
     )
     run_id !== nothing && (meta["run_id"] = run_id)
     metric !== nothing && (meta["metric"] = metric)
+    render !== nothing && (meta["render"] = render)
 
     if params isa AbstractDict
         meta["params"] = Dict(string(k)=>v for (k,v) in params)
@@ -450,12 +414,22 @@ function _write_sidecar_json(png_path::AbstractString; params=nothing, metric=no
     end
 
     json_path = replace(String(png_path), r"\.png$" => ".json")
-    write(json_path, JSON.json(meta, 4))
+    atomic_write(tmp -> write(tmp, JSON.json(meta, 4)), json_path; suffix=".tmp")
 
     return json_path
 end
 
 function plot_update(p; params=nothing, metric=nothing, plot_type::AbstractString="plot", run_id=nothing, extra=Dict())
+    if performance_probe()
+        @debug "Plot not rendered (performance probe)"
+        return nothing
+    end
+    accepted, reason = _plot_render_admit!(PLOT_RENDERER, plot_type, metric)
+    if !accepted
+        @debug "Plot not rendered ($reason)"
+        return nothing
+    end
+
     mkpath(plot_path)
     timestamp = Dates.format(now(), "yyyy-mm-dd_HH-MM-SS-sss")
     filepath = joinpath(plot_path, "plot_$timestamp.png")
@@ -469,10 +443,13 @@ function plot_update(p; params=nothing, metric=nothing, plot_type::AbstractStrin
         end
     end
     
-    savefig(p, filepath)
-    _write_sidecar_json(filepath; params=params, metric=metric, plot_type=plot_type, run_id=run_id, extra=extra)
+    # Rendering (savefig + sidecar JSON) happens on the background worker.
+    # Copy the dicts: user hooks may keep mutating them while the plot waits in the queue.
+    job = (kind=:plots, fig=p, filepath=filepath,
+           params=(params isa AbstractDict ? copy(params) : params), metric=metric,
+           plot_type=plot_type, run_id=run_id, extra=(extra isa AbstractDict ? copy(extra) : extra))
+    submit_plot_render!(job) || return nothing
 
-    @info "Saved plot to $filepath"
     return filepath
 end
 
@@ -501,28 +478,34 @@ function save_datas(vectors;
 
     filepath = joinpath(data_dir, "$(filename)_$(timestamp).h5")
 
-    h5open(filepath, "w") do file
-        if vectors isa AbstractVector{<:Number}
-            write(file, prefix, collect(vectors))
-        else
-            for (i, v) in enumerate(vectors)
-                write(file, "$(prefix)_$i", collect(v))
+    # Copy now (the caller may reuse the vectors), write in the background (io_service.jl)
+    data = vectors isa AbstractVector{<:Number} ? [prefix => collect(vectors)] :
+           ["$(prefix)_$i" => collect(v) for (i, v) in enumerate(vectors)]
+
+    submit_io!(; label=filepath) do
+        atomic_write(filepath) do tmp
+            h5open(tmp, "w") do file
+                for (name, v) in data
+                    write(file, name, v)
+                end
             end
         end
+        emit_event("file"; kind="user_data", path=filepath)
+        @info "Saved datas to $filepath"
     end
-
-    @info "Saved datas to $filepath"
     return filepath
 end
 
 
 """
-    correlation_update(fig::Figure; params=nothing, metric=nothing, plot_type="correlation", run_id=nothing, extra=Dict())
+    correlation_update(fig; params=nothing, metric=nothing, plot_type="correlation", run_id=nothing, extra=Dict())
 
-Save a Makie `Figure` into `corr_path` safely (write to .part then move),
-and write a sidecar JSON metadata file with the same basename.
+Queue a Makie `Figure` for saving into `corr_path` (written to .part then moved by the
+background renderer), together with a sidecar JSON metadata file with the same basename.
+Correlation figures are never dropped: if the queue is full, the caller waits until a queued
+plot is written.
 """
-function correlation_update(fig::Figure;
+function correlation_update(fig;
     params=nothing,
     metric=nothing,  # will be skipped if array (by your sidecar writer)
     plot_type::AbstractString="correlation",
@@ -537,14 +520,13 @@ function correlation_update(fig::Figure;
 
     filename  = "corr_$(timestamp)$(rid).png"
     filepath  = joinpath(corr_path, filename)
-    tmpfile   = filepath * ".part.png"
-
-    save(tmpfile, fig)
-    mv(tmpfile, filepath; force=true)
 
-    _write_sidecar_json(filepath; params=params, metric=metric, plot_type=plot_type, run_id=run_id, extra=extra)
+    job = (kind=:makie, fig=fig, filepath=filepath,
+           params=(params isa AbstractDict ? copy(params) : params), metric=metric,
+           plot_type=plot_type, run_id=run_id, extra=copy(extra))
+    submit_plot_render!(job; block=true)
 
-    @info "Saved correlation figure → $filepath"
+    @info "Queued correlation figure → $filepath"
     return filepath
 end
 
@@ -557,14 +539,14 @@ function plot_delta_vs_amplitude(results)
         return nothing
     end
     
-    # Extract amplitudes as matrix (N x M, where N points, M sources)
-    amps_mat = reduce(vcat, [r.amps' for r in results])
+    # Amplitudes as matrix (N x M, where N points, M sources), a view of the result store
+    amps_mat = result_amplitudes(results)
     @debug "Amplitudes: $amps_mat"
-    delta_vals = [r.delta_quantity for r in results]
+    delta_vals = result_deltas(results)
     @debug "Delta: $delta_vals"
 
     # Find which column actually varies
-    amp_vars = [maximum(amps_mat[:, j]) - minimum(amps_mat[:, j]) for j in 1:size(amps_mat, 2)]
+    amp_vars = [maximum(view(amps_mat, :, j)) - minimum(view(amps_mat, :, j)) for j in 1:size(amps_mat, 2)]
     changing_idx = findall(!=(0.0), amp_vars)
 
     if length(changing_idx) == 0
@@ -575,7 +557,7 @@ function plot_delta_vs_amplitude(results)
     end
 
     idx = changing_idx[1]  # pick the first varying amplitude
-    sweep_amps = amps_mat[:, idx]
+    sweep_amps = view(amps_mat, :, idx)
 
     # Plot scatter
     plt = plot(
@@ -615,13 +597,13 @@ function plot_performance_vs_amplitude(results)
         return nothing
     end
 
-    amps_mat = reduce(vcat, [r.amps' for r in results])
+    amps_mat = result_amplitudes(results)
     @debug "Results: $results"
-    performances = [r.performance for r in results]
+    performances = result_column(results, :performance)
     @debug "Performances: $performances"
 
     # Find which column actually varies
-    amp_vars = [maximum(amps_mat[:, j]) - minimum(amps_mat[:, j]) for j in 1:size(amps_mat, 2)]
+    amp_vars = [maximum(view(amps_mat, :, j)) - minimum(view(amps_mat, :, j)) for j in 1:size(amps_mat, 2)]
     changing_idx = findall(!=(0.0), amp_vars)
 
     if length(changing_idx) == 0
@@ -632,7 +614,7 @@ function plot_performance_vs_amplitude(results)
     end
 
     idx = changing_idx[1]  # pick the first varying amplitude
-    sweep_amps = amps_mat[:, idx]
+    sweep_amps = view(amps_mat, :, idx)
 
     # Plot scatter
     plt = plot(
@@ -719,10 +701,17 @@ function atomic_write_json(path::AbstractString, obj; indent::Int=4)
     return nothing
 end
 
+# Stage of the last status written per status.json (stage boundaries flush the background writer)
+const LAST_STATUS_STAGE = Dict{String,Any}()
+
 """
     write_status(output_path; status, stage=nothing, message=nothing, extra=Dict())
 
 Write / update a status.json file in the current output folder.
+
+Running statuses are written in the background (repeated updates are coalesced); a new stage
+first waits for the pending writes of the previous one. Final statuses (completed, stopped,
+error) wait for all pending writes and are written before returning.
 """
 function write_status(output_path::AbstractString; status::AbstractString, stage=nothing, message=nothing, extra=Dict{String,Any}())
     # Write status inside `simulation_info/` unless the caller already passed that folder.
@@ -742,10 +731,16 @@ function write_status(output_path::AbstractString; status::AbstractString, stage
     for (k,v) in extra
         d[k] = v
     end
+    final = status != "running"
+    stage_changed = get(LAST_STATUS_STAGE, status_path, nothing) != stage
+    LAST_STATUS_STAGE[status_path] = stage
+    (final || stage_changed) && flush_io_service!()
     try
-        atomic_write_json(status_path, d; indent=4)
+        final ? atomic_write_json(status_path, d; indent=4) : write_json_async(status_path, d; coalesce=true)
     catch
         # best-effort
     end
+    emit_event("status"; status=status, stage=stage, message=message,
+               output_path=dirname(status_dir))
     return status_path
 end
@@ -0,0 +1,272 @@
+#-------------------------------------WATCHDOG-------------------------------------------
+
+# A pathological parameter point can make `hbsolve` (or the linear solve) run for a very long
+# time, hang or exhaust the memory, and a running Julia task cannot be interrupted from outside.
+# With the watchdog enabled, linear evaluations (`cost`) and nonlinear sweep points (HB solve,
+# linear simulation and user hooks, see `evaluate_nonlinear_point`) are therefore run in
+# separate Julia worker processes (Distributed), which load the package and the same workspace.
+# A point that exceeds a limit is recorded as failed, with the reason, in
+# `simulation_info/watchdog_failures.json` (penalty metric for linear points, non-converged for
+# HB points), and its worker is killed and replaced by a fresh one, so the sweep always finishes.
+#
+# All keys are optional and read from `simulation_config.json`:
+#   watchdog                (false)
+#   watchdog_timeout_s      (600; wall time per point, 0 = unlimited)
+#   watchdog_max_memory_mb  (0 = unlimited; resident memory of the worker, Linux only)
+#   watchdog_workers        (1; number of worker processes, used by the batch optimizer)
+#   watchdog_poll_s         (0.5)
+#
+# Starting a worker costs a package load plus the setup of the user inputs, so the watchdog is
+# meant for long simulations, not for sub-second linear points.
+
+import Distributed
+
+struct WatchdogWorker
+    pid::Int      # Distributed worker id
+    ospid::Int    # OS process id (memory readings, kill)
+end
+
+Base.@kwdef struct WatchdogSettings
+    enabled::Bool = false
+    timeout_s::Float64 = 600.0
+    max_memory_mb::Float64 = 0.0
+    n_workers::Int = 1
+    poll_s::Float64 = 0.5
+end
+
+const WATCHDOG_SETTINGS = Ref(WatchdogSettings())
+# Worker slots: `nothing` = not started yet (or recycled)
+const WATCHDOG_SLOTS = Ref{Channel{Union{Nothing,WatchdogWorker}}}(Channel{Union{Nothing,WatchdogWorker}}(1))
+const WATCHDOG_LOCK = ReentrantLock()
+const WATCHDOG_FAILURES = Dict{String,Any}[]
+const WATCHDOG_FAILURES_FILE = "watchdog_failures.json"
+const WATCHDOG_PENALTY = 1e8
+
+watchdog_enabled() = WATCHDOG_SETTINGS[].enabled
+
+"""
+    setup_watchdog(settings::AbstractDict)
+
+(Re)configure the watchdog from `settings` (normally `sim_vars`). Workers of a previous run are
+shut down and the failure list is reset. Workers are started lazily on the first evaluation.
+"""
+function setup_watchdog(settings::AbstractDict)
+    shutdown_watchdog!()
+
+    s = WatchdogSettings(
+        enabled       = Bool(get(settings, :watchdog, false)),
+        timeout_s     = max(Float64(get(settings, :watchdog_timeout_s, 600.0)), 0.0),
+        max_memory_mb = max(Float64(get(settings, :watchdog_max_memory_mb, 0.0)), 0.0),
+        n_workers     = max(Int(get(settings, :watchdog_workers, 1)), 1),
+        poll_s        = max(Float64(get(settings, :watchdog_poll_s, 0.5)), 0.01),
+    )
+    WATCHDOG_SETTINGS[] = s
+
+    slots = Channel{Union{Nothing,WatchdogWorker}}(s.n_workers)
+    foreach(_ -> put!(slots, nothing), 1:s.n_workers)
+    WATCHDOG_SLOTS[] = slots
+    lock(() -> empty!(WATCHDOG_FAILURES), WATCHDOG_LOCK)
+
+    if s.enabled
+        s.max_memory_mb > 0 && !Sys.islinux() && @warn "watchdog_max_memory_mb is only enforced on Linux."
+        @info "Watchdog: $(s.n_workers) worker(s), timeout $(s.timeout_s) s, memory limit $(s.max_memory_mb) MB"
+    end
+    return nothing
+end
+
+"Stop all watchdog workers (they are restarted on demand)."
+function shutdown_watchdog!()
+    slots = WATCHDOG_SLOTS[]
+    while isready(slots)
+        w = take!(slots)
+        w === nothing || _kill_watchdog_worker(w)
+    end
+    return nothing
+end
+
+#---------------------------------------- worker side ----------------------------------------
+
+"Set up a freshly started worker with the same workspace as the main process. Returns its OS pid."
+function _watchdog_worker_init(workspace::AbstractString, output_path)
+    load_backends!(:plots)    # user hooks call `plot`
+    Base.invokelatest(_watchdog_worker_setup, workspace, output_path)
+    return getpid()
+end
+
+function _watchdog_worker_setup(workspace, output_path)
+    global config = get_configuration(; workspace=workspace, create=false)
+    global plot_path = config.plot_dir
+    global corr_path = config.corr_dir
+    CURRENT_OUTPUT_PATH[] = output_path
+
+    setup_sources()
+    setup_circuit()
+    setup_cost()
+    setup_simulator()
+    setup_io_service(merge(sim_vars, Dict(:io_async => false)))
+    setup_plot_renderer(merge(sim_vars, Dict(:plot_render_async => false)))
+
+    blas_threads = load_execution_profile(workspace).blas_threads
+    blas_threads === nothing || BLAS.set_num_threads(blas_threads)
+
+    # counters used by `mask` in the user hooks
+    global point_exluded = 0
+    global number_initial_points = 0
+    return nothing
+end
+
+#---------------------------------------- main side ----------------------------------------
+
+function _start_watchdog_worker()
+    project = Base.active_project()
+    exeflags = project === nothing ? ["--threads=1"] : ["--project=$(dirname(project))", "--threads=1"]
+
+    t0 = time()
+    pid = only(Distributed.addprocs(1; exeflags=exeflags))
+    try
+        Distributed.remotecall_eval(Main, pid, :(using JosephsonCircuitsOptimizer))
+        ospid = Distributed.remotecall_fetch(_watchdog_worker_init, pid, config.WORKING_SPACE, CURRENT_OUTPUT_PATH[])
+        @info "Watchdog: started worker $pid (pid $ospid) in $(round(time() - t0, digits=1)) s"
+        return WatchdogWorker(pid, ospid)
+    catch
+        try Distributed.rmprocs(pid; waitfor=5) catch end
+        rethrow()
+    end
+end
+
+function _kill_watchdog_worker(w::WatchdogWorker)
+    try
+        if Sys.iswindows()
+            Base.run(pipeline(`taskkill /F /PID $(w.ospid)`; stdout=devnull, stderr=devnull); wait=true)
+        else
+            ccall(:kill, Cint, (Cint, Cint), w.ospid, 9)    # SIGKILL: the worker may be stuck in native code
+        end
+    catch err
+        @debug "Could not kill worker $(w.pid): $err"
+    end
+    try Distributed.rmprocs(w.pid; waitfor=5) catch end
+    return nothing
+end
+
+"Resident memory of process `ospid` in MB (0 if unknown)."
+function _process_rss_mb(ospid::Integer)
+    Sys.islinux() || return 0.0
+    try
+        for line in eachline("/proc/$ospid/status")
+            startswith(line, "VmRSS:") && return parse(Float64, split(line)[2]) / 1024
+        end
+    catch
+    end
+    return 0.0
+end
+
+"""
+    watchdog_call(f, args...)
+
+Run `f(args...)` on a watchdog worker. Returns `(true, value, "")`, or `(false, nothing, reason)`
+if the point exceeded a limit or killed its worker (which is then recycled). Errors raised by
+`f` are rethrown, a STOP request raises `StopRequested`.
+"""
+function watchdog_call(f, args...)
+    s = WATCHDOG_SETTINGS[]
+    slots = WATCHDOG_SLOTS[]
+    w = take!(slots)    # waits for a free worker
+    recycle = false
+
+    try
+        w === nothing && (w = _start_watchdog_worker())
+        fut = Distributed.remotecall(f, w.pid, args...)
+        t0 = time()
+
+        while !isready(fut)
+            sleep(s.poll_s)
+            if stop_requested(config.WORKING_SPACE)
+                recycle = true
+                throw(StopRequested())
+            end
+
+            elapsed = time() - t0
+            reason = ""
+            if s.timeout_s > 0 && elapsed > s.timeout_s
+                reason = "timeout after $(round(elapsed, digits=1)) s"
+            elseif s.max_memory_mb > 0
+                rss = _process_rss_mb(w.ospid)
+                rss > s.max_memory_mb && (reason = "memory $(round(Int, rss)) MB > $(s.max_memory_mb) MB")
+            end
+            if !isempty(reason)
+                recycle = true
+                return false, nothing, reason
+            end
+        end
+
+        try
+            return true, fetch(fut), ""
+        catch err
+            if err isa Distributed.ProcessExitedException
+                recycle = true
+                return false, nothing, "worker process exited"
+            elseif err isa Distributed.RemoteException && err.captured.ex isa StopRequested
+                throw(StopRequested())
+            end
+            rethrow()
+        end
+    catch
+        recycle = true
+        rethrow()
+    finally
+        if recycle && w !== nothing
+            @warn "Watchdog: recycling worker $(w.pid)"
+            _kill_watchdog_worker(w)
+            w = nothing
+        end
+        put!(slots, w)
+    end
+end
+
+"Record a failed point in memory and in `simulation_info/watchdog_failures.json`."
+function record_watchdog_failure!(; stage::AbstractString, reason::AbstractString, params=Dict())
+    @warn "Watchdog: $stage point failed ($reason)"
+    entry = Dict{String,Any}(
+        "stage" => stage,
+        "reason" => reason,
+        "params" => Dict(string(k) => v for (k, v) in params),
+        "timestamp_unix" => time(),
+    )
+
+    lock(WATCHDOG_LOCK) do
+        push!(WATCHDOG_FAILURES, entry)
+        output_path = CURRENT_OUTPUT_PATH[]
+        output_path === nothing && return
+        try
+            dir = joinpath(output_path, "simulation_info")
+            mkpath(dir)
+            save_output_file(Dict("failures" => WATCHDOG_FAILURES), joinpath(dir, WATCHDOG_FAILURES_FILE))
+        catch err
+            @debug "Could not write $(WATCHDOG_FAILURES_FILE): $err"
+        end
+    end
+    return nothing
+end
+
+"""
+    guarded_nonlinear_point(optimal_params, amps, freqs, local_sim_vars; circuit=nothing)
+
+`evaluate_nonlinear_point` under the watchdog: the HB solve, the linear simulation and the user
+hooks of the point all run on a worker, which sends back only the scalar results (the HB
+solution stays on the worker). A failed point is returned as not converged, without solution.
+"""
+function guarded_nonlinear_point(optimal_params::Dict, amps::Vector, freqs::Vector, local_sim_vars::AbstractDict;
+                                 circuit=nothing)
+    watchdog_enabled() || return evaluate_nonlinear_point(optimal_params, amps, freqs, local_sim_vars;
+                                                          circuit=circuit, harmonics_cache=HARMONICS_CACHE)
+
+    ok, point, reason = watchdog_call(_evaluate_nonlinear_point_remote, optimal_params, amps, freqs,
+                                      Dict{Symbol,Any}(local_sim_vars), copy(HARMONICS_CACHE))
+    if ok
+        point.harmonics_cache === nothing || merge!(HARMONICS_CACHE, point.harmonics_cache)
+        return point
+    end
+
+    record_watchdog_failure!(; stage="HB", reason=reason, params=Dict("amplitudes" => amps, "frequencies" => freqs))
+    return nonlinear_point_failure("watchdog: $reason")
+end
@@ -0,0 +1,226 @@
+#-------------------------------------YIELD ANALYSIS-------------------------------------
+
+# Monte Carlo fabrication-yield study of an optimal design (`run_yield_analysis`).
+#
+# Each realization i gets its own RNG, `MersenneTwister([seed, i])`, so results do not depend on
+# the number of threads or on scheduling. The RNG is used to perturb the device parameters listed
+# in `parameter_spread` (relative Gaussian std) and is available to `user_circuit.jl` through
+# `realization_rng()` (e.g. for per-junction spread). Realizations are evaluated in parallel
+# batches and streamed into `yield_analysis.h5`; `yield_summary.json` holds the distributions'
+# statistics and the yield.
+#
+# All settings are optional and read from `user_inputs/yield_config.json`:
+#   n_realizations        (100)
+#   seed                  (1234)
+#   parameter_spread      ({} ; e.g. {"Lj": 0.05} = 5 % relative std)
+#   default_spread        (0.0; relative std of the parameters not listed in parameter_spread)
+#   metric_threshold      (null; yield = fraction of realizations with metric <= threshold)
+#   nonlinear             (false; also run HB and `user_performance`)
+#   nonlinear_amplitudes  (null; default: optimal_physical_quantities.json of the same run, else
+#                          the `*_non_linear_amplitude_for_delta_correction` values)
+#   performance_threshold (null; HB yield = fraction with converged HB and performance >= threshold)
+#   batch_size            (4 x threads)
+#   parallel              (true when Julia has more than one thread)
+
+const YIELD_RNG_KEY = :jco_realization_rng
+
+"""
+    realization_rng(default_seed=1)
+
+RNG of the fabrication realization currently evaluated by `run_yield_analysis`.
+Outside a yield analysis it returns `MersenneTwister(default_seed)`, so a circuit that draws its
+junction spread from `realization_rng()` is deterministic in normal runs.
+"""
+function realization_rng(default_seed::Integer=1)
+    rng = get(task_local_storage(), YIELD_RNG_KEY, nothing)
+    return rng === nothing ? MersenneTwister(default_seed) : rng
+end
+
+"RNG of realization `i` (independent streams, reproducible for a given `seed`)."
+realization_seed_rng(seed::Integer, i::Integer) = MersenneTwister([UInt32(seed), UInt32(i)])
+
+function load_yield_config(path::AbstractString)
+    cfg = isfile(path) ? JSON.parsefile(path) : Dict{String,Any}()
+    isfile(path) || @info "No yield_config.json found, using defaults."
+
+    return (
+        n_realizations        = Int(get(cfg, "n_realizations", 100)),
+        seed                  = Int(get(cfg, "seed", 1234)),
+        parameter_spread      = Dict{Symbol,Float64}(Symbol(k) => Float64(v) for (k, v) in get(cfg, "parameter_spread", Dict())),
+        default_spread        = Float64(get(cfg, "default_spread", 0.0)),
+        metric_threshold      = get(cfg, "metric_threshold", nothing),
+        nonlinear             = Bool(get(cfg, "nonlinear", false)),
+        nonlinear_amplitudes  = get(cfg, "nonlinear_amplitudes", nothing),
+        performance_threshold = get(cfg, "performance_threshold", nothing),
+        batch_size            = max(Int(get(cfg, "batch_size", 4 * Threads.nthreads())), 1),
+        parallel              = Bool(get(cfg, "parallel", Threads.nthreads() > 1)),
+    )
+end
+
+"Draw the device parameters of one realization (relative Gaussian spread around `nominal`)."
+function sample_realization(rng, nominal::Dict, ycfg)
+    params = Dict{Symbol,Any}()
+    for k in sort!(collect(keys(nominal)))    # fixed order: same draws for the same seed
+        v = nominal[k]
+        spread = get(ycfg.parameter_spread, k, ycfg.default_spread)
+        params[k] = (v isa Real && spread > 0) ? v * (1 + spread * randn(rng)) : v
+    end
+    return params
+end
+
+"Evaluate realization `i`: linear simulation + `user_cost`, optionally HB + `user_performance`."
+function evaluate_realization(i::Int, nominal::Dict, ycfg; amps=nothing, freqs=nothing)
+    rng = realization_seed_rng(ycfg.seed, i)
+
+    return task_local_storage(YIELD_RNG_KEY, rng) do
+        params = sample_realization(rng, nominal, ycfg)
+        circuit = create_circuit(params)
+
+        S = linear_simulation(params, circuit)
+        out = call_user_hook(user_cost, S, params, delta_correction)
+        metric, metrics = unpack_user_metrics(out; default_name=:metric)
+
+        perf = NaN
+        converged = false
+        if ycfg.nonlinear
+            nl = nonlinear_simulation(circuit, amps, sim_vars_with_frequencies(sim_vars, freqs))
+            converged = nl.converged
+            if converged
+                pout = call_user_hook(user_performance, nl.sol, params, amps, freqs)
+                perf, _ = unpack_user_metrics(pout; default_name=:performance)
+            end
+        end
+
+        (index=i, params=params, metric=metric, metrics=metrics, performance=perf, converged=converged)
+    end
+end
+
+"Amplitudes for the HB part of the yield analysis (see the header of this file)."
+function yield_nonlinear_amplitudes(ycfg, run_folder)
+    ycfg.nonlinear_amplitudes === nothing || return Float64.(ycfg.nonlinear_amplitudes)
+
+    pq_file = joinpath(run_folder, "optimal_physical_quantities.json")
+    if isfile(pq_file)
+        data = JSON.parsefile(pq_file)["data"]
+        n = _num_sources_from_keys(sim_vars)
+        keys_amp = ["source_$(i)_amplitude" for i in 1:n]
+        all(k -> haskey(data, k), keys_amp) && return Float64[data[k] for k in keys_amp]
+    end
+    return Float64.(get_delta_correction_amplitudes())
+end
+
+"Fraction of `values` satisfying `ok`, or `nothing` if `threshold` is not set."
+_yield_fraction(values, threshold, ok) =
+    threshold === nothing || isempty(values) ? nothing : count(v -> ok(v, threshold), values) / length(values)
+
+function _distribution_summary(values::AbstractVector{<:Real})
+    v = filter(isfinite, values)
+    isempty(v) && return Dict{String,Any}("n_finite" => 0)
+    return Dict{String,Any}(
+        "n_finite" => length(v),
+        "mean" => mean(v),
+        "std" => length(v) > 1 ? std(v) : 0.0,
+        "min" => minimum(v),
+        "p05" => quantile(v, 0.05),
+        "median" => median(v),
+        "p95" => quantile(v, 0.95),
+        "max" => maximum(v),
+    )
+end
+
+"""
+    yield_analysis(nominal::Dict, output_path; ycfg, run_folder)
+
+Evaluate `ycfg.n_realizations` realizations of the design `nominal` in parallel batches,
+streaming them into `output_path/yield_analysis.h5`. Returns the summary Dict
+(also written to `output_path/yield_summary.json`).
+"""
+function yield_analysis(nominal::Dict, output_path::AbstractString; ycfg, run_folder::AbstractString)
+    n = ycfg.n_realizations
+    names_p = sort!([k for k in keys(nominal) if nominal[k] isa Real])
+    d = length(names_p)
+
+    amps = freqs = nothing
+    if ycfg.nonlinear
+        amps = yield_nonlinear_amplitudes(ycfg, run_folder)
+        freqs = Float64[first(sim_vars[:source_frequency_specs][i]) for i in 1:length(amps)]
+        @info "Yield analysis: HB with amplitudes $amps at frequencies $freqs"
+    end
+
+    h5_path = joinpath(output_path, "yield_analysis.h5")
+    ctx = Progress.start!(; N=n, stage="YIELD")
+    done = 0
+    metrics_all = Float64[]
+    perf_all = Float64[]
+    converged_all = Bool[]
+
+    h5open(h5_path, "w") do file
+        chunk = min(n, 4096)
+        ds_params = create_dataset(file, "params", Float64, (n, d); chunk=(chunk, d))
+        attributes(ds_params)["names"] = String.(names_p)
+        ds_metric = create_dataset(file, "metric", Float64, (n,); chunk=(chunk,))
+        ds_perf = create_dataset(file, "performance", Float64, (n,); chunk=(chunk,))
+        ds_conv = create_dataset(file, "converged", Int8, (n,); chunk=(chunk,))
+        ds_extra = Dict{Symbol,Any}()
+        g_extra = create_group(file, "metrics")
+
+        attrs = attributes(file)
+        attrs["seed"] = ycfg.seed
+        attrs["n_realizations"] = n
+        attrs["nonlinear"] = Int8(ycfg.nonlinear)
+        attrs["n_completed"] = 0
+
+        for r1 in 1:ycfg.batch_size:n
+            check_stop()
+            r2 = min(r1 + ycfg.batch_size - 1, n)
+
+            results = parallel_map(i -> evaluate_realization(i, nominal, ycfg; amps=amps, freqs=freqs), r1:r2;
+                                   ntasks=ycfg.parallel ? max_parallel_tasks() : 1)
+
+            # one column per metric returned by user_cost (created on first use)
+            for res in results, k in keys(res.metrics)
+                haskey(ds_extra, k) || (ds_extra[k] = create_dataset(g_extra, String(k), Float64, (n,); chunk=(chunk,)))
+            end
+
+            ds_params[r1:r2, :] = [Float64(res.params[k]) for res in results, k in names_p]
+            ds_metric[r1:r2] = Float64[res.metric for res in results]
+            ds_perf[r1:r2] = Float64[res.performance for res in results]
+            ds_conv[r1:r2] = Int8[res.converged for res in results]
+            for (k, ds) in ds_extra
+                ds[r1:r2] = Float64[Float64(get(res.metrics, k, NaN)) for res in results]
+            end
+
+            append!(metrics_all, (res.metric for res in results))
+            append!(perf_all, (res.performance for res in results))
+            append!(converged_all, (res.converged for res in results))
+
+            done = r2
+            delete!(attrs, "n_completed")    # attributes cannot be overwritten in place
+            attrs["n_completed"] = done
+            Progress.tick!(ctx; i=done)
+        end
+    end
+    Progress.finish!(ctx)
+
+    summary = Dict{String,Any}(
+        "n_realizations" => n,
+        "n_completed" => done,
+        "seed" => ycfg.seed,
+        "parameter_spread" => Dict(string(k) => v for (k, v) in ycfg.parameter_spread),
+        "default_spread" => ycfg.default_spread,
+        "metric" => _distribution_summary(metrics_all),
+        "metric_threshold" => ycfg.metric_threshold,
+        "metric_yield" => _yield_fraction(metrics_all, ycfg.metric_threshold, (v, t) -> isfinite(v) && v <= t),
+        "dataset" => basename(h5_path),
+    )
+    if ycfg.nonlinear
+        summary["hb_convergence_rate"] = isempty(converged_all) ? nothing : count(converged_all) / length(converged_all)
+        summary["performance"] = _distribution_summary(perf_all)
+        summary["performance_threshold"] = ycfg.performance_threshold
+        summary["performance_yield"] = _yield_fraction(perf_all, ycfg.performance_threshold, (v, t) -> isfinite(v) && v >= t)
+    end
+
+    save_output_file(summary, joinpath(output_path, "yield_summary.json"))
+    emit_event("file"; kind="dataset", path=h5_path)
+    return summary
+end
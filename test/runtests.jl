@@ -1,4 +1,178 @@
 using Test
 using JosephsonCircuitsOptimizer
 
+const JCO = JosephsonCircuitsOptimizer
+
 @test true
+
+@testset "parameter expressions" begin
+    declared = [:Lj, :Cj, :Cc]
+
+    e = JCO.compile_param_expression("2 * sqrt(Lj) + pi", declared)
+    @test e.deps == [:Lj]
+    @test e.f(Dict(:Lj => 4.0)) ≈ 4 + π
+    @test e.f(Dict(:Lj => [1.0, 4.0])) ≈ [2 + π, 4 + π]
+
+    @test_throws ErrorException JCO.compile_param_expression("Lx / 2", declared)            # unknown name
+    @test_throws ErrorException JCO.compile_param_expression("run(`ls`)", declared)         # function not allowed
+    @test_throws ErrorException JCO.compile_param_expression("Lj[1]", declared)             # syntax not allowed
+    @test_throws ErrorException JCO.compile_param_expression("Base.sqrt(Lj)", declared)
+    @test_throws ErrorException JCO.compile_param_expression("Lj +", declared)
+
+    exprs = Dict(:Cc => JCO.compile_param_expression("Cj / 10", declared),
+                 :Cj => JCO.compile_param_expression("Lj * 2", declared))
+    @test JCO.param_expression_order(exprs) == [:Cj, :Cc]
+
+    cyclic = Dict(:Cc => JCO.compile_param_expression("Cj / 10", declared),
+                  :Cj => JCO.compile_param_expression("Cc * 2", declared))
+    @test_throws ErrorException JCO.param_expression_order(cyclic)
+end
+
+@testset "derived parameter is not a grid dimension" begin
+    path, io = mktemp()
+    write(io, """{"Lj": {"values": [1.0, 2.0, 3.0]}, "Cj": {"values": [10.0, 20.0]}, "Cc": {"expr": "Lj + Cj"}}""")
+    close(io)
+
+    space = JCO.load_params(path)
+    @test space[:Cc] isa JCO.DerivedParameter
+    @test sort(space[:Cc]) == [11.0, 12.0, 13.0, 21.0, 22.0, 23.0]
+    @test JCO.plan_linear_points(space) == 6
+
+    names = collect(keys(space))
+    points = JCO.generate_all_initial_points(space)
+    @test length(points) == 6
+    for p in points
+        d = Dict(zip(names, p))
+        @test d[:Cc] == d[:Lj] + d[:Cj]
+    end
+
+    # The optimal value of a tagged parameter replaces its sweep
+    write(path, """{"Lj": {"values": [1.0, 2.0], "tag": true}, "Cc": {"expr": "2 * Lj"}}""")
+    space = JCO.load_params(path; optimal=Dict(:Lj => 5.0))
+    @test space[:Cc] == [10.0]
+    rm(path; force=true)
+end
+
+@testset "optimizer points with derived parameters" begin
+    path, io = mktemp()
+    write(io, """{"Lj": {"values": [1.0, 2.0], "tag": true}, "Cj": {"values": [10.0, 20.0], "tag": true},
+                  "Cc": {"expr": "Lj + Cj", "tag": true}}""")
+    close(io)
+    space = JCO.load_params(path)
+
+    @test JCO.optimizer_param_columns(["Lj", "Cc", "Cj"], space) == ["Lj", "Cj"]
+    full = JCO._full_point_map(["Lj", "Cj"], space)((2.5, 30.0))
+    point = Dict(zip(collect(keys(space)), full))
+    @test point == Dict(:Lj => 2.5, :Cj => 30.0, :Cc => 32.5)
+    @test JCO._full_point_map(["Lj", "Cj"], Dict{Symbol,Any}(:Lj => [1.0, 2.0], :Cj => 3.0)) === identity
+
+    # A tagged expression follows the optimal values of its inputs, not its own stored value
+    cycle = JCO.load_params(path; optimal=Dict(:Lj => 5.0, :Cj => 10.0, :Cc => 99.0))
+    @test cycle[:Cc] == [15.0]
+    rm(path; force=true)
+end
+
+@testset "OnlineCorrelation chunked merge" begin
+    rng = JCO.Random.MersenneTwister(1)
+    X = randn(rng, 1_000, 4)
+    X[:, 2] .+= 0.5 .* X[:, 1]
+    X[:, 4] .= 3.0    # constant column
+
+    oc = JCO.OnlineCorrelation(4)
+    for r in (1:7, 8:300, 301:301, 302:1_000)
+        JCO.accumulate_chunk!(oc, X[r, :])
+    end
+    C = JCO.correlation_matrix(oc)
+
+    @test oc.n == 1_000
+    @test oc.mean ≈ vec(sum(X; dims=1)) ./ 1_000
+    @test C[1:3, 1:3] ≈ JCO.Statistics.cor(X[:, 1:3])
+    @test all(iszero, C[4, :]) && all(iszero, C[:, 4])
+    @test oc.minval[4] == oc.maxval[4] == 3.0
+end
+
+@testset "density panels of continuous columns" begin
+    n = 3 * JCO.MAX_DENSITY_GROUPS
+    x = collect(range(0.0, 1.0; length=n))
+    X = hcat(x, repeat([1.0, 2.0, 3.0], n ÷ 3))
+    metric = fill(2.0, n)
+
+    st = JCO.DatasetStats(["x", "grid"])
+    for r in (1:1_000, 1_001:n)
+        JCO.accumulate_chunk!(st, X[r, :], metric[r])
+    end
+    @test st.groups[1] isa JCO.BinnedGroups
+    @test st.groups[2] isa Dict && sort!(collect(keys(st.groups[2]))) == [1.0, 2.0, 3.0]
+
+    values, counts, sums = JCO.density_groups(st.groups[1])
+    @test sum(counts) == n && sums ≈ 2.0 .* counts
+    @test length(values) <= 2 * JCO.DENSITY_BINS && issorted(values)
+    @test first(values) >= 0.0 - st.groups[1].width && last(values) <= 1.0 + st.groups[1].width
+    @test JCO._group_position(st.groups[1], values, 0.5) !== nothing
+end
+
+@testset "_select_batch" begin
+    surrogate(x) = sum(abs2, x)
+    lb, ub = [-1.0, -1.0], [1.0, 1.0]
+    candidates = [(0.0, 0.0), (0.0, 0.0), (0.01, 0.0), (0.9, 0.9), (-0.9, 0.8), (0.5, -0.5), (1.0, -1.0)]
+    evaluated = [[0.5, -0.5]]
+
+    idx = JCO._select_batch(surrogate, candidates, evaluated, 4, lb, ub)
+    @test length(idx) == 4
+    @test allunique(idx)
+    @test !(6 in idx)                              # already evaluated
+    @test !(1 in idx && 2 in idx)                  # duplicates are not both selected
+    @test 1 in idx || 2 in idx                     # the predicted minimum is in the batch
+
+    @test length(JCO._select_batch(surrogate, candidates, evaluated, 20, lb, ub)) == 5
+    @test isempty(JCO._select_batch(surrogate, [(0.5, -0.5)], evaluated, 2, lb, ub))
+end
+
+@testset "warm-start merge deduplication" begin
+    X = [1.0 2.0; 3.0 4.0]
+    Xw = [1.0 2.0;                  # already evaluated in this run
+          5.0 6.0;
+          3.0 (4.0 + 1e-13);        # same point to WARM_START_SIGDIGITS digits
+          5.0 6.0;                  # repeated in the previous runs
+          7.0 8.0]
+    @test JCO._new_rows(X, Xw) == [2, 5]
+    @test JCO._new_rows(zeros(0, 2), Xw) == [1, 2, 3, 5]
+    @test isempty(JCO._new_rows(X, X))
+end
+
+@testset "NonlinearResults" begin
+    r = JCO.NonlinearResults(2; capacity=2)
+    JCO.push_result!(r, [1e9, 2e9], [0.1, 0.2], 3.0, Dict(:gain => 20.0), 0.5, true, "ok")
+    JCO.push_result!(r, [1e9, 2e9], [0.3, 0.4], 5.0, Dict(:gain => 21.0, :bandwidth => 1e8), "n/a", false, "no")
+    JCO.push_result!(r, [1.5e9, 2e9], [0.5, 0.6], 4.0, Dict{Symbol,Float64}(), 0.7, true, "ok")
+
+    @test length(r) == 3 && !r.spilled
+    @test size(r.data, 1) >= 3                                      # grown past the capacity
+    @test isequal(collect(JCO.result_column(r, :bandwidth)), [NaN, 1e8, NaN])
+    @test JCO.result_amplitudes(r) == [0.1 0.2; 0.3 0.4; 0.5 0.6]
+    @test JCO.result_frequencies(r)[:, 1] == [1e9, 1e9, 1.5e9]
+    @test JCO.best_result_index(r) == 2
+    @test !JCO.delta_is_numeric(r) && JCO.result_deltas(r)[2] == "n/a"
+    @test r[1].performance_metrics == Dict(:gain => 20.0)
+    @test !r[2].converged && r[2].message == "no"
+    @test [p.performance for p in r] == [3.0, 5.0, 4.0]
+
+    # More metric columns than the spare ones
+    for k in 1:2 * JCO.NONLINEAR_SPARE_COLUMNS
+        JCO.push_result!(r, [1e9, 2e9], [0.0, 0.0], 1.0, Dict(Symbol("m$k") => k), 0.0, true, "")
+    end
+    @test JCO.result_column(r, Symbol("m$(2 * JCO.NONLINEAR_SPARE_COLUMNS)"))[end] == 2 * JCO.NONLINEAR_SPARE_COLUMNS
+    @test JCO.result_column(r, :gain)[1:2] == [20.0, 21.0]
+
+    # Above max_memory_mb the matrix is memory-mapped, with the same contents
+    spill_dir = mktempdir()
+    s = JCO.NonlinearResults(1; capacity=4, max_memory_mb=0.0001, spill_dir=spill_dir)
+    for i in 1:40
+        JCO.push_result!(s, [Float64(i)], [0.1i], Float64(i), Dict(:gain => 2.0i), 0.0, true, "")
+    end
+    @test s.spilled
+    @test JCO.result_column(s, :performance) == 1.0:40.0
+    @test JCO.result_column(s, :gain) == 2.0:2.0:80.0
+    @test JCO.delta_is_numeric(s)
+    rm(spill_dir; recursive=true, force=true)
+end